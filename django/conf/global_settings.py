@@ -157,6 +157,14 @@ DATABASES = {
     },
 }
 
+# The fraction of the requests whose queries are profiled and logged (see
+# django.db.backends.profiling), from 0 to 1.
+QUERY_PROFILING_RATE = 0
+
+# The number of times the same query can be repeated with different
+# parameters in a profiled request before it's logged as a warning.
+QUERY_PROFILING_REPEAT_THRESHOLD = 10
+
 # Classes used to implement DB routing behavior.
 DATABASE_ROUTERS = []
 
@@ -209,6 +217,19 @@ TEMPLATE_CONTEXT_PROCESSORS = (
 # Output to use in template system for invalid (e.g. misspelled) variables.
 TEMPLATE_STRING_IF_INVALID = ''
 
+# Whether the cached template loader compiles the templates it loads into
+# closures that render faster than the node tree.
+TEMPLATE_COMPILE = False
+
+# The alias of the cache (see CACHES) in which the cached template loader
+# stores parsed templates, so that other processes don't have to parse them
+# again. None disables it.
+TEMPLATE_CACHE_ALIAS = None
+
+# Whether the cached template loader loads all the templates it can find
+# when the WSGI application is created.
+TEMPLATE_PRELOAD = False
+
 # Default email address to use for various automated correspondence from
 # the site managers.
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
@@ -445,6 +466,10 @@ MIDDLEWARE_CLASSES = (
 #     'django.middleware.gzip.GZipMiddleware',
 )
 
+# Whether the time taken by each middleware method is recorded in the
+# middleware_timings list of the request and logged.
+MIDDLEWARE_TIMING = False
+
 ############
 # SESSIONS #
 ############
@@ -459,6 +484,7 @@ SESSION_SAVE_EVERY_REQUEST = False                      # Whether to save the se
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False                 # Whether a user's session cookie expires when the Web browser is closed.
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # The module to store session data
 SESSION_FILE_PATH = None                                # Directory to store session files if using the file session module. If None, the backend will use a sensible default.
+SESSION_SERIALIZER = 'django.contrib.sessions.serializers.PickleSerializer'  # Class to serialize session data
 
 #########
 # CACHE #
@@ -472,6 +498,14 @@ CACHES = {
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 CACHE_MIDDLEWARE_SECONDS = 600
 CACHE_MIDDLEWARE_ALIAS = 'default'
+# The number of seconds expired pages are served for while they're being
+# regenerated, and whether to regenerate pages before they expire.
+CACHE_MIDDLEWARE_STALE_SECONDS = 0
+CACHE_MIDDLEWARE_EARLY_REFRESH = False
+
+# The cache used to store the results of QuerySet.cache(). If None, results
+# aren't cached.
+QUERYSET_CACHE_ALIAS = None
 
 ####################
 # COMMENTS         #
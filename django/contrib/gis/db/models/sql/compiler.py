@@ -1,7 +1,8 @@
 from itertools import izip
 from django.db.backends.util import truncate_name, typecast_timestamp
 from django.db.models.sql import compiler
-from django.db.models.sql.constants import TABLE_NAME, MULTI
+from django.db.models.sql.constants import (TABLE_NAME, MULTI,
+    GET_ITERATOR_CHUNK_SIZE)
 
 SQLCompiler = compiler.SQLCompiler
 
@@ -275,7 +276,8 @@ class SQLDateCompiler(compiler.SQLDateCompiler, GeoSQLCompiler):
     `GeoQuery.resolve_columns` is used for spatial values.
     See #14648, #16757.
     """
-    def results_iter(self):
+    def results_iter(self, chunked_fetch=False,
+                     chunk_size=GET_ITERATOR_CHUNK_SIZE):
         if self.connection.ops.oracle:
             from django.db.models.fields import DateTimeField
             fields = [DateTimeField()]
@@ -283,7 +285,7 @@ class SQLDateCompiler(compiler.SQLDateCompiler, GeoSQLCompiler):
             needs_string_cast = self.connection.features.needs_datetime_string_cast
 
         offset = len(self.query.extra_select)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunked_fetch, chunk_size):
             for row in rows:
                 date = row[offset]
                 if self.connection.ops.oracle:
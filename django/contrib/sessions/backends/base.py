@@ -1,18 +1,45 @@
 import base64
 import time
+import zlib
 from datetime import datetime, timedelta
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 from django.conf import settings
-from django.core.exceptions import SuspiciousOperation
+from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
 from django.utils.crypto import constant_time_compare
 from django.utils.crypto import get_random_string
 from django.utils.crypto import salted_hmac
+from django.utils.importlib import import_module
 from django.utils import timezone
 
+_serializers = {}
+
+def get_serializer(import_path=None):
+    """
+    Returns the session serializer class at import_path, which defaults to
+    the SESSION_SERIALIZER setting.
+    """
+    if import_path is None:
+        import_path = settings.SESSION_SERIALIZER
+    try:
+        return _serializers[import_path]
+    except KeyError:
+        pass
+    try:
+        dot = import_path.rindex('.')
+    except ValueError:
+        raise ImproperlyConfigured("%s isn't a session serializer module." % import_path)
+    module, classname = import_path[:dot], import_path[dot+1:]
+    try:
+        mod = import_module(module)
+    except ImportError, e:
+        raise ImproperlyConfigured('Error importing session serializer module %s: "%s"' % (module, e))
+    try:
+        serializer = getattr(mod, classname)
+    except AttributeError:
+        raise ImproperlyConfigured('Session serializer module "%s" does not define a "%s" class.' % (module, classname))
+    _serializers[import_path] = serializer
+    return serializer
+
 class CreateError(Exception):
     """
     Used internally as a consistent exception type to catch from save (see the
@@ -31,6 +58,9 @@ class SessionBase(object):
         self._session_key = session_key
         self.accessed = False
         self.modified = False
+        # The serialized session data as last loaded from or saved to the
+        # session store, if known.
+        self._stored_data = None
 
     def __contains__(self, key):
         return key in self._session
@@ -74,27 +104,78 @@ class SessionBase(object):
         key_salt = "django.contrib.sessions" + self.__class__.__name__
         return salted_hmac(key_salt, value).hexdigest()
 
+    def serialize(self, session_dict):
+        """
+        Returns the given session dictionary serialized with the
+        SESSION_SERIALIZER.
+        """
+        return get_serializer()().dumps(session_dict)
+
+    def deserialize(self, data):
+        """
+        Returns the session dictionary serialized in the given data, which
+        becomes the data last loaded from the session store.
+        """
+        session_dict = get_serializer()().loads(data)
+        self._stored_data = data
+        return session_dict
+
     def encode(self, session_dict):
-        "Returns the given session dictionary pickled and encoded as a string."
-        pickled = pickle.dumps(session_dict, pickle.HIGHEST_PROTOCOL)
-        hash = self._hash(pickled)
-        return base64.encodestring(hash + ":" + pickled)
+        """
+        Returns the given session dictionary serialized, compressed if that
+        makes it shorter, and encoded as a string.
+        """
+        serialized = self._stored_data = self.serialize(session_dict)
+        compressed = zlib.compress(serialized)
+        # A leading '.' marks compressed data; serialized dicts never start
+        # with one.
+        if len(compressed) < len(serialized) - 1:
+            data = '.' + compressed
+        else:
+            data = serialized
+        hash = self._hash(data)
+        return base64.encodestring(hash + ":" + data)
 
     def decode(self, session_data):
         encoded_data = base64.decodestring(session_data)
         try:
             # could produce ValueError if there is no ':'
-            hash, pickled = encoded_data.split(':', 1)
-            expected_hash = self._hash(pickled)
+            hash, data = encoded_data.split(':', 1)
+            expected_hash = self._hash(data)
             if not constant_time_compare(hash, expected_hash):
                 raise SuspiciousOperation("Session data corrupted")
-            else:
-                return pickle.loads(pickled)
+            if data[:1] == '.':
+                data = zlib.decompress(data[1:])
+            return self.deserialize(data)
         except Exception:
-            # ValueError, SuspiciousOperation, unpickling exceptions. If any of
-            # these happen, just return an empty dictionary (an empty session).
+            # ValueError, SuspiciousOperation, zlib.error, deserialization
+            # exceptions. If any of these happen, just return an empty
+            # dictionary (an empty session).
             return {}
 
+    def has_changed(self):
+        """
+        Returns True if the session data differs from the data last loaded
+        from or saved to the session store. Unlike ``modified``, which is set
+        whenever the session is written to, this compares the values, so
+        values set to what they already were don't count as changes.
+        """
+        try:
+            session_dict = self._session_cache
+        except AttributeError:
+            # The session wasn't loaded, so it can't have changed.
+            return False
+        if self._stored_data is None:
+            return True
+        if self.serialize(session_dict) == self._stored_data:
+            return False
+        # Serializing equal values doesn't always give the same result (e.g.
+        # with pickle), so different data may still hold the same values.
+        try:
+            return get_serializer()().loads(self._stored_data) != session_dict
+        except Exception:
+            return True
+
     def update(self, dict_):
         self._session.update(dict_)
         self.modified = True
@@ -162,7 +243,11 @@ class SessionBase(object):
             if self.session_key is None or no_load:
                 self._session_cache = {}
             else:
+                self._stored_data = None
                 self._session_cache = self.load()
+                if self._stored_data is None:
+                    # The backend didn't decode the data it loaded.
+                    self._stored_data = self.serialize(self._session_cache)
         return self._session_cache
 
     _session = property(_get_session)
@@ -242,6 +327,14 @@ class SessionBase(object):
         self._session_cache = data
         self.delete(key)
 
+    def touch(self):
+        """
+        Extends the expiry of the stored session, whose data hasn't changed.
+        Backends that can update the expiry without rewriting the data
+        override this.
+        """
+        self.save()
+
     # Methods that child classes must implement.
 
     def exists(self, session_key):
@@ -0,0 +1,283 @@
+"""
+Database-backed sessions with a local cache and write-behind.
+
+Sessions are read from a small cache in the memory of each process, then from
+the default cache and only then from the database. The default cache is
+checked on every load for sessions deleted by other processes. Saving a
+session updates both caches right away, but the database is written to by a
+background thread, which coalesces successive writes to the same session into
+one.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import cache
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.datastructures import LRUCache
+from django.utils.log import getLogger
+
+KEY_PREFIX = "django.contrib.sessions.buffered_db"
+
+# Stored in the cache in place of the sessions that were deleted, so that
+# they aren't read back from the database before the deletion is written.
+DELETED = "deleted"
+
+logger = getLogger('django.contrib.sessions')
+
+# The database writes that haven't been done yet, by session key: a
+# (session_data, expire_date) pair, (None, expire_date) to only update the
+# expiry date, or None to delete the session. The keys are also kept in
+# _queue, in the order they must be written in.
+_pending = {}
+_queue = deque()
+_lock = threading.Lock()
+_ready = threading.Condition(_lock)
+# Held while writing to the database, so that the writes to a session are
+# done in order even when the queue is emptied by several threads.
+_write_lock = threading.Lock()
+_writer = None
+
+def queue_write(session_key, entry):
+    """
+    Queues a database write for the given session, replacing the write that
+    was pending for it, if any. Returns the number of pending writes.
+    """
+    with _lock:
+        if session_key in _pending:
+            pending = _pending[session_key]
+            if (entry is not None and entry[0] is None and
+                    pending is not None and pending[0] is not None):
+                # Only the expiry date changed since the pending write.
+                entry = (pending[0], entry[1])
+        else:
+            _queue.append(session_key)
+        _pending[session_key] = entry
+        return len(_pending)
+
+def write_pending():
+    """
+    Does all the pending database writes.
+    """
+    with _write_lock:
+        while True:
+            with _lock:
+                if not _queue:
+                    return
+                session_key = _queue.popleft()
+                entry = _pending.pop(session_key)
+            try:
+                write(session_key, entry)
+            except Exception:
+                logger.error('Error writing a session to the database',
+                             exc_info=True)
+
+def write(session_key, entry):
+    using = router.db_for_write(Session)
+    sessions = Session.objects.using(using).filter(session_key=session_key)
+    if entry is None:
+        sessions.delete()
+        return
+    session_data, expire_date = entry
+    if session_data is None:
+        sessions.update(expire_date=expire_date)
+    else:
+        Session(session_key=session_key, session_data=session_data,
+                expire_date=expire_date).save(using=using)
+
+def start_writer(delay):
+    """
+    Wakes up the thread that does the pending writes, starting it if it isn't
+    running. It waits for 'delay' seconds before writing, so that the writes
+    to the same sessions made in the meantime are coalesced.
+    """
+    global _writer
+    with _lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_write_forever, args=(delay,),
+                                       name='session writer')
+            _writer.daemon = True
+            _writer.start()
+        _ready.notify()
+
+def _write_forever(delay):
+    while True:
+        with _lock:
+            while not _queue:
+                _ready.wait()
+        time.sleep(delay)
+        write_pending()
+        for conn in connections.all():
+            conn.close_if_unusable_or_obsolete()
+
+# The writer thread is a daemon thread, which doesn't keep the process alive.
+atexit.register(write_pending)
+
+
+class SessionStore(DBStore):
+    """
+    Implements database-backed sessions with a local cache and write-behind.
+    """
+    # The number of sessions kept in the memory of each process, and for how
+    # many seconds. Other processes may change a session in the meantime.
+    local_cache_size = 1000
+    local_cache_timeout = 5
+    # How long the writer thread waits to coalesce writes, and how many
+    # writes may be pending before saving a session does them right away.
+    write_delay = 1
+    max_pending_writes = 1000
+    # If False, the database is written to when the session is saved.
+    write_in_background = True
+
+    @classmethod
+    def get_local_cache(cls):
+        try:
+            return cls.__dict__['_local_cache']
+        except KeyError:
+            cls._local_cache = LRUCache(cls.local_cache_size)
+            return cls._local_cache
+
+    def _get_local(self, session_key):
+        """
+        Returns the serialized data of the session from the local cache, or
+        None.
+        """
+        entry = self.get_local_cache().get(session_key)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def _set_local(self, session_key, serialized):
+        self.get_local_cache()[session_key] = (
+            time.time() + self.local_cache_timeout, serialized)
+
+    def _delete_local(self, session_key):
+        try:
+            del self.get_local_cache()[session_key]
+        except KeyError:
+            pass
+
+    def _queue_write(self, session_key, entry):
+        pending = queue_write(session_key, entry)
+        if not self.write_in_background or pending > self.max_pending_writes:
+            write_pending()
+        else:
+            start_writer(self.write_delay)
+
+    @property
+    def cache_key(self):
+        return KEY_PREFIX + self._get_or_create_session_key()
+
+    def load(self):
+        try:
+            serialized = cache.get(self.cache_key, None)
+        except Exception:
+            # Some backends (e.g. memcache) raise an exception on invalid
+            # cache keys. If this happens, reset the session. See #17810.
+            serialized = None
+        if serialized == DELETED:
+            # The session may have been deleted by another process, whose
+            # local cache is the only one that was emptied.
+            self._delete_local(self.session_key)
+            self.create()
+            return {}
+        local_serialized = self._get_local(self.session_key)
+        if local_serialized is not None:
+            try:
+                return self.deserialize(local_serialized)
+            except Exception:
+                pass
+        data = None
+        if serialized is not None:
+            try:
+                data = self.deserialize(serialized)
+            except Exception:
+                pass
+        if data is None:
+            session_key = self.session_key
+            data = self._load_pending()
+            if data is None:
+                data = super(SessionStore, self).load()
+            if self._stored_data is None:
+                self._stored_data = self.serialize(data)
+            if self.session_key == session_key:
+                cache.set(self.cache_key, self._stored_data,
+                          settings.SESSION_COOKIE_AGE)
+        self._set_local(self.session_key, self._stored_data)
+        return data
+
+    def _load_pending(self):
+        """
+        Returns the session data from the pending database write of the
+        session, or None if it must be read from the database.
+        """
+        with _lock:
+            if self.session_key not in _pending:
+                return None
+            entry = _pending[self.session_key]
+        if entry is None or entry[1] <= timezone.now():
+            # The session was deleted or expired.
+            self.create()
+            return {}
+        if entry[0] is None:
+            # Only the expiry date is written, the data in the database is
+            # current.
+            return None
+        return self.decode(entry[0])
+
+    def exists(self, session_key):
+        data = cache.get(KEY_PREFIX + session_key)
+        if data is not None:
+            return data != DELETED
+        if self._get_local(session_key) is not None:
+            return True
+        with _lock:
+            if session_key in _pending:
+                return _pending[session_key] is not None
+        return super(SessionStore, self).exists(session_key)
+
+    def save(self, must_create=False):
+        """
+        Saves the session data to the caches and queues the database write.
+        If 'must_create' is True, CreateError is raised if the session key is
+        already used.
+        """
+        session_key = self._get_or_create_session_key()
+        session_data = self.encode(self._get_session(no_load=must_create))
+        serialized = self._stored_data
+        if must_create and not cache.add(self.cache_key, serialized,
+                                         settings.SESSION_COOKIE_AGE):
+            # Either the key is taken or the cache is unavailable, which the
+            # database can tell apart.
+            super(SessionStore, self).save(must_create=True)
+            cache.set(self.cache_key, serialized, settings.SESSION_COOKIE_AGE)
+            self._set_local(session_key, serialized)
+            return
+        if not must_create:
+            cache.set(self.cache_key, serialized, settings.SESSION_COOKIE_AGE)
+        self._set_local(session_key, serialized)
+        self._queue_write(session_key, (session_data, self.get_expiry_date()))
+
+    def touch(self):
+        if self.session_key is None:
+            return self.save()
+        self._queue_write(self.session_key, (None, self.get_expiry_date()))
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._delete_local(session_key)
+        cache.set(KEY_PREFIX + session_key, DELETED, settings.SESSION_COOKIE_AGE)
+        self._queue_write(session_key, None)
+
+
+# At bottom to avoid circular import
+from django.contrib.sessions.models import Session
@@ -23,8 +23,15 @@ class SessionStore(SessionBase):
             # Some backends (e.g. memcache) raise an exception on invalid
             # cache keys. If this happens, reset the session. See #17810.
             session_data = None
-        if session_data is not None:
+        if isinstance(session_data, dict):
+            # Stored by an older version of Django, before the data was
+            # serialized.
             return session_data
+        if session_data is not None:
+            try:
+                return self.deserialize(session_data)
+            except Exception:
+                pass
         self.create()
         return {}
 
@@ -49,11 +56,11 @@ class SessionStore(SessionBase):
             func = self._cache.add
         else:
             func = self._cache.set
-        result = func(self.cache_key,
-                      self._get_session(no_load=must_create),
-                      self.get_expiry_age())
+        session_data = self.serialize(self._get_session(no_load=must_create))
+        result = func(self.cache_key, session_data, self.get_expiry_age())
         if must_create and not result:
             raise CreateError
+        self._stored_data = session_data
 
     def exists(self, session_key):
         return (KEY_PREFIX + session_key) in self._cache
@@ -23,14 +23,24 @@ class SessionStore(DBStore):
 
     def load(self):
         try:
-            data = cache.get(self.cache_key, None)
+            session_data = cache.get(self.cache_key, None)
         except Exception:
             # Some backends (e.g. memcache) raise an exception on invalid
             # cache keys. If this happens, reset the session. See #17810.
-            data = None
-        if data is None:
-            data = super(SessionStore, self).load()
-            cache.set(self.cache_key, data, settings.SESSION_COOKIE_AGE)
+            session_data = None
+        if isinstance(session_data, dict):
+            # Stored by an older version of Django, before the data was
+            # serialized.
+            return session_data
+        if session_data is not None:
+            try:
+                return self.deserialize(session_data)
+            except Exception:
+                pass
+        data = super(SessionStore, self).load()
+        if self._stored_data is None:
+            self._stored_data = self.serialize(data)
+        cache.set(self.cache_key, self._stored_data, settings.SESSION_COOKIE_AGE)
         return data
 
     def exists(self, session_key):
@@ -40,7 +50,7 @@ class SessionStore(DBStore):
 
     def save(self, must_create=False):
         super(SessionStore, self).save(must_create)
-        cache.set(self.cache_key, self._session, settings.SESSION_COOKIE_AGE)
+        cache.set(self.cache_key, self._stored_data, settings.SESSION_COOKIE_AGE)
 
     def delete(self, session_key=None):
         super(SessionStore, self).delete(session_key)
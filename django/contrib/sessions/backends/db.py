@@ -62,6 +62,20 @@ class SessionStore(SessionBase):
                 raise CreateError
             raise
 
+    def touch(self):
+        """
+        Updates the expiry date of the session without rewriting its data.
+        """
+        if self.session_key is None:
+            return self.save()
+        using = router.db_for_write(Session)
+        updated = Session.objects.using(using).filter(
+            session_key=self.session_key
+        ).update(expire_date=self.get_expiry_date())
+        if not updated:
+            # The session was deleted in the meantime.
+            self.save()
+
     def delete(self, session_key=None):
         if session_key is None:
             if self.session_key is None:
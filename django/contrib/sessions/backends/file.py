@@ -130,6 +130,18 @@ class SessionStore(SessionBase):
         except (OSError, IOError, EOFError):
             pass
 
+    def touch(self):
+        """
+        Updates the modification time of the session file without rewriting
+        it.
+        """
+        if self.session_key is None:
+            return self.save()
+        try:
+            os.utime(self._key_to_file(), None)
+        except OSError:
+            self.save()
+
     def exists(self, session_key):
         return os.path.exists(self._key_to_file(session_key))
 
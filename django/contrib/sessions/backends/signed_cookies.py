@@ -1,24 +1,9 @@
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
-
 from django.conf import settings
 from django.core import signing
 
-from django.contrib.sessions.backends.base import SessionBase
-
-
-class PickleSerializer(object):
-    """
-    Simple wrapper around pickle to be used in signing.dumps and
-    signing.loads.
-    """
-    def dumps(self, obj):
-        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
-
-    def loads(self, data):
-        return pickle.loads(data)
+from django.contrib.sessions.backends.base import SessionBase, get_serializer
+# PickleSerializer used to be defined here.
+from django.contrib.sessions.serializers import PickleSerializer
 
 
 class SessionStore(SessionBase):
@@ -31,7 +16,7 @@ class SessionStore(SessionBase):
         """
         try:
             return signing.loads(self.session_key,
-                serializer=PickleSerializer,
+                serializer=get_serializer(),
                 max_age=settings.SESSION_COOKIE_AGE,
                 salt='django.contrib.sessions.backends.signed_cookies')
         except (signing.BadSignature, ValueError):
@@ -52,6 +37,7 @@ class SessionStore(SessionBase):
         current request.
         """
         self._session_key = self._get_session_key()
+        self._stored_data = self.serialize(getattr(self, '_session_cache', {}))
         self.modified = True
 
     def exists(self, session_key=None):
@@ -90,4 +76,4 @@ class SessionStore(SessionBase):
         session_cache = getattr(self, '_session_cache', {})
         return signing.dumps(session_cache, compress=True,
             salt='django.contrib.sessions.backends.signed_cookies',
-            serializer=PickleSerializer)
+            serializer=get_serializer())
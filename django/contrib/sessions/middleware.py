@@ -32,8 +32,12 @@ class SessionMiddleware(object):
                     max_age = request.session.get_expiry_age()
                     expires_time = time.time() + max_age
                     expires = cookie_date(expires_time)
-                # Save the session data and refresh the client cookie.
-                request.session.save()
+                # Save the session data, or only extend its expiry if it
+                # didn't change, and refresh the client cookie.
+                if modified and request.session.has_changed():
+                    request.session.save()
+                else:
+                    request.session.touch()
                 response.set_cookie(settings.SESSION_COOKIE_NAME,
                         request.session.session_key, max_age=max_age,
                         expires=expires, domain=settings.SESSION_COOKIE_DOMAIN,
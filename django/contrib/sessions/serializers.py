@@ -0,0 +1,30 @@
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.signing import JSONSerializer as BaseJSONSerializer
+from django.utils import simplejson
+
+
+class PickleSerializer(object):
+    """
+    Simple wrapper around pickle to be used in signing.dumps and
+    signing.loads.
+    """
+    def dumps(self, obj):
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONSerializer(BaseJSONSerializer):
+    """
+    Serializes sessions to compact JSON, with the keys sorted so that equal
+    sessions are always serialized the same way. Only values that JSON can
+    represent (strings, numbers, booleans, None, lists and dicts) can be
+    stored in the session.
+    """
+    def dumps(self, obj):
+        return simplejson.dumps(obj, separators=(',', ':'), sort_keys=True)
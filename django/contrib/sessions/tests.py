@@ -5,12 +5,15 @@ import tempfile
 import warnings
 
 from django.conf import settings
+from django.contrib.sessions.backends import buffered_db
+from django.contrib.sessions.backends.buffered_db import SessionStore as BufferedDBSession
 from django.contrib.sessions.backends.db import SessionStore as DatabaseSession
 from django.contrib.sessions.backends.cache import SessionStore as CacheSession
 from django.contrib.sessions.backends.cached_db import SessionStore as CacheDBSession
 from django.contrib.sessions.backends.file import SessionStore as FileSession
 from django.contrib.sessions.backends.signed_cookies import SessionStore as CookieSession
 from django.contrib.sessions.models import Session
+from django.contrib.sessions.serializers import PickleSerializer
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.cache.backends.base import CacheKeyWarning
 from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
@@ -254,6 +257,43 @@ class SessionTestsMixin(object):
         encoded = self.session.encode(data)
         self.assertEqual(self.session.decode(encoded), data)
 
+    def test_decode_compressed(self):
+        # Data that compresses well is stored compressed.
+        data = {'a test key': 'a test value' * 100}
+        encoded = self.session.encode(data)
+        self.assertTrue(len(encoded) < len(self.session.serialize(data)))
+        self.assertEqual(self.session.decode(encoded), data)
+
+    @override_settings(SESSION_SERIALIZER='django.contrib.sessions.serializers.JSONSerializer')
+    def test_json_serializer(self):
+        data = {'a test key': ['a test value', 1]}
+        encoded = self.session.encode(data)
+        self.assertEqual(self.session.serialize(data), '{"a test key":["a test value",1]}')
+        self.assertEqual(self.session.decode(encoded), {u'a test key': [u'a test value', 1]})
+
+    def test_has_changed(self):
+        self.assertFalse(self.session.has_changed())
+        self.session['a'] = 'b'
+        self.assertTrue(self.session.has_changed())
+        self.session.save()
+        self.assertFalse(self.session.has_changed())
+        # Setting a value to what it already is doesn't change the session.
+        self.session.modified = False
+        self.session['a'] = 'b'
+        self.assertTrue(self.session.modified)
+        self.assertFalse(self.session.has_changed())
+        self.session['a'] = 'c'
+        self.assertTrue(self.session.has_changed())
+
+    def test_touch(self):
+        self.session['a'] = 'b'
+        self.session.save()
+        self.session.touch()
+        # Reload the session from the store.
+        del self.session._session_cache
+        self.assertEqual(self.session['a'], 'b')
+        self.assertFalse(self.session.has_changed())
+
 
 class DatabaseSessionTests(SessionTestsMixin, TestCase):
 
@@ -286,6 +326,18 @@ class DatabaseSessionTests(SessionTestsMixin, TestCase):
         del self.session._session_cache
         self.assertEqual(self.session['y'], 2)
 
+    def test_touch_only_updates_expiry(self):
+        self.session['z'] = 1
+        self.session.save()
+        Session.objects.filter(session_key=self.session.session_key).update(
+            expire_date=timezone.now() + timedelta(seconds=60))
+        s = Session.objects.get(session_key=self.session.session_key)
+        with self.assertNumQueries(1):
+            self.session.touch()
+        touched = Session.objects.get(session_key=self.session.session_key)
+        self.assertTrue(touched.expire_date > s.expire_date)
+        self.assertEqual(touched.session_data, s.session_data)
+
 
 @override_settings(USE_TZ=True)
 class DatabaseSessionWithTimeZoneTests(DatabaseSessionTests):
@@ -315,6 +367,147 @@ class CacheDBSessionWithTimeZoneTests(CacheDBSessionTests):
     pass
 
 
+class BufferedDBSessionTests(SessionTestsMixin, TestCase):
+
+    backend = BufferedDBSession
+
+    def setUp(self):
+        # The writer thread would use another database connection.
+        self.backend.write_in_background = False
+        super(BufferedDBSessionTests, self).setUp()
+
+    def tearDown(self):
+        super(BufferedDBSessionTests, self).tearDown()
+        self.backend.write_in_background = True
+
+    def test_load_from_local_cache(self):
+        self.session['x'] = 1
+        self.session.save()
+        session = self.backend(self.session.session_key)
+        with self.assertNumQueries(0):
+            self.assertEqual(session['x'], 1)
+        self.assertFalse(session.has_changed())
+
+    def test_delete_in_other_process(self):
+        self.session['x'] = 1
+        self.session.save()
+        session_key = self.session.session_key
+        # Load the session into the local cache of the other process.
+        self.assertEqual(OtherProcessBufferedDBSession(session_key)['x'], 1)
+        self.session.flush()
+        session = OtherProcessBufferedDBSession(session_key)
+        self.assertEqual(session.get('x'), None)
+        self.assertNotEqual(session.session_key, session_key)
+        self.assertFalse(session.exists(session_key))
+
+    def test_cycle_key_in_other_process(self):
+        self.session['x'] = 1
+        self.session.save()
+        prev_key = self.session.session_key
+        self.assertEqual(OtherProcessBufferedDBSession(prev_key)['x'], 1)
+        self.session.cycle_key()
+        self.session.save()
+        session = OtherProcessBufferedDBSession(prev_key)
+        self.assertEqual(session.get('x'), None)
+        self.assertNotEqual(session.session_key, prev_key)
+        self.assertEqual(OtherProcessBufferedDBSession(self.session.session_key)['x'], 1)
+
+    def test_load_from_database(self):
+        self.session['x'] = 1
+        self.session.save()
+        session_key = self.session.session_key
+        del self.backend.get_local_cache()[session_key]
+        buffered_db.cache.delete(buffered_db.KEY_PREFIX + session_key)
+        session = self.backend(session_key)
+        self.assertEqual(session['x'], 1)
+        self.assertEqual(session.session_key, session_key)
+        # The caches are filled again.
+        self.assertEqual(buffered_db.cache.get(buffered_db.KEY_PREFIX + session_key),
+                         session.serialize({'x': 1}))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend(session_key)['x'], 1)
+
+
+class OtherProcessBufferedDBSession(BufferedDBSession):
+    """
+    A session store with its own local cache, like in another process.
+    """
+
+
+class BufferedDBWriteBehindTests(TestCase):
+
+    def setUp(self):
+        # Leave the writes pending instead of starting the writer thread.
+        self.start_writer = buffered_db.start_writer
+        buffered_db.start_writer = lambda delay: None
+        self.session = BufferedDBSession()
+
+    def tearDown(self):
+        buffered_db.start_writer = self.start_writer
+        buffered_db.write_pending()
+
+    def test_coalesced_writes(self):
+        self.session['x'] = 1
+        self.session.save()
+        self.session['x'] = 2
+        self.session.save()
+        self.session.touch()
+        session_key = self.session.session_key
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+        # The session is read from the caches in the meantime.
+        self.assertTrue(self.session.exists(session_key))
+        self.assertEqual(BufferedDBSession(session_key)['x'], 2)
+        buffered_db.write_pending()
+        self.assertEqual(Session.objects.get(session_key=session_key).get_decoded(), {'x': 2})
+
+    def test_load_pending_write(self):
+        self.session['x'] = 1
+        self.session.save()
+        session_key = self.session.session_key
+        # The session dropped out of the caches before it was written.
+        del BufferedDBSession.get_local_cache()[session_key]
+        buffered_db.cache.delete(buffered_db.KEY_PREFIX + session_key)
+        with self.assertNumQueries(0):
+            session = BufferedDBSession(session_key)
+            self.assertEqual(session['x'], 1)
+        self.assertEqual(session.session_key, session_key)
+        self.assertFalse(session.has_changed())
+
+    def test_pending_delete(self):
+        self.session['x'] = 1
+        self.session.save()
+        buffered_db.write_pending()
+        session_key = self.session.session_key
+        self.session.delete()
+        # The deleted session isn't read back from the database.
+        self.assertFalse(self.session.exists(session_key))
+        session = BufferedDBSession(session_key)
+        self.assertEqual(session.get('x'), None)
+        self.assertNotEqual(session.session_key, session_key)
+        buffered_db.write_pending()
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+        session.delete()
+
+    def test_cycle_key(self):
+        self.session['x'] = 1
+        self.session.save()
+        buffered_db.write_pending()
+        prev_key = self.session.session_key
+        self.session.cycle_key()
+        self.session.save()
+        buffered_db.write_pending()
+        self.assertFalse(Session.objects.filter(session_key=prev_key).exists())
+        self.assertEqual(Session.objects.get(
+            session_key=self.session.session_key).get_decoded(), {'x': 1})
+
+    def test_max_pending_writes(self):
+        self.session['x'] = 1
+        self.session.max_pending_writes = 0
+        self.session.save()
+        self.assertTrue(Session.objects.filter(
+            session_key=self.session.session_key).exists())
+
+
 # Don't need DB flushing for these tests, so can use unittest.TestCase as base class
 class FileSessionTests(SessionTestsMixin, unittest.TestCase):
 
@@ -352,6 +545,21 @@ class CacheSessionTests(SessionTestsMixin, unittest.TestCase):
 
     backend = CacheSession
 
+    def test_load_serialized_data(self):
+        self.session['x'] = 1
+        self.session.save()
+        session_data = self.session._cache.get(self.session.cache_key)
+        self.assertEqual(session_data, self.session.serialize({'x': 1}))
+        session = self.backend(self.session.session_key)
+        # The data read from the cache isn't serialized again.
+        session.serialize = None
+        self.assertEqual(session['x'], 1)
+        self.assertEqual(session._stored_data, session_data)
+
+    def test_load_unserialized_data(self):
+        self.session._cache.set(self.session.cache_key, {'x': 1})
+        self.assertEqual(self.session['x'], 1)
+
     def test_load_overlong_key(self):
         warnings_state = get_warnings_state()
         warnings.filterwarnings('ignore',
@@ -412,6 +620,27 @@ class SessionMiddlewareTests(unittest.TestCase):
         self.assertNotIn('httponly',
                          str(response.cookies[settings.SESSION_COOKIE_NAME]))
 
+    def test_unchanged_session_only_touched(self):
+        middleware = SessionMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        request.session['hello'] = 'world'
+        response = middleware.process_response(request, HttpResponse('Session test'))
+        session_key = response.cookies[settings.SESSION_COOKIE_NAME].value
+
+        # Simulate a request that sets a value to what it already is
+        request = RequestFactory().get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = session_key
+        middleware.process_request(request)
+        request.session['hello'] = 'world'
+        calls = []
+        request.session.save = lambda must_create=False: calls.append('save')
+        request.session.touch = lambda: calls.append('touch')
+        response = middleware.process_response(request, HttpResponse('Session test'))
+        self.assertEqual(calls, ['touch'])
+        self.assertEqual(response.cookies[settings.SESSION_COOKIE_NAME].value, session_key)
+        request.session.delete()
+
 
 class CookieSessionTests(SessionTestsMixin, TestCase):
 
@@ -432,3 +661,19 @@ class CookieSessionTests(SessionTestsMixin, TestCase):
         testing for this behavior is meaningless.
         """
         pass
+
+
+class PickleSerializerTests(unittest.TestCase):
+
+    def test_shared_references(self):
+        serializer = PickleSerializer()
+        value = ['shared']
+        loaded = serializer.loads(serializer.dumps({'a': value, 'b': value}))
+        self.assertIs(loaded['a'], loaded['b'])
+
+    def test_recursive_data(self):
+        serializer = PickleSerializer()
+        data = []
+        data.append(data)
+        loaded = serializer.loads(serializer.dumps(data))
+        self.assertIs(loaded[0], loaded)
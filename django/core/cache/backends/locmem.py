@@ -1,5 +1,6 @@
 "Thread-safe in-memory cache backend."
 
+import threading
 import time
 try:
     import cPickle as pickle
@@ -14,14 +15,80 @@ from django.utils.synch import RWLock
 _caches = {}
 _expire_info = {}
 _locks = {}
+_orders = {}
+
+class LRUOrder(object):
+    """
+    The keys of a cache, from the least to the most recently used. The keys
+    are kept in a circular doubly linked list of [prev, next, key] links, so
+    that they can be moved and removed in constant time.
+
+    The cache's write lock must be held to change it, except for touch(),
+    which is called by readers and is serialized by 'lock'.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._links = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None]
+
+    def __len__(self):
+        return len(self._links)
+
+    def _append(self, link):
+        root = self._root
+        last = root[0]
+        last[1] = root[0] = link
+        link[0], link[1] = last, root
+
+    def _unlink(self, link):
+        prev, next = link[0], link[1]
+        prev[1], next[0] = next, prev
+
+    def touch(self, key):
+        """
+        Marks the key as the most recently used, adding it if needed.
+        """
+        link = self._links.get(key)
+        if link is None:
+            link = self._links[key] = [None, None, key]
+        else:
+            self._unlink(link)
+        self._append(link)
+
+    def discard(self, key):
+        link = self._links.pop(key, None)
+        if link is not None:
+            self._unlink(link)
+
+    def oldest(self):
+        """
+        Returns the least recently used key, or None if there are no keys.
+        """
+        return self._root[1][2]
+
+    def clear(self):
+        self._links.clear()
+        self._root[:] = [self._root, self._root, None]
 
 class LocMemCache(BaseCache):
+    """
+    When MAX_ENTRIES is reached, the least recently used entry is evicted.
+    Expired entries are only removed when they're accessed or evicted. The
+    hits, misses and evictions attributes count the reads that found a value,
+    the reads that didn't and the entries that were evicted to make room, for
+    this instance.
+    """
     def __init__(self, name, params):
         BaseCache.__init__(self, params)
-        global _caches, _expire_info, _locks
+        global _caches, _expire_info, _locks, _orders
         self._cache = _caches.setdefault(name, {})
         self._expire_info = _expire_info.setdefault(name, {})
         self._lock = _locks.setdefault(name, RWLock())
+        self._order = _orders.setdefault(name, LRUOrder())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     def add(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
@@ -43,28 +110,37 @@ class LocMemCache(BaseCache):
         with self._lock.reader():
             exp = self._expire_info.get(key)
             if exp is None:
+                with self._order.lock:
+                    self.misses += 1
                 return default
             elif exp > time.time():
                 try:
                     pickled = self._cache[key]
-                    return pickle.loads(pickled)
+                    value = pickle.loads(pickled)
                 except pickle.PickleError:
-                    return default
+                    value = default
+                with self._order.lock:
+                    self._order.touch(key)
+                    self.hits += 1
+                return value
         with self._lock.writer():
-            try:
-                del self._cache[key]
-                del self._expire_info[key]
-            except KeyError:
-                pass
+            self.misses += 1
+            self._delete(key)
             return default
 
     def _set(self, key, value, timeout=None):
-        if len(self._cache) >= self._max_entries:
-            self._cull()
+        if key not in self._cache:
+            while len(self._cache) >= self._max_entries:
+                oldest = self._order.oldest()
+                if oldest is None:
+                    break
+                self._delete(oldest)
+                self.evictions += 1
         if timeout is None:
             timeout = self.default_timeout
         self._cache[key] = value
         self._expire_info[key] = time.time() + timeout
+        self._order.touch(key)
 
     def set(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
@@ -85,7 +161,9 @@ class LocMemCache(BaseCache):
         with self._lock.writer():
             try:
                 pickled = pickle.dumps(new_value, pickle.HIGHEST_PROTOCOL)
-                self._cache[key] = pickled
+                # The key may have been deleted or evicted in the meantime.
+                if key in self._cache:
+                    self._cache[key] = pickled
             except pickle.PickleError:
                 pass
         return new_value
@@ -101,21 +179,9 @@ class LocMemCache(BaseCache):
                 return True
 
         with self._lock.writer():
-            try:
-                del self._cache[key]
-                del self._expire_info[key]
-            except KeyError:
-                pass
+            self._delete(key)
             return False
 
-    def _cull(self):
-        if self._cull_frequency == 0:
-            self.clear()
-        else:
-            doomed = [k for (i, k) in enumerate(self._cache) if i % self._cull_frequency == 0]
-            for k in doomed:
-                self._delete(k)
-
     def _delete(self, key):
         try:
             del self._cache[key]
@@ -125,6 +191,7 @@ class LocMemCache(BaseCache):
             del self._expire_info[key]
         except KeyError:
             pass
+        self._order.discard(key)
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
@@ -133,8 +200,10 @@ class LocMemCache(BaseCache):
             self._delete(key)
 
     def clear(self):
-        self._cache.clear()
-        self._expire_info.clear()
+        with self._lock.writer():
+            self._cache.clear()
+            self._expire_info.clear()
+            self._order.clear()
 
 # For backwards compatibility
 class CacheClass(LocMemCache):
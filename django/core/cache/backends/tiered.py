@@ -0,0 +1,187 @@
+"""
+Two-level cache backend: a local-memory cache in front of a shared cache.
+
+LOCATION is the alias (or dotted path) of the shared cache, e.g. a memcached
+cache. Values read from it are kept in the memory of the process for
+OPTIONS['LOCAL_TIMEOUT'] seconds (5 by default), so that the hottest keys
+don't need a round trip. Writes go to both levels.
+
+Values changed by other processes may be read from the local cache until
+they expire from it. If OPTIONS['INVALIDATION_INTERVAL'] is set, every write
+also increments a generation counter in the shared cache, which each process
+checks at most every INVALIDATION_INTERVAL seconds, emptying its local cache
+when it changed.
+"""
+
+import time
+
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# How long the generation counter is kept in the shared cache (the longest
+# relative timeout memcached accepts).
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+def raw_key(key, key_prefix, version):
+    """
+    Key function of both levels, which get the keys made by the tiered cache.
+    """
+    return key
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        from django.core.cache import get_cache
+        BaseCache.__init__(self, params)
+        options = params.get('OPTIONS', {})
+        self.local_timeout = int(options.get('LOCAL_TIMEOUT', 5))
+        interval = options.get('INVALIDATION_INTERVAL')
+        self.invalidation_interval = None if interval is None else float(interval)
+        self._remote = get_cache(location, KEY_FUNCTION=raw_key)
+        self._local = LocMemCache('tiered:%s' % location, {
+            'timeout': self.local_timeout,
+            'max_entries': self._max_entries,
+            'cull_frequency': self._cull_frequency,
+            'KEY_FUNCTION': raw_key,
+        })
+        self._generation_key = '%s:tiered_generation' % self.key_prefix
+        self._generation = None
+        self._next_check = 0
+
+    def _local_timeout(self, timeout):
+        """
+        Returns how long a value set with the given timeout may be kept in
+        the local cache, or None if it mustn't be.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        if timeout <= 0:
+            return None
+        return min(timeout, self.local_timeout)
+
+    def _set_local(self, key, value, timeout=None):
+        local_timeout = self._local_timeout(timeout)
+        if local_timeout is None:
+            self._local.delete(key)
+        else:
+            self._local.set(key, value, local_timeout)
+
+    def _check_generation(self):
+        """
+        Empties the local cache if the shared cache was written to by another
+        process since it was last checked.
+        """
+        if self.invalidation_interval is None:
+            return
+        now = time.time()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.invalidation_interval
+        generation = self._remote.get(self._generation_key)
+        if generation != self._generation:
+            self._local.clear()
+            self._generation = generation
+
+    def _written(self):
+        """
+        Lets the other processes know that the shared cache was written to.
+        """
+        if self.invalidation_interval is None:
+            return
+        try:
+            generation = self._remote.incr(self._generation_key)
+        except ValueError:
+            generation = 1
+            if not self._remote.add(self._generation_key, generation,
+                                    GENERATION_TIMEOUT):
+                generation = None
+        if generation is None or generation != (self._generation or 0) + 1:
+            # Someone else wrote in the meantime.
+            self._local.clear()
+        self._generation = generation
+
+    def add(self, key, value, timeout=None, version=None):
+        key = self.make_key(key, version=version)
+        if timeout is None:
+            timeout = self.default_timeout
+        if self._remote.add(key, value, timeout):
+            self._written()
+            self._set_local(key, value, timeout)
+            return True
+        self._local.delete(key)
+        return False
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self._check_generation()
+        value = self._local.get(key)
+        if value is not None:
+            return value
+        value = self._remote.get(key)
+        if value is None:
+            return default
+        self._set_local(key, value)
+        return value
+
+    def set(self, key, value, timeout=None, version=None):
+        key = self.make_key(key, version=version)
+        if timeout is None:
+            timeout = self.default_timeout
+        self._remote.set(key, value, timeout)
+        self._written()
+        self._set_local(key, value, timeout)
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self._remote.delete(key)
+        self._written()
+        self._local.delete(key)
+
+    def get_many(self, keys, version=None):
+        """
+        Fetches the keys from the local cache first, and only asks the shared
+        cache for the ones that are missing.
+        """
+        self._check_generation()
+        made_keys = dict((self.make_key(key, version=version), key) for key in keys)
+        values = self._local.get_many(made_keys.keys())
+        missing = [key for key in made_keys if key not in values]
+        if missing:
+            remote_values = self._remote.get_many(missing)
+            for key, value in remote_values.items():
+                self._set_local(key, value)
+            values.update(remote_values)
+        return dict((made_keys[key], value) for key, value in values.items())
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self._check_generation()
+        return self._local.has_key(key) or self._remote.has_key(key)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        value = self._remote.incr(key, delta)
+        self._written()
+        self._set_local(key, value)
+        return value
+
+    def set_many(self, data, timeout=None, version=None):
+        data = dict((self.make_key(key, version=version), value)
+                    for key, value in data.items())
+        if timeout is None:
+            timeout = self.default_timeout
+        self._remote.set_many(data, timeout)
+        self._written()
+        for key, value in data.items():
+            self._set_local(key, value, timeout)
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        self._remote.delete_many(keys)
+        self._written()
+        for key in keys:
+            self._local.delete(key)
+
+    def clear(self):
+        self._remote.clear()
+        self._written()
+        self._local.clear()
@@ -1,7 +1,9 @@
 import sys
+import time
 
 from django import http
-from django.core import signals
+from django.conf import settings
+from django.core import exceptions, signals, urlresolvers
 from django.utils.encoding import force_unicode
 from django.utils.importlib import import_module
 from django.utils.log import getLogger
@@ -27,9 +29,12 @@ class BaseHandler(object):
         Populate middleware lists from settings.MIDDLEWARE_CLASSES.
 
         Must be called after the environment is fixed (see __call__ in subclasses).
+
+        Each list only holds the methods of the middleware that define the
+        corresponding hook. When settings.MIDDLEWARE_TIMING is True, each
+        method is wrapped to record how long it takes (see
+        timed_middleware_method).
         """
-        from django.conf import settings
-        from django.core import exceptions
         self._view_middleware = []
         self._template_response_middleware = []
         self._response_middleware = []
@@ -54,16 +59,21 @@ class BaseHandler(object):
             except exceptions.MiddlewareNotUsed:
                 continue
 
+            if settings.MIDDLEWARE_TIMING:
+                method = lambda hook: timed_middleware_method(
+                    getattr(mw_instance, hook), middleware_path, hook)
+            else:
+                method = lambda hook: getattr(mw_instance, hook)
             if hasattr(mw_instance, 'process_request'):
-                request_middleware.append(mw_instance.process_request)
+                request_middleware.append(method('process_request'))
             if hasattr(mw_instance, 'process_view'):
-                self._view_middleware.append(mw_instance.process_view)
+                self._view_middleware.append(method('process_view'))
             if hasattr(mw_instance, 'process_template_response'):
-                self._template_response_middleware.insert(0, mw_instance.process_template_response)
+                self._template_response_middleware.insert(0, method('process_template_response'))
             if hasattr(mw_instance, 'process_response'):
-                self._response_middleware.insert(0, mw_instance.process_response)
+                self._response_middleware.insert(0, method('process_response'))
             if hasattr(mw_instance, 'process_exception'):
-                self._exception_middleware.insert(0, mw_instance.process_exception)
+                self._exception_middleware.insert(0, method('process_exception'))
 
         # We only assign to this when initialization is complete as it is used
         # as a flag for initialization being complete.
@@ -71,9 +81,6 @@ class BaseHandler(object):
 
     def get_response(self, request):
         "Returns an HttpResponse object for the given HttpRequest"
-        from django.core import exceptions, urlresolvers
-        from django.conf import settings
-
         try:
             # Setup default url resolver for this thread, this code is outside
             # the try/except so we don't get a spurious "unbound local
@@ -81,7 +88,7 @@ class BaseHandler(object):
             # resolver is set
             urlconf = settings.ROOT_URLCONF
             urlresolvers.set_urlconf(urlconf)
-            resolver = urlresolvers.RegexURLResolver(r'^/', urlconf)
+            resolver = urlresolvers.get_resolver(urlconf)
             try:
                 response = None
                 # Apply request middleware
@@ -95,7 +102,11 @@ class BaseHandler(object):
                         # Reset url resolver with a custom urlconf.
                         urlconf = request.urlconf
                         urlresolvers.set_urlconf(urlconf)
-                        resolver = urlresolvers.RegexURLResolver(r'^/', urlconf)
+                        if urlconf is None:
+                            # get_resolver() would fall back to ROOT_URLCONF.
+                            resolver = urlresolvers.RegexURLResolver(r'^/', urlconf)
+                        else:
+                            resolver = urlresolvers.get_resolver(urlconf)
 
                     callback, callback_args, callback_kwargs = resolver.resolve(
                             request.path_info)
@@ -191,6 +202,14 @@ class BaseHandler(object):
             signals.got_request_exception.send(sender=self.__class__, request=request)
             response = self.handle_uncaught_exception(request, resolver, sys.exc_info())
 
+        if hasattr(request, 'middleware_timings'):
+            logger.debug('Middleware timings: %s', request.path,
+                extra={
+                    'request': request,
+                    'middleware_timings': request.middleware_timings,
+                }
+            )
+
         return response
 
     def handle_uncaught_exception(self, request, resolver, exc_info):
@@ -203,8 +222,6 @@ class BaseHandler(object):
         caused by anything, so assuming something like the database is always
         available would be an error.
         """
-        from django.conf import settings
-
         if settings.DEBUG_PROPAGATE_EXCEPTIONS:
             raise
 
@@ -237,6 +254,25 @@ class BaseHandler(object):
             response = func(request, response)
         return response
 
+def timed_middleware_method(method, middleware_path, hook):
+    """
+    Wraps a middleware method so that it appends a (middleware_path, hook,
+    seconds) tuple to the middleware_timings list of the request each time
+    it's called.
+    """
+    def timed_method(request, *args):
+        start = time.time()
+        try:
+            return method(request, *args)
+        finally:
+            duration = time.time() - start
+            try:
+                timings = request.middleware_timings
+            except AttributeError:
+                timings = request.middleware_timings = []
+            timings.append((middleware_path, hook, duration))
+    return timed_method
+
 def get_script_name(environ):
     """
     Returns the equivalent of the HTTP request's SCRIPT_NAME environment
@@ -245,7 +281,6 @@ def get_script_name(environ):
     from the client's perspective), unless the FORCE_SCRIPT_NAME setting is
     set (to anything).
     """
-    from django.conf import settings
     if settings.FORCE_SCRIPT_NAME is not None:
         return force_unicode(settings.FORCE_SCRIPT_NAME)
 
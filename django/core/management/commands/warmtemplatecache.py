@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import NoArgsCommand, CommandError
+from django.template.base import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import find_template_loader
+from django.template.loaders.cached import Loader as CachedLoader
+
+class Command(NoArgsCommand):
+    help = ("Parses all the templates found by the cached template loader and "
+            "stores them in the cache given by the TEMPLATE_CACHE_ALIAS setting.")
+
+    requires_model_validation = False
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity'))
+        if settings.TEMPLATE_CACHE_ALIAS is None:
+            raise CommandError("The TEMPLATE_CACHE_ALIAS setting isn't set.")
+        loaders = [find_template_loader(loader) for loader in settings.TEMPLATE_LOADERS]
+        loaders = [loader for loader in loaders if isinstance(loader, CachedLoader)]
+        if not loaders:
+            raise CommandError("The TEMPLATE_LOADERS setting doesn't include "
+                               "django.template.loaders.cached.Loader.")
+        count = 0
+        for loader in loaders:
+            for name in loader.get_template_names():
+                try:
+                    loader.load_template(name)
+                except (TemplateDoesNotExist, TemplateSyntaxError, UnicodeDecodeError), e:
+                    # Not every file in a template directory is a template.
+                    if verbosity >= 1:
+                        self.stderr.write("Skipped %s: %s\n" % (name, e))
+                    continue
+                count += 1
+                if verbosity >= 2:
+                    self.stdout.write("Parsed %s\n" % name)
+        if verbosity >= 1:
+            self.stdout.write("Parsed %d template(s).\n" % count)
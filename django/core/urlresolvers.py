@@ -12,7 +12,7 @@ from threading import local
 
 from django.http import Http404
 from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
-from django.utils.datastructures import MultiValueDict
+from django.utils.datastructures import LRUCache, MultiValueDict
 from django.utils.encoding import iri_to_uri, force_unicode, smart_str
 from django.utils.functional import memoize, lazy
 from django.utils.importlib import import_module
@@ -33,6 +33,16 @@ _prefixes = local()
 # Overridden URLconfs for each thread are stored here.
 _urlconfs = local()
 
+# The number of resolved paths each RegexURLResolver remembers.
+RESOLVE_CACHE_SIZE = 1000
+
+# The number of URLs reverse() remembers.
+REVERSE_CACHE_SIZE = 1000
+_reverse_cache = LRUCache(REVERSE_CACHE_SIZE)
+
+# Matches inline flags, which change the meaning of the whole regex.
+_inline_flags_re = re.compile(r'\(\?[iLmsux]+\)')
+
 
 class ResolverMatch(object):
     def __init__(self, func, args, kwargs, url_name=None, app_name=None, namespaces=None):
@@ -136,6 +146,53 @@ def get_mod_func(callback):
         return callback, ''
     return callback[:dot], callback[dot+1:]
 
+def literal_prefix(regex):
+    """
+    Returns the literal string any path matched by the given regex pattern
+    starts with. The prefix is empty if the pattern isn't anchored to the
+    start of the path or might not match it literally.
+    """
+    if isinstance(regex, str):
+        try:
+            regex.decode('ascii')
+        except UnicodeDecodeError:
+            return ''
+    if not regex.startswith('^') or _inline_flags_re.search(regex):
+        return ''
+    # Look for an alternation outside of groups, e.g. '^a/|^b/'.
+    depth, escaped, in_class = 0, False, False
+    for char in regex:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return ''
+    prefix = []
+    pos = 1
+    while pos < len(regex):
+        char = regex[pos]
+        if char == '\\' and pos + 1 < len(regex) and not regex[pos + 1].isalnum():
+            char = regex[pos + 1]
+            pos += 2
+        elif char in '.^$*+?{}[]()|\\':
+            break
+        else:
+            pos += 1
+        if pos < len(regex) and regex[pos] in '*+?{':
+            # The character is repeated or optional.
+            break
+        prefix.append(char)
+    return ''.join(prefix)
+
 class LocaleRegexProvider(object):
     """
     A mixin to provide a default regex property which can vary by active
@@ -230,6 +287,11 @@ class RegexURLResolver(LocaleRegexProvider):
         self._reverse_dict = {}
         self._namespace_dict = {}
         self._app_dict = {}
+        self._resolve_index = {}
+        self._resolve_cache = LRUCache(RESOLVE_CACHE_SIZE)
+        self._reverse_candidates = {}
+        self._reverse_prefixes = {}
+        self._reverse_regexes = {}
 
     def __repr__(self):
         return smart_str(u'<%s %s (%s:%s) %s>' % (self.__class__.__name__, self.urlconf_name, self.app_name, self.namespace, self.regex.pattern))
@@ -290,11 +352,69 @@ class RegexURLResolver(LocaleRegexProvider):
             self._populate()
         return self._app_dict[language_code]
 
+    @property
+    def resolve_index(self):
+        """
+        A trie of the literal prefixes of the patterns, which is used to
+        only try the patterns that can match a given path.
+
+        Each node is a list of the indexes of the patterns whose prefix ends
+        at the node and of a dict mapping the next characters to the child
+        nodes. The index is returned together with the list of the functions
+        that resolve a path against each of the patterns.
+        """
+        language_code = get_language()
+        if language_code not in self._resolve_index:
+            root = [[], {}]
+            resolvers = []
+            for i, pattern in enumerate(self.url_patterns):
+                if isinstance(pattern, RegexURLResolver):
+                    # Included resolvers don't need to remember the paths
+                    # this resolver passes on to them.
+                    resolvers.append(pattern._resolve)
+                else:
+                    resolvers.append(pattern.resolve)
+                node = root
+                for char in literal_prefix(pattern.regex.pattern):
+                    node = node[1].setdefault(char, [[], {}])
+                node[0].append(i)
+            self._resolve_index[language_code] = (root, resolvers)
+        return self._resolve_index[language_code]
+
     def resolve(self, path):
-        tried = []
+        key = (get_language(), path)
+        match = self._resolve_cache.get(key)
+        if match is None:
+            match = self._resolve(path)
+            self._resolve_cache[key] = match
+        # Don't let the caller alter the cached match. This is cheaper than
+        # copy.copy(), which matters since it's done for every request.
+        copied = match.__class__.__new__(match.__class__)
+        copied.__dict__.update(match.__dict__)
+        copied.kwargs = match.kwargs.copy()
+        return copied
+
+    def _resolve(self, path):
         match = self.regex.search(path)
         if match:
             new_path = path[match.end():]
+            node, resolvers = self.resolve_index
+            indexes = node[0][:]
+            for char in new_path:
+                node = node[1].get(char)
+                if node is None:
+                    break
+                indexes.extend(node[0])
+            indexes.sort()
+            for i in indexes:
+                try:
+                    sub_match = resolvers[i](new_path)
+                except Resolver404:
+                    continue
+                if sub_match:
+                    return self._resolver_match(match, sub_match)
+            # Go through all the patterns to report the ones that were tried.
+            tried = []
             for pattern in self.url_patterns:
                 try:
                     sub_match = pattern.resolve(new_path)
@@ -306,15 +426,18 @@ class RegexURLResolver(LocaleRegexProvider):
                         tried.append([pattern])
                 else:
                     if sub_match:
-                        sub_match_dict = dict([(smart_str(k), v) for k, v in match.groupdict().items()])
-                        sub_match_dict.update(self.default_kwargs)
-                        for k, v in sub_match.kwargs.iteritems():
-                            sub_match_dict[smart_str(k)] = v
-                        return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict, sub_match.url_name, self.app_name or sub_match.app_name, [self.namespace] + sub_match.namespaces)
+                        return self._resolver_match(match, sub_match)
                     tried.append([pattern])
             raise Resolver404({'tried': tried, 'path': new_path})
         raise Resolver404({'path' : path})
 
+    def _resolver_match(self, match, sub_match):
+        sub_match_dict = dict([(smart_str(k), v) for k, v in match.groupdict().items()])
+        sub_match_dict.update(self.default_kwargs)
+        for k, v in sub_match.kwargs.iteritems():
+            sub_match_dict[smart_str(k)] = v
+        return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict, sub_match.url_name, self.app_name or sub_match.app_name, [self.namespace] + sub_match.namespaces)
+
     @property
     def urlconf_module(self):
         try:
@@ -353,6 +476,31 @@ class RegexURLResolver(LocaleRegexProvider):
     def reverse(self, lookup_view, *args, **kwargs):
         return self._reverse_with_prefix(lookup_view, '', *args, **kwargs)
 
+    def reverse_candidates(self, lookup_view):
+        """
+        Returns the list of the (format string, parameters, parameters and
+        default arguments, default arguments, pattern) candidates for
+        reversing lookup_view, flattened from the reverse_dict.
+        """
+        language_code = get_language()
+        candidates = self._reverse_candidates.setdefault(language_code, {})
+        if lookup_view not in candidates:
+            candidates[lookup_view] = [
+                (result, params, set(params + defaults.keys()), defaults, pattern)
+                for possibility, pattern, defaults in self.reverse_dict.getlist(lookup_view)
+                for result, params in possibility
+            ]
+        return candidates[lookup_view]
+
+    def _reverse_regex(self, _prefix, pattern):
+        """
+        Returns the compiled regex a reversed URL is validated against.
+        """
+        key = (_prefix, pattern)
+        if key not in self._reverse_regexes:
+            self._reverse_regexes[key] = re.compile(u'^%s%s' % key, re.UNICODE)
+        return self._reverse_regexes[key]
+
     def _reverse_with_prefix(self, lookup_view, _prefix, *args, **kwargs):
         if args and kwargs:
             raise ValueError("Don't mix *args and **kwargs in call to reverse()!")
@@ -360,29 +508,31 @@ class RegexURLResolver(LocaleRegexProvider):
             lookup_view = get_callable(lookup_view, True)
         except (ImportError, AttributeError), e:
             raise NoReverseMatch("Error importing '%s': %s." % (lookup_view, e))
-        possibilities = self.reverse_dict.getlist(lookup_view)
-        prefix_norm, prefix_args = normalize(_prefix)[0]
-        for possibility, pattern, defaults in possibilities:
-            for result, params in possibility:
-                if args:
-                    if len(args) != len(params) + len(prefix_args):
-                        continue
-                    unicode_args = [force_unicode(val) for val in args]
-                    candidate =  (prefix_norm + result) % dict(zip(prefix_args + params, unicode_args))
-                else:
-                    if set(kwargs.keys() + defaults.keys()) != set(params + defaults.keys() + prefix_args):
-                        continue
-                    matches = True
-                    for k, v in defaults.items():
-                        if kwargs.get(k, v) != v:
-                            matches = False
-                            break
-                    if not matches:
-                        continue
-                    unicode_kwargs = dict([(k, force_unicode(v)) for (k, v) in kwargs.items()])
-                    candidate = (prefix_norm + result) % unicode_kwargs
-                if re.search(u'^%s%s' % (_prefix, pattern), candidate, re.UNICODE):
-                    return candidate
+        if _prefix not in self._reverse_prefixes:
+            self._reverse_prefixes[_prefix] = normalize(_prefix)[0]
+        prefix_norm, prefix_args = self._reverse_prefixes[_prefix]
+        for result, params, param_set, defaults, pattern in self.reverse_candidates(lookup_view):
+            if args:
+                if len(args) != len(params) + len(prefix_args):
+                    continue
+                unicode_args = [force_unicode(val) for val in args]
+                candidate =  (prefix_norm + result) % dict(zip(prefix_args + params, unicode_args))
+            else:
+                if prefix_args:
+                    param_set = param_set.union(prefix_args)
+                if set(kwargs.keys() + defaults.keys()) != param_set:
+                    continue
+                matches = True
+                for k, v in defaults.items():
+                    if kwargs.get(k, v) != v:
+                        matches = False
+                        break
+                if not matches:
+                    continue
+                unicode_kwargs = dict([(k, force_unicode(v)) for (k, v) in kwargs.items()])
+                candidate = (prefix_norm + result) % unicode_kwargs
+            if self._reverse_regex(_prefix, pattern).search(candidate):
+                return candidate
         # lookup_view can be URL label, or dotted path, or callable, Any of
         # these can be passed in at the top, but callables are not friendly in
         # error messages.
@@ -419,6 +569,22 @@ def resolve(path, urlconf=None):
         urlconf = get_urlconf()
     return get_resolver(urlconf).resolve(path)
 
+def _reverse_cache_key(urlconf, viewname, args, kwargs, prefix, current_app):
+    """
+    Returns the key reverse() remembers a URL under, or None if the URL can't
+    be cached. The arguments are keyed by their type and by the string they
+    are substituted with.
+    """
+    try:
+        key = (urlconf, get_language(), viewname,
+               tuple([(arg.__class__, force_unicode(arg)) for arg in args]),
+               frozenset([(k, v.__class__, force_unicode(v)) for k, v in kwargs.items()]),
+               prefix, current_app)
+        hash(key)
+    except (TypeError, UnicodeError):
+        return None
+    return key
+
 def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current_app=None):
     if urlconf is None:
         urlconf = get_urlconf()
@@ -429,6 +595,12 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current
     if prefix is None:
         prefix = get_script_prefix()
 
+    key = _reverse_cache_key(urlconf, viewname, args, kwargs, prefix, current_app)
+    if key is not None:
+        url = _reverse_cache.get(key)
+        if url is not None:
+            return url
+
     if not isinstance(viewname, basestring):
         view = viewname
     else:
@@ -473,7 +645,10 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current
         if ns_pattern:
             resolver = get_ns_resolver(ns_pattern, resolver)
 
-    return iri_to_uri(resolver._reverse_with_prefix(view, prefix, *args, **kwargs))
+    url = iri_to_uri(resolver._reverse_with_prefix(view, prefix, *args, **kwargs))
+    if key is not None:
+        _reverse_cache[key] = url
+    return url
 
 reverse_lazy = lazy(reverse, str)
 
@@ -484,6 +659,7 @@ def clear_url_caches():
     _resolver_cache.clear()
     _ns_resolver_cache.clear()
     _callable_cache.clear()
+    _reverse_cache.clear()
 
 def set_script_prefix(prefix):
     """
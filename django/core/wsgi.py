@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.handlers.wsgi import WSGIHandler
 
 
@@ -10,4 +11,7 @@ def get_wsgi_application():
     case the internal WSGI implementation changes or moves in the future.
 
     """
+    if settings.TEMPLATE_PRELOAD:
+        from django.template.loader import preload_templates
+        preload_templates()
     return WSGIHandler()
@@ -39,13 +39,20 @@ class DefaultConnectionProxy(object):
 connection = DefaultConnectionProxy()
 backend = load_backend(connection.settings_dict['ENGINE'])
 
-# Register an event that closes the database connection
-# when a Django request is finished.
+# Register an event that closes the database connection when a Django
+# request is finished, unless it may be reused (see CONN_MAX_AGE).
 def close_connection(**kwargs):
     for conn in connections.all():
-        conn.close()
+        conn.close_if_unusable_or_obsolete()
 signals.request_finished.connect(close_connection)
 
+# Register an event that drops persistent connections which went bad or
+# outlived their maximum age when a Django request is started.
+def close_old_connections(**kwargs):
+    for conn in connections.all():
+        conn.close_if_unusable_or_obsolete()
+signals.request_started.connect(close_old_connections)
+
 # Register an event that resets connection.queries
 # when a Django request is started.
 def reset_queries(**kwargs):
@@ -53,6 +60,12 @@ def reset_queries(**kwargs):
         conn.queries = []
 signals.request_started.connect(reset_queries)
 
+# Register events that profile the queries of a sample of the requests (see
+# QUERY_PROFILING_RATE).
+from django.db.backends import profiling
+signals.request_started.connect(profiling.start_request_profile)
+signals.request_finished.connect(profiling.finish_request_profile)
+
 # Register an event that rolls back the connections
 # when a Django request has an exception.
 def _rollback_on_exception(**kwargs):
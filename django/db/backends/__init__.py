@@ -5,10 +5,11 @@ try:
 except ImportError:
     import dummy_thread as thread
 from contextlib import contextmanager
+import time
 
 from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
-from django.db.backends import util
+from django.db.backends import profiling, util
 from django.db.transaction import TransactionManagementError
 from django.utils.importlib import import_module
 from django.utils.timezone import is_aware
@@ -39,6 +40,14 @@ class BaseDatabaseWrapper(object):
         self._thread_ident = thread.get_ident()
         self.allow_thread_sharing = allow_thread_sharing
 
+        # The QuerySet cache generations to invalidate again at the end of the
+        # current transaction (see django.db.models.query_cache).
+        self.query_cache_keys = set()
+
+        # Connection persistence related attributes
+        self.close_at = None
+        self.errors_occurred = False
+
     def __eq__(self, other):
         return self.alias == other.alias
 
@@ -119,6 +128,8 @@ class BaseDatabaseWrapper(object):
             raise TransactionManagementError("Transaction managed block ended with "
                 "pending COMMIT/ROLLBACK")
         self._dirty = False
+        if not self.is_managed():
+            self._transaction_ended()
 
     def validate_thread_sharing(self):
         """
@@ -190,6 +201,7 @@ class BaseDatabaseWrapper(object):
             if not flag and self.is_dirty():
                 self._commit()
                 self.set_clean()
+                self._transaction_ended()
         else:
             raise TransactionManagementError("This code isn't under transaction "
                 "management")
@@ -222,6 +234,7 @@ class BaseDatabaseWrapper(object):
         self.validate_thread_sharing()
         self._commit()
         self.set_clean()
+        self._transaction_ended()
 
     def rollback(self):
         """
@@ -230,6 +243,12 @@ class BaseDatabaseWrapper(object):
         self.validate_thread_sharing()
         self._rollback()
         self.set_clean()
+        self._transaction_ended()
+
+    def _transaction_ended(self):
+        if self.query_cache_keys:
+            from django.db.models.query_cache import invalidate_after_transaction
+            invalidate_after_transaction(self)
 
     def savepoint(self):
         """
@@ -299,13 +318,78 @@ class BaseDatabaseWrapper(object):
             self.connection.close()
             self.connection = None
 
+    def is_usable(self):
+        """
+        Tests if the database connection is usable. This function may assume
+        that self.connection is not None. Backends should override this with
+        the cheapest round trip to the server they have.
+        """
+        return True
+
+    def close_if_unusable_or_obsolete(self):
+        """
+        Closes the current connection if unrecoverable errors have occurred,
+        or if it outlived its maximum age (the CONN_MAX_AGE setting). Called
+        at the start and at the end of each request.
+        """
+        if self.connection is None:
+            return
+        max_age = self.settings_dict['CONN_MAX_AGE']
+        if max_age == 0 or (self.close_at is not None and
+                            time.time() >= self.close_at):
+            self.close()
+            return
+        if not self.is_managed():
+            # Don't carry an implicitly opened transaction over to the next
+            # request; closing the connection would have rolled it back.
+            try:
+                self._rollback()
+            except Exception:
+                self.errors_occurred = True
+        if self.errors_occurred:
+            if self.is_usable():
+                self.errors_occurred = False
+            else:
+                self.close()
+
+    def _connection_opened(self):
+        """
+        Resets the persistence related state when a new connection has been
+        established.
+        """
+        max_age = self.settings_dict['CONN_MAX_AGE']
+        self.close_at = None if max_age is None else time.time() + max_age
+        self.errors_occurred = False
+
     def cursor(self):
+        return self._prepare_cursor(self._cursor)
+
+    def chunked_cursor(self):
+        """
+        Returns a cursor that streams the results of a query from the
+        database server as they are fetched, rather than reading the whole
+        result set into client memory first. Backends without such cursors
+        return a regular cursor.
+        """
+        return self.cursor()
+
+    def _prepare_cursor(self, create_cursor):
+        """
+        Calls 'create_cursor' to get a cursor from the backend, and wraps it
+        for use by Django.
+        """
         self.validate_thread_sharing()
+        connection = self.connection
         if (self.use_debug_cursor or
             (self.use_debug_cursor is None and settings.DEBUG)):
-            cursor = self.make_debug_cursor(self._cursor())
+            cursor = self.make_debug_cursor(create_cursor())
         else:
-            cursor = util.CursorWrapper(self._cursor(), self)
+            cursor = util.CursorWrapper(create_cursor(), self)
+        profile = profiling.get_profile()
+        if profile is not None:
+            cursor = util.CursorProfileWrapper(cursor, self, profile)
+        if self.connection is not connection:
+            self._connection_opened()
         return cursor
 
     def make_debug_cursor(self, cursor):
@@ -327,8 +411,14 @@ class BaseDatabaseFeatures(object):
     ignores_nulls_in_unique_constraints = True
 
     can_use_chunked_reads = True
+    # Can the backend stream query results with server-side cursors?
+    has_server_side_cursors = False
     can_return_id_from_insert = False
+    can_return_ids_from_bulk_insert = False
     has_bulk_insert = False
+    # The maximum number of parameters a single query may have, or None if
+    # there is no (known) limit.
+    max_query_params = None
     uses_autocommit = False
     uses_savepoints = False
     can_combine_inserts_with_and_without_auto_increment_pk = False
@@ -470,6 +560,16 @@ class BaseDatabaseOperations(object):
         """
         return None
 
+    def bulk_batch_size(self, fields, objs):
+        """
+        Returns the maximum number of the objects in 'objs' that can be
+        inserted in a single query, when 'fields' are inserted for each.
+        """
+        max_params = self.connection.features.max_query_params
+        if max_params is None or not fields:
+            return len(objs)
+        return max(max_params // len(fields), 1)
+
     def date_extract_sql(self, lookup_type, field_name):
         """
         Given a lookup_type of 'year', 'month' or 'day', returns the SQL that
@@ -528,6 +628,14 @@ class BaseDatabaseOperations(object):
         """
         return cursor.fetchone()[0]
 
+    def fetch_returned_insert_ids(self, cursor):
+        """
+        Given a cursor object that has just performed an INSERT...RETURNING
+        statement inserting several rows into a table that has an
+        auto-incrementing ID, returns the list of newly created IDs.
+        """
+        return [row[0] for row in cursor.fetchall()]
+
     def field_cast_sql(self, db_type):
         """
         Given a column type (e.g. 'BLOB', 'VARCHAR'), returns the SQL necessary
@@ -26,6 +26,7 @@ if (version < (1,2,1) or (version[:3] == (1, 2, 1) and
 
 from MySQLdb.converters import conversions, Thing2Literal
 from MySQLdb.constants import FIELD_TYPE, CLIENT
+from MySQLdb.cursors import SSCursor
 
 from django.db import utils
 from django.db.backends import *
@@ -153,6 +154,7 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     related_fields_match_type = True
     allow_sliced_subqueries = False
     has_bulk_insert = True
+    has_server_side_cursors = True
     has_select_for_update = True
     has_select_for_update_nowait = False
     supports_forward_references = False
@@ -358,7 +360,23 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                 self.connection = None
         return False
 
-    def _cursor(self):
+    def chunked_cursor(self):
+        """
+        Returns an unbuffered cursor, so that rows are only sent by the server
+        as they're fetched. Note that no other query can be run on the
+        connection until all the rows have been read.
+        """
+        return self._prepare_cursor(lambda: self._cursor(cursorclass=SSCursor))
+
+    def is_usable(self):
+        try:
+            self.connection.ping()
+        except Database.Error:
+            return False
+        else:
+            return True
+
+    def _cursor(self, cursorclass=None):
         new_connection = False
         if not self._valid_connection():
             new_connection = True
@@ -390,7 +408,7 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             self.features.uses_savepoints = \
                 self.get_server_version() >= (5, 0, 3)
             connection_created.send(sender=self.__class__, connection=self)
-        cursor = self.connection.cursor()
+        cursor = self.connection.cursor(cursorclass)
         if new_connection:
             # SQL_AUTO_IS_NULL in MySQL controls whether an AUTO_INCREMENT column
             # on a recently-inserted row will return when the field is tested for
@@ -83,6 +83,7 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     ignores_nulls_in_unique_constraints = False
     has_bulk_insert = True
     supports_tablespaces = True
+    max_query_params = 2 ** 16 - 1
 
 class DatabaseOperations(BaseDatabaseOperations):
     compiler_module = "django.db.backends.oracle.compiler"
@@ -456,6 +457,15 @@ class DatabaseWrapper(BaseDatabaseWrapper):
     def _valid_connection(self):
         return self.connection is not None
 
+    def is_usable(self):
+        try:
+            # Use a cx_Oracle cursor directly, bypassing Django's utilities.
+            self.connection.cursor().execute("SELECT 1 FROM DUAL")
+        except Database.Error:
+            return False
+        else:
+            return True
+
     def _connect_string(self):
         settings_dict = self.settings_dict
         if not settings_dict['HOST'].strip():
@@ -0,0 +1,164 @@
+"""
+Profiling of the queries made while handling a request.
+
+When the QUERY_PROFILING_RATE setting is above 0, that fraction of the
+requests is profiled: every query they make is recorded along with its
+duration and the line of code outside of Django that made it. When the
+request finishes, the profile is sent with the queries_profiled signal and
+logged; queries with the same SQL that are repeated with different
+parameters more than QUERY_PROFILING_REPEAT_THRESHOLD times, which usually
+means related objects are fetched one by one in a loop (the "N+1 queries"
+problem), are logged as a warning.
+
+Queries made in a block of code can also be profiled with::
+
+    with QueryProfile() as profile:
+        ...
+"""
+
+import os
+import random
+import sys
+import threading
+
+import django
+from django.conf import settings
+from django.db.backends.signals import queries_profiled
+from django.utils.log import getLogger
+
+logger = getLogger('django.db.backends')
+
+_local = threading.local()
+
+_django_path = os.path.dirname(django.__file__) + os.sep
+
+def get_profile():
+    """
+    Returns the QueryProfile that records the queries of the current thread,
+    or None.
+    """
+    return getattr(_local, 'profile', None)
+
+def get_caller():
+    """
+    Returns the (filename, line number, function name) of the innermost
+    frame of the stack that isn't in Django itself, or None.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_django_path):
+            return (filename, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class QueryProfile(object):
+    """
+    The queries made while the profile is active in a thread. request is True
+    for the profiles of requests.
+    """
+    def __init__(self, request=False):
+        self.request = request
+        self.queries = []
+        self.total_time = 0.0
+        self._previous = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        self._previous = get_profile()
+        _local.profile = self
+
+    def stop(self):
+        _local.profile = self._previous
+        self._previous = None
+
+    def record(self, alias, sql, params, duration, caller):
+        self.queries.append({
+            'alias': alias,
+            'sql': sql,
+            'params': params,
+            'time': duration,
+            'caller': caller,
+        })
+        self.total_time += duration
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def shapes(self):
+        """
+        Returns a dict mapping the SQL of the queries, without their
+        parameters, to the list of queries that executed it.
+        """
+        shapes = {}
+        for query in self.queries:
+            shapes.setdefault((query['alias'], query['sql']), []).append(query)
+        return shapes
+
+    def duplicates(self):
+        """
+        Returns a dict mapping the SQL of the queries that were executed more
+        than once to the number of times they were.
+        """
+        return dict([(sql, len(queries))
+                     for (alias, sql), queries in self.shapes().items()
+                     if len(queries) > 1])
+
+    def repeated_queries(self, threshold=None):
+        """
+        Returns a list of (sql, count, callers) tuples for the queries that
+        were executed with different parameters more than threshold times
+        (QUERY_PROFILING_REPEAT_THRESHOLD by default), the most repeated
+        first. callers is the set of lines of code that made them.
+        """
+        if threshold is None:
+            threshold = settings.QUERY_PROFILING_REPEAT_THRESHOLD
+        repeated = []
+        for (alias, sql), queries in self.shapes().items():
+            if len(queries) <= threshold:
+                continue
+            if len(set([repr(query['params']) for query in queries])) < 2:
+                continue
+            callers = set([query['caller'] for query in queries])
+            repeated.append((sql, len(queries), callers))
+        repeated.sort(key=lambda item: -item[1])
+        return repeated
+
+
+def start_request_profile(**kwargs):
+    profile = get_profile()
+    if profile is not None and profile.request:
+        # The previous request of this thread didn't finish.
+        profile.stop()
+    rate = settings.QUERY_PROFILING_RATE
+    if rate and random.random() < rate:
+        QueryProfile(request=True).start()
+
+def finish_request_profile(**kwargs):
+    profile = get_profile()
+    if profile is None or not profile.request:
+        return
+    profile.stop()
+    queries_profiled.send(sender=QueryProfile, profile=profile)
+    repeated = profile.repeated_queries()
+    extra = {
+        'count': profile.count,
+        'duration': profile.total_time,
+        'repeated_queries': repeated,
+        'query_profile': profile,
+    }
+    if repeated:
+        sql, count, callers = repeated[0]
+        logger.warning('%d queries in %.3fs, including %d times: %s',
+            profile.count, profile.total_time, count, sql, extra=extra)
+    else:
+        logger.debug('%d queries in %.3fs', profile.count,
+            profile.total_time, extra=extra)
@@ -1,3 +1,5 @@
 from django.dispatch import Signal
 
 connection_created = Signal(providing_args=["connection"])
+
+queries_profiled = Signal(providing_args=["profile"])
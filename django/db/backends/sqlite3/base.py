@@ -84,6 +84,7 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     supports_mixed_date_datetime_comparisons = False
     has_bulk_insert = True
     can_combine_inserts_with_and_without_auto_increment_pk = True
+    max_query_params = 999
 
     def _supports_stddev(self):
         """Confirm support for STDDEV and related stats functions
@@ -203,6 +204,13 @@ class DatabaseOperations(BaseDatabaseOperations):
         # No field, or the field isn't known to be a decimal or integer
         return value
 
+    def bulk_batch_size(self, fields, objs):
+        """
+        SQLite has a compound select limit of 500 on top of its limit on
+        query parameters, and bulk inserts are done with compound selects.
+        """
+        return min(500, super(DatabaseOperations, self).bulk_batch_size(fields, objs))
+
     def bulk_insert_sql(self, fields, num_values):
         res = []
         res.append("SELECT %s" % ", ".join(
@@ -4,6 +4,8 @@ import hashlib
 from time import time
 
 from django.conf import settings
+from django.db.backends import profiling
+from django.db.utils import DatabaseError
 from django.utils.log import getLogger
 from django.utils.timezone import utc
 
@@ -30,14 +32,59 @@ class CursorWrapper(object):
     def __iter__(self):
         return iter(self.cursor)
 
+    def execute(self, sql, params=None):
+        self.set_dirty()
+        try:
+            if params is None:
+                return self.cursor.execute(sql)
+            return self.cursor.execute(sql, params)
+        except DatabaseError:
+            # The connection may be unusable; it's checked before being
+            # reused for another request.
+            self.db.errors_occurred = True
+            raise
+
+    def executemany(self, sql, param_list):
+        self.set_dirty()
+        try:
+            return self.cursor.executemany(sql, param_list)
+        except DatabaseError:
+            self.db.errors_occurred = True
+            raise
+
+
+class CursorProfileWrapper(CursorWrapper):
+    """
+    Records the queries executed through the wrapped cursor (which may be a
+    CursorDebugWrapper) in a QueryProfile.
+    """
+    def __init__(self, cursor, db, profile):
+        super(CursorProfileWrapper, self).__init__(cursor, db)
+        self.profile = profile
+
+    def execute(self, sql, params=None):
+        start = time()
+        try:
+            return super(CursorProfileWrapper, self).execute(sql, params)
+        finally:
+            self.profile.record(self.db.alias, sql, params, time() - start,
+                                profiling.get_caller())
+
+    def executemany(self, sql, param_list):
+        start = time()
+        try:
+            return super(CursorProfileWrapper, self).executemany(sql, param_list)
+        finally:
+            self.profile.record(self.db.alias, sql, param_list, time() - start,
+                                profiling.get_caller())
+
 
 class CursorDebugWrapper(CursorWrapper):
 
     def execute(self, sql, params=()):
-        self.set_dirty()
         start = time()
         try:
-            return self.cursor.execute(sql, params)
+            return super(CursorDebugWrapper, self).execute(sql, params)
         finally:
             stop = time()
             duration = stop - start
@@ -51,10 +98,9 @@ class CursorDebugWrapper(CursorWrapper):
             )
 
     def executemany(self, sql, param_list):
-        self.set_dirty()
         start = time()
         try:
-            return self.cursor.executemany(sql, param_list)
+            return super(CursorDebugWrapper, self).executemany(sql, param_list)
         finally:
             stop = time()
             duration = stop - start
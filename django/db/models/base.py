@@ -13,6 +13,7 @@ from django.db.models.fields.related import (ManyToOneRel,
     OneToOneField, add_lazy_relation)
 from django.db import (connections, router, transaction, DatabaseError,
     DEFAULT_DB_ALIAS)
+from django.db.models import query_cache
 from django.db.models.query import Q
 from django.db.models.query_utils import DeferredAttribute
 from django.db.models.deletion import Collector
@@ -270,13 +271,51 @@ class ModelState(object):
         # Necessary for correct validation of new instances of objects with explicit (non-auto) PKs.
         # This impacts validation only; it has no effect on the actual save.
         self.adding = True
+        # The results of the QuerySet with auto_prefetch() this instance was
+        # fetched by (see AutoPrefetchGroup).
+        self.auto_prefetch_group = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['auto_prefetch_group'] = None
+        return state
+
+# Maps model classes to the result of get_from_db_info().
+_from_db_info = {}
+
+def get_from_db_info(cls):
+    """
+    Returns the number of fields of the model that aren't deferred, and the
+    attnames of those that have a data descriptor on the class, for
+    Model.from_db(). The number is None if from_db() must call __init__().
+    """
+    if (cls.__init__.im_func is not Model.__init__.im_func or
+            cls.__setattr__ != object.__setattr__):
+        return None, ()
+    init_count = 0
+    setters = []
+    for field in cls._meta.fields:
+        descriptor = None
+        for klass in cls.__mro__:
+            if field.attname in klass.__dict__:
+                descriptor = klass.__dict__[field.attname]
+                break
+        if isinstance(descriptor, DeferredAttribute):
+            continue
+        init_count += 1
+        if hasattr(descriptor, '__set__'):
+            setters.append(field.attname)
+    return init_count, tuple(setters)
+
 
 class Model(object):
     __metaclass__ = ModelBase
     _deferred = False
 
     def __init__(self, *args, **kwargs):
-        signals.pre_init.send(sender=self.__class__, args=args, kwargs=kwargs)
+        cls = self.__class__
+        if signals.pre_init.has_listeners(cls):
+            signals.pre_init.send(sender=cls, args=args, kwargs=kwargs)
 
         # Set up the storage for instance state
         self._state = ModelState()
@@ -366,7 +405,42 @@ class Model(object):
             if kwargs:
                 raise TypeError("'%s' is an invalid keyword argument for this function" % kwargs.keys()[0])
         super(Model, self).__init__()
-        signals.post_init.send(sender=self.__class__, instance=self)
+        if signals.post_init.has_listeners(cls):
+            signals.post_init.send(sender=cls, instance=self)
+
+    @classmethod
+    def from_db(cls, using, attnames, values):
+        """
+        Returns an instance of the model loaded from the database 'using',
+        whose fields with the given attnames have the given values.
+
+        When attnames contains all the fields that aren't deferred, the values
+        are assigned directly instead of going through __init__(), unless the
+        model overrides __init__() or __setattr__() or receivers of pre_init
+        are connected for it.
+        """
+        try:
+            init_count, setters = _from_db_info[cls]
+        except KeyError:
+            init_count, setters = _from_db_info[cls] = get_from_db_info(cls)
+        if len(attnames) != init_count or signals.pre_init.has_listeners(cls):
+            obj = cls(**dict(izip(attnames, values)))
+            obj._state.db = using
+            obj._state.adding = False
+            return obj
+        obj = cls.__new__(cls)
+        state = obj._state = ModelState(using)
+        state.adding = False
+        obj_dict = obj.__dict__
+        obj_dict.update(izip(attnames, values))
+        # Fields with descriptors (e.g. file fields) are assigned like
+        # __init__() does.
+        for attname in setters:
+            if attname in obj_dict:
+                setattr(obj, attname, obj_dict.pop(attname))
+        if signals.post_init.has_listeners(cls):
+            signals.post_init.send(sender=cls, instance=obj)
+        return obj
 
     def __repr__(self):
         try:
@@ -482,7 +556,8 @@ class Model(object):
         else:
             meta = cls._meta
 
-        if origin and not meta.auto_created:
+        if (origin and not meta.auto_created and
+                signals.pre_save.has_listeners(origin)):
             signals.pre_save.send(sender=origin, instance=self, raw=raw, using=using)
 
         # If we are in a raw save, save the object exactly as presented.
@@ -559,8 +634,13 @@ class Model(object):
         # Once saved, this is no longer a to-be-added instance.
         self._state.adding = False
 
+        if origin:
+            query_cache.invalidate_rows(query_cache.model_tables(origin), [self.pk],
+                                        using)
+
         # Signal that the save is complete
-        if origin and not meta.auto_created:
+        if (origin and not meta.auto_created and
+                signals.post_save.has_listeners(origin)):
             signals.post_save.send(sender=origin, instance=self,
                 created=(not record_exists), raw=raw, using=using)
 
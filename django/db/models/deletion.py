@@ -3,6 +3,8 @@ from operator import attrgetter
 
 from django.db import connections, transaction, IntegrityError
 from django.db.models import signals, sql
+from django.db.models.query_cache import (invalidate_rows, invalidate_tables,
+    model_tables)
 from django.utils.datastructures import SortedDict
 
 
@@ -235,7 +237,8 @@ class Collector(object):
 
         # send pre_delete signals
         for model, obj in self.instances_with_model():
-            if not model._meta.auto_created:
+            if (not model._meta.auto_created and
+                    signals.pre_delete.has_listeners(model)):
                 signals.pre_delete.send(
                     sender=model, instance=obj, using=self.using
                 )
@@ -263,9 +266,21 @@ class Collector(object):
             pk_list = [obj.pk for obj in instances]
             query.delete_batch(pk_list, self.using)
 
+        # invalidate cached querysets reading from the modified tables
+        for model, instances_for_fieldvalues in self.field_updates.iteritems():
+            for instances in instances_for_fieldvalues.itervalues():
+                invalidate_rows(model_tables(model), [obj.pk for obj in instances],
+                                self.using)
+        for model in self.batches:
+            invalidate_tables(model_tables(model), bulk=True, using=self.using)
+        for model, instances in self.data.iteritems():
+            invalidate_rows(model_tables(model), [obj.pk for obj in instances],
+                            self.using)
+
         # send post_delete signals
         for model, obj in self.instances_with_model():
-            if not model._meta.auto_created:
+            if (not model._meta.auto_created and
+                    signals.post_delete.has_listeners(model)):
                 signals.post_delete.send(
                     sender=model, instance=obj, using=self.using
                 )
@@ -2,11 +2,11 @@ from operator import attrgetter
 
 from django.db import connection, router
 from django.db.backends import util
-from django.db.models import signals, get_model
+from django.db.models import query_cache, signals, get_model
 from django.db.models.fields import (AutoField, Field, IntegerField,
     PositiveIntegerField, PositiveSmallIntegerField, FieldDoesNotExist)
 from django.db.models.related import RelatedObject
-from django.db.models.query import QuerySet
+from django.db.models.query import QuerySet, auto_prefetch_related
 from django.db.models.query_utils import QueryWrapper
 from django.db.models.deletion import CASCADE
 from django.utils.encoding import smart_unicode
@@ -236,10 +236,15 @@ class SingleRelatedObjectDescriptor(object):
         db = router.db_for_read(self.related.model, **db_hints)
         return self.related.model._base_manager.using(db)
 
-    def get_prefetch_query_set(self, instances):
+    def get_prefetch_query_set(self, instances, queryset=None):
+        if queryset is None:
+            queryset = self.get_query_set(instance=instances[0])
+        else:
+            queryset = queryset.using(queryset._db or
+                router.db_for_read(self.related.model, instance=instances[0]))
         vals = set(instance._get_pk_val() for instance in instances)
         params = {'%s__pk__in' % self.related.field.name: vals}
-        return (self.get_query_set(instance=instances[0]).filter(**params),
+        return (queryset.filter(**params),
                 attrgetter(self.related.field.attname),
                 lambda obj: obj._get_pk_val(),
                 True,
@@ -251,6 +256,8 @@ class SingleRelatedObjectDescriptor(object):
         try:
             rel_obj = getattr(instance, self.cache_name)
         except AttributeError:
+            if auto_prefetch_related(instance, self.related.get_accessor_name(), self.is_cached):
+                return self.__get__(instance)
             params = {'%s__pk' % self.related.field.name: instance._get_pk_val()}
             try:
                 rel_obj = self.get_query_set(instance=instance).get(**params)
@@ -323,14 +330,19 @@ class ReverseSingleRelatedObjectDescriptor(object):
         else:
             return QuerySet(self.field.rel.to).using(db)
 
-    def get_prefetch_query_set(self, instances):
+    def get_prefetch_query_set(self, instances, queryset=None):
+        if queryset is None:
+            queryset = self.get_query_set(instance=instances[0])
+        else:
+            queryset = queryset.using(queryset._db or
+                router.db_for_read(self.field.rel.to, instance=instances[0]))
         vals = set(getattr(instance, self.field.attname) for instance in instances)
         other_field = self.field.rel.get_related_field()
         if other_field.rel:
             params = {'%s__pk__in' % self.field.rel.field_name: vals}
         else:
             params = {'%s__in' % self.field.rel.field_name: vals}
-        return (self.get_query_set(instance=instances[0]).filter(**params),
+        return (queryset.filter(**params),
                 attrgetter(self.field.rel.field_name),
                 attrgetter(self.field.attname),
                 True,
@@ -342,6 +354,8 @@ class ReverseSingleRelatedObjectDescriptor(object):
         try:
             rel_obj = getattr(instance, self.cache_name)
         except AttributeError:
+            if auto_prefetch_related(instance, self.field.name, self.is_cached):
+                return self.__get__(instance)
             val = getattr(instance, self.field.attname)
             if val is None:
                 rel_obj = None
@@ -452,6 +466,9 @@ class ForeignRelatedObjectsDescriptor(object):
         rel_field = self.related.field
         rel_model = self.related.model
         attname = rel_field.rel.get_related_field().attname
+        accessor_name = self.related.get_accessor_name()
+        cache_name = rel_field.related_query_name()
+        is_fetched = lambda obj: cache_name in getattr(obj, '_prefetched_objects_cache', ())
 
         class RelatedManager(superclass):
             def __init__(self, instance):
@@ -462,18 +479,27 @@ class ForeignRelatedObjectsDescriptor(object):
                 }
                 self.model = rel_model
 
+            def all(self):
+                # Only all() can use prefetched objects, so it's the only
+                # method that prefetches automatically.
+                if not is_fetched(self.instance):
+                    auto_prefetch_related(self.instance, accessor_name, is_fetched)
+                return super(RelatedManager, self).all()
+
             def get_query_set(self):
                 try:
-                    return self.instance._prefetched_objects_cache[rel_field.related_query_name()]
+                    return self.instance._prefetched_objects_cache[cache_name]
                 except (AttributeError, KeyError):
                     db = self._db or router.db_for_read(self.model, instance=self.instance)
                     return super(RelatedManager, self).get_query_set().using(db).filter(**self.core_filters)
 
-            def get_prefetch_query_set(self, instances):
-                db = self._db or router.db_for_read(self.model, instance=instances[0])
+            def get_prefetch_query_set(self, instances, queryset=None):
+                if queryset is None:
+                    queryset = super(RelatedManager, self).get_query_set()
+                db = queryset._db or self._db or router.db_for_read(self.model, instance=instances[0])
                 query = {'%s__%s__in' % (rel_field.name, attname):
                              set(getattr(obj, attname) for obj in instances)}
-                qs = super(RelatedManager, self).get_query_set().using(db).filter(**query)
+                qs = queryset.using(db).filter(**query)
                 return (qs,
                         attrgetter(rel_field.get_attname()),
                         attrgetter(attname),
@@ -528,7 +554,7 @@ def create_many_related_manager(superclass, rel):
     class ManyRelatedManager(superclass):
         def __init__(self, model=None, query_field_name=None, instance=None, symmetrical=None,
                      source_field_name=None, target_field_name=None, reverse=False,
-                     through=None, prefetch_cache_name=None):
+                     through=None, prefetch_cache_name=None, attname=None):
             super(ManyRelatedManager, self).__init__()
             self.model = model
             self.query_field_name = query_field_name
@@ -540,10 +566,23 @@ def create_many_related_manager(superclass, rel):
             self.reverse = reverse
             self.through = through
             self.prefetch_cache_name = prefetch_cache_name
+            # The name of the attribute of the instance this manager is
+            # accessed through.
+            self.attname = attname
             self._pk_val = self.instance.pk
             if self._pk_val is None:
                 raise ValueError("%r instance needs to have a primary key value before a many-to-many relationship can be used." % instance.__class__.__name__)
 
+        def is_fetched(self, instance):
+            return self.prefetch_cache_name in getattr(instance, '_prefetched_objects_cache', ())
+
+        def all(self):
+            # Only all() can use prefetched objects, so it's the only method
+            # that prefetches automatically.
+            if self.attname is not None and not self.is_fetched(self.instance):
+                auto_prefetch_related(self.instance, self.attname, self.is_fetched)
+            return super(ManyRelatedManager, self).all()
+
         def get_query_set(self):
             try:
                 return self.instance._prefetched_objects_cache[self.prefetch_cache_name]
@@ -551,13 +590,15 @@ def create_many_related_manager(superclass, rel):
                 db = self._db or router.db_for_read(self.instance.__class__, instance=self.instance)
                 return super(ManyRelatedManager, self).get_query_set().using(db)._next_is_sticky().filter(**self.core_filters)
 
-        def get_prefetch_query_set(self, instances):
+        def get_prefetch_query_set(self, instances, queryset=None):
             instance = instances[0]
             from django.db import connections
-            db = self._db or router.db_for_read(instance.__class__, instance=instance)
+            if queryset is None:
+                queryset = super(ManyRelatedManager, self).get_query_set()
+            db = queryset._db or self._db or router.db_for_read(instance.__class__, instance=instance)
             query = {'%s__pk__in' % self.query_field_name:
                          set(obj._get_pk_val() for obj in instances)}
-            qs = super(ManyRelatedManager, self).get_query_set().using(db)._next_is_sticky().filter(**query)
+            qs = queryset.using(db)._next_is_sticky().filter(**query)
 
             # M2M: need to annotate the query in order to get the primary model
             # that the secondary model was actually related to. We know that
@@ -677,6 +718,8 @@ def create_many_related_manager(superclass, rel):
                     signals.m2m_changed.send(sender=self.through, action='post_add',
                         instance=self.instance, reverse=self.reverse,
                         model=self.model, pk_set=new_ids, using=db)
+                    query_cache.invalidate_m2m_relations(self.through,
+                        self.instance, self.model, new_ids, db)
 
         def _remove_items(self, source_field_name, target_field_name, *objs):
             # source_field_name: the PK colname in join table for the source object
@@ -712,6 +755,8 @@ def create_many_related_manager(superclass, rel):
                     signals.m2m_changed.send(sender=self.through, action="post_remove",
                         instance=self.instance, reverse=self.reverse,
                         model=self.model, pk_set=old_ids, using=db)
+                    query_cache.invalidate_m2m_relations(self.through,
+                        self.instance, self.model, old_ids, db)
 
         def _clear_items(self, source_field_name):
             db = router.db_for_write(self.through, instance=self.instance)
@@ -731,6 +776,8 @@ def create_many_related_manager(superclass, rel):
                 signals.m2m_changed.send(sender=self.through, action="post_clear",
                     instance=self.instance, reverse=self.reverse,
                     model=self.model, pk_set=None, using=db)
+                query_cache.invalidate_m2m_relations(self.through,
+                    self.instance, self.model, None, db)
 
     return ManyRelatedManager
 
@@ -763,6 +810,7 @@ class ManyRelatedObjectsDescriptor(object):
             model=rel_model,
             query_field_name=self.related.field.name,
             prefetch_cache_name=self.related.field.related_query_name(),
+            attname=self.related.get_accessor_name(),
             instance=instance,
             symmetrical=False,
             source_field_name=self.related.field.m2m_reverse_field_name(),
@@ -820,6 +868,7 @@ class ReverseManyRelatedObjectsDescriptor(object):
             model=self.field.rel.to,
             query_field_name=self.field.related_query_name(),
             prefetch_cache_name=self.field.name,
+            attname=self.field.name,
             instance=instance,
             symmetrical=self.field.rel.symmetrical,
             source_field_name=self.field.m2m_field_name(),
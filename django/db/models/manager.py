@@ -139,6 +139,9 @@ class Manager(object):
     def bulk_create(self, *args, **kwargs):
         return self.get_query_set().bulk_create(*args, **kwargs)
 
+    def bulk_update(self, *args, **kwargs):
+        return self.get_query_set().bulk_update(*args, **kwargs)
+
     def filter(self, *args, **kwargs):
         return self.get_query_set().filter(*args, **kwargs)
 
@@ -175,6 +178,9 @@ class Manager(object):
     def prefetch_related(self, *args, **kwargs):
         return self.get_query_set().prefetch_related(*args, **kwargs)
 
+    def auto_prefetch(self, *args, **kwargs):
+        return self.get_query_set().auto_prefetch(*args, **kwargs)
+
     def values(self, *args, **kwargs):
         return self.get_query_set().values(*args, **kwargs)
 
@@ -196,6 +202,9 @@ class Manager(object):
     def using(self, *args, **kwargs):
         return self.get_query_set().using(*args, **kwargs)
 
+    def cache(self, *args, **kwargs):
+        return self.get_query_set().cache(*args, **kwargs)
+
     def exists(self, *args, **kwargs):
         return self.get_query_set().exists(*args, **kwargs)
 
@@ -5,14 +5,18 @@ The main QuerySet implementation. This provides the public API for the ORM.
 import copy
 import itertools
 import sys
+import weakref
 
 from django.core import exceptions
 from django.db import connections, router, transaction, IntegrityError
-from django.db.models.fields import AutoField
+from django.db.models.fields import AutoField, FieldDoesNotExist
 from django.db.models.query_utils import (Q, select_related_descend,
     deferred_class_factory, InvalidQuery)
 from django.db.models.deletion import Collector
+from django.db.models import query_cache
 from django.db.models import sql
+from django.db.models.sql.expressions import SQLPkCase
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE, LOOKUP_SEP
 from django.utils.functional import partition
 
 # Used to control how many objects are worked with at once in some cases (e.g.
@@ -41,6 +45,9 @@ class QuerySet(object):
         self._for_write = False
         self._prefetch_related_lookups = []
         self._prefetch_done = False
+        self._use_query_cache = False
+        self._query_cache_timeout = None
+        self._auto_prefetch = False
 
     ########################
     # PYTHON MAGIC METHODS #
@@ -83,7 +90,14 @@ class QuerySet(object):
             if self._iter:
                 self._result_cache = list(self._iter)
             else:
-                self._result_cache = list(self.iterator())
+                # The result cache must be set before calling iterator(), so
+                # that the results aren't streamed (see iterator()).
+                self._result_cache = []
+                try:
+                    self._result_cache.extend(self._results_iterator())
+                except:
+                    self._result_cache = None
+                    raise
         elif self._iter:
             self._result_cache.extend(self._iter)
         if self._prefetch_related_lookups and not self._prefetch_done:
@@ -98,14 +112,41 @@ class QuerySet(object):
             len(self)
 
         if self._result_cache is None:
-            self._iter = self.iterator()
             self._result_cache = []
+            self._iter = self._results_iterator()
         if self._iter:
             return self._result_iter()
         # Python's list iterator is better than our version when we're just
         # iterating over the cache.
         return iter(self._result_cache)
 
+    def _results_iterator(self):
+        """
+        Returns the iterator used to fill the result cache, which reads from
+        the QuerySet cache if cache() was called.
+        """
+        if self._use_query_cache:
+            iterator = query_cache.cached_results(self)
+        else:
+            iterator = self.iterator()
+        if self._auto_prefetch:
+            iterator = self._auto_prefetch_iterator(iterator)
+        return iterator
+
+    def _auto_prefetch_iterator(self, iterator):
+        """
+        Adds the model instances returned by the iterator to an
+        AutoPrefetchGroup, so that their related objects are prefetched
+        together (see auto_prefetch()).
+        """
+        group = AutoPrefetchGroup(self)
+        for obj in iterator:
+            state = getattr(obj, '_state', None)
+            if state is not None:
+                state.auto_prefetch_group = group
+                group.instances.append(weakref.ref(obj))
+            yield obj
+
     def _result_iter(self):
         pos = 0
         while 1:
@@ -229,10 +270,26 @@ class QuerySet(object):
     # METHODS THAT DO DATABASE QUERIES #
     ####################################
 
-    def iterator(self):
+    def iterator(self, chunk_size=2000):
+        """
+        An iterator over the results from applying this QuerySet to the
+        database. The results aren't cached on the QuerySet and, where the
+        database backend supports it, are streamed from a server-side cursor
+        'chunk_size' rows at a time instead of being read into memory first.
+
+        This is also what fills the result cache when the QuerySet is
+        evaluated, in which case the results end up in memory anyway and are
+        fetched the usual way.
+        """
+        if self._result_cache is not None:
+            return self._iterator()
+        return self._iterator(chunked_fetch=True, chunk_size=chunk_size)
+
+    def _iterator(self, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
         """
         An iterator over the results from applying this QuerySet to the
-        database.
+        database. If 'chunked_fetch' is True, the database backend is asked
+        to stream the results rather than fetching them all at once.
         """
         fill_cache = False
         if connections[self.db].features.supports_select_related:
@@ -269,10 +326,12 @@ class QuerySet(object):
         index_start = len(extra_select)
         aggregate_start = index_start + len(load_fields or self.model._meta.fields)
 
-        skip = None
+        model_cls = self.model
+        if not fill_cache:
+            init_list = [field.attname for field in fields]
         if load_fields and not fill_cache:
-            # Some fields have been deferred, so we have to initialise
-            # via keyword arguments.
+            # Some fields have been deferred, so the instances are created
+            # from a class where they are deferred attributes.
             skip = set()
             init_list = []
             for field in fields:
@@ -289,22 +348,13 @@ class QuerySet(object):
         if fill_cache:
             klass_info = get_klass_info(model, max_depth=max_depth,
                                         requested=requested, only_load=only_load)
-        for row in compiler.results_iter():
+        for row in compiler.results_iter(chunked_fetch, chunk_size):
             if fill_cache:
                 obj, _ = get_cached_row(row, index_start, db, klass_info,
                                         offset=len(aggregate_select))
             else:
-                if skip:
-                    row_data = row[index_start:aggregate_start]
-                    obj = model_cls(**dict(zip(init_list, row_data)))
-                else:
-                    # Omit aggregates in object creation.
-                    obj = model(*row[index_start:aggregate_start])
-
-                # Store the source database of the object
-                obj._state.db = db
-                # This object came from the database; it's not being added.
-                obj._state.adding = False
+                # Omit aggregates in object creation.
+                obj = model_cls.from_db(db, init_list, row[index_start:aggregate_start])
 
             if extra_select:
                 for i, k in enumerate(extra_select):
@@ -378,12 +428,17 @@ class QuerySet(object):
         obj.save(force_insert=True, using=self.db)
         return obj
 
-    def bulk_create(self, objs):
+    def bulk_create(self, objs, batch_size=None):
         """
         Inserts each of the instances into the database. This does *not* call
-        save() on each of the instances, does not send any pre/post save
-        signals, and does not set the primary key attribute if it is an
-        autoincrement field.
+        save() on each of the instances and does not send any pre/post save
+        signals. The primary key attribute is only set if it is an
+        autoincrement field and the database can return the inserted IDs
+        (e.g. PostgreSQL).
+
+        The instances are inserted in batches of at most 'batch_size' objects,
+        further limited by the number of query parameters the database
+        accepts.
         """
         # So this case is fun. When you bulk insert you don't get the primary
         # keys back (if it's an autoincrement), so you can't insert into the
@@ -393,10 +448,12 @@ class QuerySet(object):
         # tables to get the primary keys back, and then doing a single bulk
         # insert into the childmost table. We're punting on these for now
         # because they are relatively rare cases.
+        assert batch_size is None or batch_size > 0
         if self.model._meta.parents:
             raise ValueError("Can't bulk create an inherited model")
         if not objs:
             return objs
+        objs = list(objs)
         self._for_write = True
         connection = connections[self.db]
         fields = self.model._meta.local_fields
@@ -408,13 +465,25 @@ class QuerySet(object):
         try:
             if (connection.features.can_combine_inserts_with_and_without_auto_increment_pk
                 and self.model._meta.has_auto_field):
-                self.model._base_manager._insert(objs, fields=fields, using=self.db)
+                self._batched_insert(objs, fields, batch_size)
             else:
                 objs_with_pk, objs_without_pk = partition(lambda o: o.pk is None, objs)
                 if objs_with_pk:
-                    self.model._base_manager._insert(objs_with_pk, fields=fields, using=self.db)
+                    self._batched_insert(objs_with_pk, fields, batch_size)
                 if objs_without_pk:
-                    self.model._base_manager._insert(objs_without_pk, fields=[f for f in fields if not isinstance(f, AutoField)], using=self.db)
+                    fields = [f for f in fields if not isinstance(f, AutoField)]
+                    # The IDs can only be returned when inserting all the
+                    # rows in one statement, which custom placeholders
+                    # (e.g. for geometry fields) prevent.
+                    return_ids = (connection.features.can_return_ids_from_bulk_insert and
+                        not any(hasattr(f, "get_placeholder") for f in fields))
+                    ids = self._batched_insert(objs_without_pk, fields, batch_size,
+                        return_ids=return_ids)
+                    if ids:
+                        for obj, pk in zip(objs_without_pk, ids):
+                            obj.pk = pk
+            query_cache.invalidate_tables(query_cache.model_tables(self.model),
+                                          using=self.db)
             if forced_managed:
                 transaction.commit(using=self.db)
             else:
@@ -423,6 +492,10 @@ class QuerySet(object):
             if forced_managed:
                 transaction.leave_transaction_management(using=self.db)
 
+        for obj in objs:
+            if obj.pk is not None:
+                obj._state.db = self.db
+                obj._state.adding = False
         return objs
 
     def get_or_create(self, **kwargs):
@@ -532,6 +605,8 @@ class QuerySet(object):
             forced_managed = False
         try:
             rows = query.get_compiler(self.db).execute_sql(None)
+            query_cache.invalidate_tables(query_cache.model_tables(self.model),
+                                          bulk=True, using=self.db)
             if forced_managed:
                 transaction.commit(using=self.db)
             else:
@@ -543,6 +618,98 @@ class QuerySet(object):
         return rows
     update.alters_data = True
 
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Updates the given fields of each of the instances in the database,
+        with a CASE expression on the primary key in batched UPDATE queries
+        instead of a query per instance. Like update(), this does *not* call
+        save() on the instances and does not send any pre/post save signals.
+        Returns the number of rows matched.
+        """
+        assert batch_size is None or batch_size > 0
+        assert self.query.can_filter(), \
+                "Cannot update a query once a slice has been taken."
+        if not fields:
+            raise ValueError("Field names must be given to bulk_update().")
+        objs = list(objs)
+        if not objs:
+            return 0
+        if any(obj.pk is None for obj in objs):
+            raise ValueError("All bulk_update() objects must have a primary key set.")
+        opts = self.model._meta
+        update_fields = []
+        for name in fields:
+            field, model, direct, m2m = opts.get_field_by_name(name)
+            if not direct or m2m or field.primary_key:
+                raise exceptions.FieldError("bulk_update() can only be used with concrete, "
+                    "non-primary key fields, not %r." % name)
+            update_fields.append((field, model))
+
+        self._for_write = True
+        connection = connections[self.db]
+        # Each object takes a parameter for its primary key in the WHERE
+        # clause and two (primary key and value) for each updated field. Only
+        # the limit on query parameters applies, bulk_batch_size() may also
+        # account for the way bulk inserts are written.
+        max_params = connection.features.max_query_params
+        if max_params is None:
+            max_batch_size = len(objs)
+        else:
+            max_batch_size = max_params // (2 * len(update_fields) + 1)
+        batch_size = max(min(batch_size or len(objs), max_batch_size), 1)
+        if not transaction.is_managed(using=self.db):
+            transaction.enter_transaction_management(using=self.db)
+            forced_managed = True
+        else:
+            forced_managed = False
+        try:
+            rows = 0
+            for i in range(0, len(objs), batch_size):
+                batch = objs[i:i + batch_size]
+                query = self.query.clone(sql.UpdateQuery)
+                for field, model in update_fields:
+                    pk_field = (model or self.model)._meta.pk
+                    value = SQLPkCase(pk_field, field,
+                        [(obj.pk, getattr(obj, field.attname)) for obj in batch])
+                    if model:
+                        query.add_related_update(model, field, value)
+                    else:
+                        query.add_update_fields([(field, None, value)])
+                query.add_filter(('pk__in', [obj.pk for obj in batch]))
+                rows += query.get_compiler(self.db).execute_sql(None)
+            query_cache.invalidate_rows(query_cache.model_tables(self.model),
+                                        [obj.pk for obj in objs], self.db)
+            if forced_managed:
+                transaction.commit(using=self.db)
+            else:
+                transaction.commit_unless_managed(using=self.db)
+        finally:
+            if forced_managed:
+                transaction.leave_transaction_management(using=self.db)
+        self._result_cache = None
+        return rows
+    bulk_update.alters_data = True
+
+    def _batched_insert(self, objs, fields, batch_size, return_ids=False):
+        """
+        A little helper method for bulk_create() to insert the objects one
+        batch at a time. If 'return_ids' is True, returns the list of the
+        primary keys of the inserted rows.
+        """
+        ops = connections[self.db].ops
+        batch_size = max(min(batch_size or len(objs),
+                             ops.bulk_batch_size(fields, objs)), 1)
+        ids = []
+        for i in range(0, len(objs), batch_size):
+            batch = objs[i:i + batch_size]
+            result = self.model._base_manager._insert(batch, fields=fields,
+                return_id=return_ids, using=self.db)
+            if return_ids:
+                if len(batch) == 1:
+                    result = [result]
+                ids.extend(result)
+        return ids
+
     def _update(self, values):
         """
         A version of update that accepts field objects instead of field names.
@@ -708,6 +875,19 @@ class QuerySet(object):
             clone._prefetch_related_lookups.extend(lookups)
         return clone
 
+    def auto_prefetch(self, enabled=True):
+        """
+        Returns a new QuerySet instance whose results prefetch their related
+        objects on first access: when a related object or manager is used on
+        one of the results, it's fetched for all the results at once, like
+        prefetch_related() does.
+
+        auto_prefetch(False) disables this behavior.
+        """
+        clone = self._clone()
+        clone._auto_prefetch = enabled
+        return clone
+
     def dup_select_related(self, other):
         """
         Copies the related selection status from the QuerySet 'other' to the
@@ -823,6 +1003,18 @@ class QuerySet(object):
         clone._db = alias
         return clone
 
+    def cache(self, timeout=None):
+        """
+        Returns a new QuerySet instance whose results are stored in the cache
+        configured by QUERYSET_CACHE_ALIAS for 'timeout' seconds (or the
+        cache's default timeout). The results are invalidated when any of the
+        tables the query reads from is written to.
+        """
+        clone = self._clone()
+        clone._use_query_cache = True
+        clone._query_cache_timeout = timeout
+        return clone
+
     ###################################
     # PUBLIC INTROSPECTION ATTRIBUTES #
     ###################################
@@ -860,6 +1052,9 @@ class QuerySet(object):
         c = klass(model=self.model, query=query, using=self._db)
         c._for_write = self._for_write
         c._prefetch_related_lookups = self._prefetch_related_lookups[:]
+        c._use_query_cache = self._use_query_cache
+        c._query_cache_timeout = self._query_cache_timeout
+        c._auto_prefetch = self._auto_prefetch
         c.__dict__.update(kwargs)
         if setup and hasattr(c, '_setup_query'):
             c._setup_query()
@@ -935,7 +1130,7 @@ class ValuesQuerySet(QuerySet):
         # QuerySet.clone() will also set up the _fields attribute with the
         # names of the model fields to select.
 
-    def iterator(self):
+    def _iterator(self, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
         # Purge any extra columns that haven't been explicitly asked for
         extra_names = self.query.extra_select.keys()
         field_names = self.field_names
@@ -943,7 +1138,9 @@ class ValuesQuerySet(QuerySet):
 
         names = extra_names + field_names + aggregate_names
 
-        for row in self.query.get_compiler(self.db).results_iter():
+        results = self.query.get_compiler(self.db).results_iter(
+            chunked_fetch, chunk_size)
+        for row in results:
             yield dict(zip(names, row))
 
     def _setup_query(self):
@@ -1057,12 +1254,14 @@ class ValuesQuerySet(QuerySet):
 
 
 class ValuesListQuerySet(ValuesQuerySet):
-    def iterator(self):
+    def _iterator(self, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+        results = self.query.get_compiler(self.db).results_iter(
+            chunked_fetch, chunk_size)
         if self.flat and len(self._fields) == 1:
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in results:
                 yield row[0]
         elif not self.query.extra_select and not self.query.aggregate_select:
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in results:
                 yield tuple(row)
         else:
             # When extra(select=...) or an annotation is involved, the extra
@@ -1081,7 +1280,7 @@ class ValuesListQuerySet(ValuesQuerySet):
             else:
                 fields = names
 
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in results:
                 data = dict(zip(names, row))
                 yield tuple([data[f] for f in fields])
 
@@ -1094,8 +1293,9 @@ class ValuesListQuerySet(ValuesQuerySet):
 
 
 class DateQuerySet(QuerySet):
-    def iterator(self):
-        return self.query.get_compiler(self.db).results_iter()
+    def _iterator(self, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+        return self.query.get_compiler(self.db).results_iter(
+            chunked_fetch, chunk_size)
 
     def _setup_query(self):
         """
@@ -1140,7 +1340,7 @@ class EmptyQuerySet(QuerySet):
         c._result_cache = []
         return c
 
-    def iterator(self):
+    def _iterator(self, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
         # This slightly odd construction is because we need an empty generator
         # (it raises StopIteration immediately).
         yield iter([]).next()
@@ -1169,6 +1369,12 @@ class EmptyQuerySet(QuerySet):
         """
         return self
 
+    def cache(self, timeout=None):
+        """
+        Always returns EmptyQuerySet.
+        """
+        return self
+
     def select_related(self, *fields, **kwargs):
         """
         Always returns EmptyQuerySet.
@@ -1226,6 +1432,12 @@ class EmptyQuerySet(QuerySet):
         """
         return 0
 
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Don't update anything.
+        """
+        return 0
+
     def aggregate(self, *args, **kwargs):
         """
         Return a dict mapping the aggregate names to None
@@ -1294,23 +1506,14 @@ def get_klass_info(klass, max_depth=0, cur_depth=0, requested=None,
         field_count = len(init_list)
         if skip:
             klass = deferred_class_factory(klass, skip)
-            field_names = init_list
-        else:
-            field_names = ()
+        field_names = init_list
     else:
         # Load all fields on klass
-
-        # We trying to not populate field_names variable for perfomance reason.
-        # If field_names variable is set, it is used to instantiate desired fields,
-        # by passing **dict(zip(field_names, fields)) as kwargs to Model.__init__ method.
-        # But kwargs version of Model.__init__ is slower, so we should avoid using
-        # it when it is not really neccesary.
         if local_only and len(klass._meta.local_fields) != len(klass._meta.fields):
-            field_count = len(klass._meta.local_fields)
             field_names = [f.attname for f in klass._meta.local_fields]
         else:
-            field_count = len(klass._meta.fields)
-            field_names = ()
+            field_names = [f.attname for f in klass._meta.fields]
+        field_count = len(field_names)
 
     restricted = requested is not None
 
@@ -1366,15 +1569,7 @@ def get_cached_row(row, index_start, using,  klass_info, offset=0):
     if fields == (None,) * field_count:
         obj = None
     else:
-        if field_names:
-            obj = klass(**dict(zip(field_names, fields)))
-        else:
-            obj = klass(*fields)
-
-    # If an object was retrieved, set the database state.
-    if obj:
-        obj._state.db = using
-        obj._state.adding = False
+        obj = klass.from_db(using, field_names, fields)
 
     # Instantiate related fields
     index_end = index_start + field_count + offset
@@ -1446,9 +1641,7 @@ class RawQuerySet(object):
         self.translations = translations or {}
 
     def __iter__(self):
-        # Mapping of attrnames to row column positions. Used for constructing
-        # the model using kwargs, needed when not all model's fields are present
-        # in the query.
+        # Mapping of attrnames to row column positions.
         model_init_field_names = {}
         # A list of tuples of (column name, column position). Used for
         # annotation fields.
@@ -1482,12 +1675,9 @@ class RawQuerySet(object):
             model_cls = deferred_class_factory(self.model, skip)
         else:
             model_cls = self.model
-            # All model's fields are present in the query. So, it is possible
-            # to use *args based model instantation. For each field of the model,
-            # record the query column position matching that field.
-            model_init_field_pos = []
-            for field in self.model._meta.fields:
-                model_init_field_pos.append(model_init_field_names[field.attname])
+        model_init_attnames = model_init_field_names.keys()
+        model_init_field_pos = [model_init_field_names[attname]
+                                for attname in model_init_attnames]
         if need_resolv_columns:
             fields = [self.model_fields.get(c, None) for c in self.columns]
         # Begin looping through the query values.
@@ -1495,21 +1685,12 @@ class RawQuerySet(object):
             if need_resolv_columns:
                 values = compiler.resolve_columns(values, fields)
             # Associate fields to values
-            if skip:
-                model_init_kwargs = {}
-                for attname, pos in model_init_field_names.iteritems():
-                    model_init_kwargs[attname] = values[pos]
-                instance = model_cls(**model_init_kwargs)
-            else:
-                model_init_args = [values[pos] for pos in model_init_field_pos]
-                instance = model_cls(*model_init_args)
+            model_init_values = [values[pos] for pos in model_init_field_pos]
+            instance = model_cls.from_db(db, model_init_attnames, model_init_values)
             if annotation_fields:
                 for column, pos in annotation_fields:
                     setattr(instance, column, values[pos])
 
-            instance._state.db = db
-            instance._state.adding = False
-
             yield instance
 
     def __repr__(self):
@@ -1577,6 +1758,76 @@ def insert_query(model, objs, fields, return_id=False, raw=False, using=None):
     return query.get_compiler(using=using).execute_sql(return_id)
 
 
+class Prefetch(object):
+    """
+    A lookup for prefetch_related() whose related objects are fetched with a
+    custom QuerySet and, if 'to_attr' is given, stored as a list in that
+    attribute of the instances instead of the cache of their related manager.
+    """
+    def __init__(self, lookup, queryset=None, to_attr=None):
+        if queryset is not None and isinstance(queryset, ValuesQuerySet):
+            raise ValueError("Prefetch querysets cannot use values().")
+        # The lookup the related objects are fetched through.
+        self.prefetch_through = lookup
+        # The lookup the related objects are stored under.
+        if to_attr:
+            self.prefetch_to = LOOKUP_SEP.join(lookup.split(LOOKUP_SEP)[:-1] + [to_attr])
+        else:
+            self.prefetch_to = lookup
+        self.queryset = queryset
+        self.to_attr = to_attr
+
+    def __repr__(self):
+        return '<Prefetch: %s>' % self.prefetch_to
+
+    def __eq__(self, other):
+        return isinstance(other, Prefetch) and self.prefetch_to == other.prefetch_to
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.prefetch_to)
+
+    def add_prefix(self, prefix):
+        self.prefetch_through = LOOKUP_SEP.join([prefix, self.prefetch_through])
+        self.prefetch_to = LOOKUP_SEP.join([prefix, self.prefetch_to])
+
+    def get_current_prefetch_to(self, level):
+        return LOOKUP_SEP.join(self.prefetch_to.split(LOOKUP_SEP)[:level + 1])
+
+    def get_current_to_attr(self, level):
+        """
+        Returns the attribute the related objects of the given level are
+        stored under, and whether it's the 'to_attr' of this Prefetch.
+        """
+        parts = self.prefetch_to.split(LOOKUP_SEP)
+        return parts[level], bool(self.to_attr) and level == len(parts) - 1
+
+    def get_current_queryset(self, level):
+        if self.get_current_prefetch_to(level) == self.prefetch_to:
+            return self.queryset
+        return None
+
+
+def normalize_prefetch_lookups(lookups, prefix=None):
+    """
+    Helper function for prefetch_related functionality
+
+    Turns lookup strings into Prefetch objects, prefixed by 'prefix'.
+    """
+    normalized = []
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch):
+            lookup = copy.copy(lookup)
+        else:
+            lookup = Prefetch(lookup)
+        if prefix:
+            lookup.add_prefix(prefix)
+        normalized.append(lookup)
+    return normalized
+
+
 def prefetch_related_objects(result_cache, related_lookups):
     """
     Helper function for prefetch_related functionality
@@ -1584,8 +1835,6 @@ def prefetch_related_objects(result_cache, related_lookups):
     Populates prefetched objects caches for a list of results
     from a QuerySet
     """
-    from django.db.models.sql.constants import LOOKUP_SEP
-
     if len(result_cache) == 0:
         return # nothing to do
 
@@ -1600,18 +1849,22 @@ def prefetch_related_objects(result_cache, related_lookups):
     auto_lookups = [] # we add to this as we go through.
     followed_descriptors = set() # recursion protection
 
-    all_lookups = itertools.chain(related_lookups, auto_lookups)
+    all_lookups = itertools.chain(normalize_prefetch_lookups(related_lookups), auto_lookups)
     for lookup in all_lookups:
-        if lookup in done_lookups:
+        if lookup.prefetch_to in done_lookups:
+            if lookup.queryset is not None:
+                raise ValueError("'%s' lookup was already seen with a different "
+                                 "queryset. You may need to adjust the ordering "
+                                 "of your lookups." % lookup.prefetch_to)
             # We've done exactly this already, skip the whole thing
             continue
-        done_lookups.add(lookup)
+        done_lookups.add(lookup.prefetch_to)
 
         # Top level, the list of objects to decorate is the the result cache
         # from the primary QuerySet. It won't be for deeper levels.
         obj_list = result_cache
 
-        attrs = lookup.split(LOOKUP_SEP)
+        attrs = lookup.prefetch_through.split(LOOKUP_SEP)
         for level, attr in enumerate(attrs):
             # Prepare main instances
             if len(obj_list) == 0:
@@ -1640,12 +1893,21 @@ def prefetch_related_objects(result_cache, related_lookups):
             # We assume that objects retrieved are homogenous (which is the premise
             # of prefetch_related), so what applies to first object applies to all.
             first_obj = obj_list[0]
-            prefetcher, descriptor, attr_found, is_fetched = get_prefetcher(first_obj, attr)
+            to_attr, as_attr = lookup.get_current_to_attr(level)
+            if as_attr:
+                try:
+                    first_obj._meta.get_field(to_attr)
+                except FieldDoesNotExist:
+                    pass
+                else:
+                    raise ValueError("to_attr=%s conflicts with a field on the %s model."
+                                     % (to_attr, first_obj.__class__.__name__))
+            prefetcher, descriptor, attr_found, is_fetched = get_prefetcher(first_obj, attr, to_attr)
 
             if not attr_found:
                 raise AttributeError("Cannot find '%s' on %s object, '%s' is an invalid "
                                      "parameter to prefetch_related()" %
-                                     (attr, first_obj.__class__.__name__, lookup))
+                                     (attr, first_obj.__class__.__name__, lookup.prefetch_through))
 
             if level == len(attrs) - 1 and prefetcher is None:
                 # Last one, this *must* resolve to something that supports
@@ -1653,24 +1915,22 @@ def prefetch_related_objects(result_cache, related_lookups):
                 # developer asking for it has made a mistake.
                 raise ValueError("'%s' does not resolve to a item that supports "
                                  "prefetching - this is an invalid parameter to "
-                                 "prefetch_related()." % lookup)
+                                 "prefetch_related()." % lookup.prefetch_through)
 
             if prefetcher is not None and not is_fetched:
                 # Check we didn't do this already
-                current_lookup = LOOKUP_SEP.join(attrs[0:level+1])
+                current_lookup = lookup.get_current_prefetch_to(level)
                 if current_lookup in done_queries:
                     obj_list = done_queries[current_lookup]
                 else:
-                    obj_list, additional_prl = prefetch_one_level(obj_list, prefetcher, attr)
+                    obj_list, additional_prl = prefetch_one_level(obj_list, prefetcher, lookup, level)
                     # We need to ensure we don't keep adding lookups from the
                     # same relationships to stop infinite recursion. So, if we
                     # are already on an automatically added lookup, don't add
                     # the new lookups from relationships we've seen already.
                     if not (lookup in auto_lookups and
                             descriptor in followed_descriptors):
-                        for f in additional_prl:
-                            new_prl = LOOKUP_SEP.join([current_lookup, f])
-                            auto_lookups.append(new_prl)
+                        auto_lookups.extend(normalize_prefetch_lookups(additional_prl, current_lookup))
                         done_queries[current_lookup] = obj_list
                     followed_descriptors.add(descriptor)
             else:
@@ -1684,19 +1944,75 @@ def prefetch_related_objects(result_cache, related_lookups):
                 new_obj_list = []
                 for obj in obj_list:
                     try:
-                        new_obj = getattr(obj, attr)
+                        new_obj = getattr(obj, to_attr)
                     except exceptions.ObjectDoesNotExist:
                         continue
                     if new_obj is None:
                         continue
-                    new_obj_list.append(new_obj)
+                    # Lists of related objects are stored by the 'to_attr'
+                    # of Prefetch lookups.
+                    if isinstance(new_obj, list):
+                        new_obj_list.extend(new_obj)
+                    else:
+                        new_obj_list.append(new_obj)
                 obj_list = new_obj_list
 
 
-def get_prefetcher(instance, attr):
+class AutoPrefetchGroup(object):
+    """
+    The results of one evaluation of a QuerySet with auto_prefetch(), which
+    are referenced by the ModelState of each of them.
+
+    Only weak references to the QuerySet and to the results are kept, so
+    that the results don't keep each other alive.
+    """
+    def __init__(self, queryset):
+        self.queryset = weakref.ref(queryset)
+        self.instances = []
+        # The lookups being prefetched by auto_prefetch_related().
+        self.prefetching = set()
+
+
+def auto_prefetch_related(instance, lookup, is_fetched):
+    """
+    Helper function for auto_prefetch() functionality
+
+    If the instance was fetched by a QuerySet with auto_prefetch(), prefetches
+    the related objects given by 'lookup' for the instance and all the other
+    results of that QuerySet for which is_fetched(obj) is False. Returns True
+    if they were prefetched.
+    """
+    group = instance._state.auto_prefetch_group
+    if group is None or lookup in group.prefetching:
+        return False
+    # Prefetching related managers accesses them on each instance, and so
+    # may the prefetch_related() lookups of the QuerySet.
+    group.prefetching.add(lookup)
+    try:
+        queryset = group.queryset()
+        if queryset is not None:
+            # The QuerySet may still be being iterated over, in which case the
+            # rest of its results (and their prefetch_related() lookups) are
+            # fetched now.
+            len(queryset)
+            if is_fetched(instance):
+                return False
+        instances = [instance]
+        for ref in group.instances:
+            obj = ref()
+            if obj is not None and obj is not instance and not is_fetched(obj):
+                instances.append(obj)
+        prefetch_related_objects(instances, [lookup])
+    finally:
+        group.prefetching.discard(lookup)
+    return True
+
+
+def get_prefetcher(instance, attr, to_attr=None):
     """
     For the attribute 'attr' on the given instance, finds
-    an object that has a get_prefetch_query_set().
+    an object that has a get_prefetch_query_set(). The related objects are
+    stored under 'to_attr' (by default 'attr').
     Returns a 4 tuple containing:
     (the object with get_prefetch_query_set (or None),
      the descriptor object representing this relationship (or None),
@@ -1733,22 +2049,26 @@ def get_prefetcher(instance, attr):
                 rel_obj = getattr(instance, attr)
                 if hasattr(rel_obj, 'get_prefetch_query_set'):
                     prefetcher = rel_obj
+        if to_attr is not None and to_attr != attr:
+            is_fetched = hasattr(instance, to_attr)
     return prefetcher, rel_obj_descriptor, attr_found, is_fetched
 
 
-def prefetch_one_level(instances, prefetcher, attname):
+def prefetch_one_level(instances, prefetcher, lookup, level):
     """
     Helper function for prefetch_related_objects
 
-    Runs prefetches on all instances using the prefetcher object,
-    assigning results to relevant caches in instance.
+    Runs prefetches on all instances using the prefetcher object and the
+    queryset of the given level of the Prefetch lookup (if any), assigning
+    results to relevant caches in instance.
 
     The prefetched objects are returned, along with any additional
     prefetches that must be done due to prefetch_related lookups
     found from default managers.
     """
     # prefetcher must have a method get_prefetch_query_set() which takes a list
-    # of instances, and returns a tuple:
+    # of instances and an optional queryset to fetch the related objects
+    # with, and returns a tuple:
 
     # (queryset of instances of self.model that are related to passed in instances,
     #  callable that gets value to be matched for returned instances,
@@ -1760,7 +2080,7 @@ def prefetch_one_level(instances, prefetcher, attname):
     # in a dictionary.
 
     rel_qs, rel_obj_attr, instance_attr, single, cache_name =\
-        prefetcher.get_prefetch_query_set(instances)
+        prefetcher.get_prefetch_query_set(instances, lookup.get_current_queryset(level))
     # We have to handle the possibility that the default manager itself added
     # prefetch_related lookups to the QuerySet we just got back. We don't want to
     # trigger the prefetch_related functionality by evaluating the query.
@@ -1781,16 +2101,20 @@ def prefetch_one_level(instances, prefetcher, attname):
             rel_obj_cache[rel_attr_val] = []
         rel_obj_cache[rel_attr_val].append(rel_obj)
 
+    to_attr, as_attr = lookup.get_current_to_attr(level)
     for obj in instances:
         instance_attr_val = instance_attr(obj)
         vals = rel_obj_cache.get(instance_attr_val, [])
         if single:
             # Need to assign to single cache on instance
-            setattr(obj, cache_name, vals[0] if vals else None)
+            setattr(obj, to_attr if as_attr else cache_name, vals[0] if vals else None)
+        elif as_attr:
+            setattr(obj, to_attr, vals)
         else:
-            # Multi, attribute represents a manager with an .all() method that
-            # returns a QuerySet
-            qs = getattr(obj, attname).all()
+            # Multi, attribute represents a manager with a get_query_set()
+            # method that returns a QuerySet. all() isn't used since it may
+            # prefetch automatically (see auto_prefetch()).
+            qs = getattr(obj, to_attr).get_query_set()
             qs._result_cache = vals
             # We don't want the individual qs doing prefetch_related now, since we
             # have merged this into the current work.
@@ -0,0 +1,234 @@
+"""
+Support for caching the results of QuerySets marked with QuerySet.cache().
+
+Cached results are keyed by the SQL of the query and by a generation counter
+for each of the tables the query reads from. Writing to a table (saving or
+deleting an instance, QuerySet.update(), ...) increments the generation of
+that table, so every cached result that depends on it is ignored from then
+on and eventually expires.
+
+Generations are also kept for the rows of the tables that are saved or
+deleted, so that other caches (e.g. the {% cache %} template tag) can depend
+on single model instances.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.sql.constants import TABLE_NAME
+from django.db.models.sql.datastructures import EmptyResultSet
+from django.db.models.sql.expressions import SQLEvaluator
+from django.db.models.sql.where import WhereNode, ExtraWhere
+from django.utils.encoding import smart_str
+
+GENERATION_KEY_PREFIX = 'django.db.models.query_cache.generation'
+RESULT_KEY_PREFIX = 'django.db.models.query_cache.result'
+
+_caches = {}
+
+def get_query_cache():
+    """
+    Returns the cache backend configured by QUERYSET_CACHE_ALIAS, or None
+    when the QuerySet cache is disabled.
+    """
+    alias = settings.QUERYSET_CACHE_ALIAS
+    if alias is None:
+        return None
+    if alias not in _caches:
+        from django.core.cache import get_cache
+        _caches[alias] = get_cache(alias)
+    return _caches[alias]
+
+def new_generation():
+    """
+    Returns the initial generation of a table. It is based on the current
+    time so that a generation that was evicted from the cache doesn't start
+    over at a value older results were stored under.
+    """
+    return int(time.time() * 1000)
+
+def generation_key(table, pk=None):
+    """
+    Returns the key of the generation of a table, or of one of its rows if
+    pk is given.
+    """
+    if pk is None:
+        return '%s.%s' % (GENERATION_KEY_PREFIX, table)
+    return '%s.%s.row.%s' % (GENERATION_KEY_PREFIX, table,
+                             hashlib.md5(smart_str(pk)).hexdigest())
+
+def bulk_generation_key(table):
+    """
+    Returns the key of the generation of a table that is incremented when
+    rows of the table are changed without knowing which ones.
+    """
+    return '%s.%s.bulk' % (GENERATION_KEY_PREFIX, table)
+
+def get_generations(cache, keys):
+    """
+    Returns a dict of the current generations stored under the given keys,
+    initializing the missing ones.
+    """
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, new_generation())
+            generations[key] = cache.get(key)
+    return generations
+
+def table_generations(cache, tables):
+    """
+    Returns the current generations of the given tables as a list of
+    (table, generation) pairs.
+    """
+    keys = [generation_key(table) for table in tables]
+    generations = get_generations(cache, keys)
+    return [(table, generations[key]) for table, key in zip(tables, keys)]
+
+def invalidate_keys(keys, using=None):
+    """
+    Increments the generations stored under the given keys, after a write
+    to the database 'using'.
+
+    Until a transaction is committed, other connections still read the old
+    rows, and may cache them under the new generations. When the write was
+    made in a managed transaction, the generations are incremented again
+    once it's committed or rolled back (see invalidate_after_transaction()).
+    """
+    cache = get_query_cache()
+    if cache is None:
+        return
+    keys = set(keys)
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation())
+    if using is not None:
+        connection = connections[using]
+        if connection.is_managed():
+            connection.query_cache_keys.update(keys)
+
+def invalidate_after_transaction(connection):
+    """
+    Increments the generations that were invalidated during the transaction
+    that the connection just ended.
+    """
+    keys, connection.query_cache_keys = connection.query_cache_keys, set()
+    invalidate_keys(keys)
+
+def invalidate_tables(tables, bulk=False, using=None):
+    """
+    Increments the generations of the given tables, which invalidates all
+    the cached results that read from them. If bulk is True, any of their
+    rows may have changed.
+    """
+    keys = [generation_key(table) for table in tables]
+    if bulk:
+        keys.extend([bulk_generation_key(table) for table in tables])
+    invalidate_keys(keys, using)
+
+def invalidate_rows(tables, pks, using=None):
+    """
+    Increments the generations of the given tables and of their rows with
+    the given primary keys.
+    """
+    keys = [generation_key(table) for table in tables]
+    for table in tables:
+        keys.extend([generation_key(table, pk) for pk in pks])
+    invalidate_keys(keys, using)
+
+def model_tables(model):
+    """
+    Returns the tables of the model and of the models it inherits from.
+    """
+    opts = model._meta
+    tables = [opts.db_table]
+    for parent in opts.get_parent_list():
+        tables.append(parent._meta.db_table)
+    return tables
+
+def query_tables(query):
+    """
+    Returns the sorted list of tables the query reads from, or None if they
+    can't be determined (e.g. the query contains raw SQL fragments).
+    """
+    if query.extra:
+        return None
+    tables = set(query.extra_tables)
+    if query.model is not None:
+        tables.update(model_tables(query.model))
+    for alias_data in query.alias_map.values():
+        tables.add(alias_data[TABLE_NAME])
+    nodes = [query.where, query.having]
+    while nodes:
+        node = nodes.pop()
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                nodes.append(child)
+            elif isinstance(child, ExtraWhere):
+                return None
+            elif isinstance(child, (list, tuple)):
+                value = child[3]
+                if hasattr(value, 'query'):
+                    value = value.query
+                if hasattr(value, 'alias_map'):
+                    subquery_tables = query_tables(value)
+                    if subquery_tables is None:
+                        return None
+                    tables.update(subquery_tables)
+                elif isinstance(value, SQLEvaluator):
+                    # The joins of F() expressions are in the alias_map.
+                    continue
+                elif hasattr(value, 'as_sql') or hasattr(value, '_as_sql'):
+                    return None
+    return sorted(tables)
+
+def cached_results(queryset):
+    """
+    Returns an iterator over the results of the QuerySet, reading them from
+    the cache if they were stored by an identical query since the tables the
+    query depends on were last written to.
+    """
+    cache = get_query_cache()
+    if cache is None:
+        return queryset.iterator()
+    using = queryset.db
+    # The joins for select_related() are only set up when the query is
+    # compiled, so the tables are looked up on the compiled query.
+    query = queryset.query.clone()
+    try:
+        sql, params = query.get_compiler(using).as_sql()
+    except EmptyResultSet:
+        return queryset.iterator()
+    tables = query_tables(query)
+    if tables is None:
+        return queryset.iterator()
+    # The generations must be read before the query is executed, otherwise
+    # a write that happens in between would go unnoticed.
+    generations = table_generations(cache, tables)
+    opts = queryset.model._meta
+    key = repr((using, queryset.__class__.__name__, opts.app_label,
+                opts.object_name, getattr(queryset, 'flat', False),
+                sql, params, generations))
+    key = '%s.%s' % (RESULT_KEY_PREFIX, hashlib.md5(key).hexdigest())
+    results = cache.get(key)
+    if results is None:
+        results = list(queryset.iterator())
+        cache.set(key, results, queryset._query_cache_timeout)
+    return iter(results)
+
+def invalidate_m2m_relations(through, instance, model, pk_set, using=None):
+    """
+    Invalidates the intermediary table of a many-to-many relation and the
+    rows of the instance and of the related objects (all of them if pk_set
+    is None) after their relations changed.
+    """
+    invalidate_tables(model_tables(through), using=using)
+    invalidate_rows(model_tables(instance.__class__), [instance.pk], using)
+    if pk_set is None:
+        invalidate_tables(model_tables(model), bulk=True, using=using)
+    else:
+        invalidate_rows(model_tables(model), pk_set, using)
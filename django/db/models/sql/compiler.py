@@ -68,14 +68,29 @@ class SQLCompiler(object):
         # as the pre_sql_setup will modify query state in a way that forbids
         # another run of it.
         self.refcounts_before = self.query.alias_refcount.copy()
-        out_cols = self.get_columns(with_col_aliases)
-        ordering, ordering_group_by = self.get_ordering()
+        cache_key = self.get_compiled_sql_key(with_col_aliases)
+        cached = cache_key is not None and compiled_sql_cache.get(cache_key)
+        if cached:
+            (out_cols, ordering, ordering_group_by, distinct_fields, from_,
+                f_params, ordering_aliases, self._select_aliases) = cached
+            out_cols, ordering = list(out_cols), list(ordering)
+            from_, f_params = list(from_), list(f_params)
+            self.query.ordering_aliases = list(ordering_aliases)
+        else:
+            out_cols = self.get_columns(with_col_aliases)
+            ordering, ordering_group_by = self.get_ordering()
 
-        distinct_fields = self.get_distinct()
+            distinct_fields = self.get_distinct()
 
-        # This must come after 'select', 'ordering' and 'distinct' -- see
-        # docstring of get_from_clause() for details.
-        from_, f_params = self.get_from_clause()
+            # This must come after 'select', 'ordering' and 'distinct' -- see
+            # docstring of get_from_clause() for details.
+            from_, f_params = self.get_from_clause()
+            if cache_key is not None:
+                compiled_sql_cache.set(cache_key, (tuple(out_cols),
+                    tuple(ordering), tuple(ordering_group_by),
+                    tuple(distinct_fields), tuple(from_), tuple(f_params),
+                    tuple(self.query.ordering_aliases),
+                    frozenset(self._select_aliases)))
 
         qn = self.quote_name_unless_alias
 
@@ -149,6 +164,43 @@ class SQLCompiler(object):
 
         return ' '.join(result), tuple(params)
 
+    def get_compiled_sql_key(self, with_col_aliases=False):
+        """
+        Returns a hashable fingerprint of the structure of the query -- the
+        parts that determine the select list, ordering and FROM clause, but
+        none of the filter values -- or None if the compiled SQL for this
+        query can't be reused.
+
+        Must be called after pre_sql_setup(), as that alters the joins.
+        """
+        if not self.connection.settings_dict.get('COMPILED_SQL_CACHE'):
+            return None
+        query = self.query
+        if (query.extra or query.extra_tables or query.aggregates or
+                query.group_by is not None):
+            return None
+        for col in query.select:
+            if not isinstance(col, (list, tuple)):
+                return None
+        deferred, defer = query.deferred_loading
+        try:
+            return (
+                self.__class__, self.connection.alias, with_col_aliases,
+                query.model, tuple(query.tables),
+                tuple(query.alias_refcount.items()),
+                tuple(sorted(query.alias_map.items())),
+                tuple(sorted(query.included_inherited_models.items())),
+                tuple([tuple(col) for col in query.select]),
+                tuple(query.related_select_cols), query.default_cols,
+                query.distinct, tuple(query.distinct_fields),
+                tuple(query.order_by), tuple(query.extra_order_by),
+                query.default_ordering, query.standard_ordering,
+                frozenset(deferred), defer,
+            )
+        except TypeError:
+            # Something unhashable has found its way into the query.
+            return None
+
     def as_nested_sql(self):
         """
         Perform the same functionality as the as_sql() method, returning an
@@ -748,7 +800,8 @@ class SQLCompiler(object):
         self.query.deferred_to_data(columns, self.query.deferred_to_columns_cb)
         return columns
 
-    def results_iter(self):
+    def results_iter(self, chunked_fetch=False,
+                     chunk_size=GET_ITERATOR_CHUNK_SIZE):
         """
         Returns an iterator over the results from executing this query.
         """
@@ -760,7 +813,7 @@ class SQLCompiler(object):
         # are released.
         if self.query.select_for_update and transaction.is_managed(self.using):
             transaction.set_dirty(self.using)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunked_fetch, chunk_size):
             for row in rows:
                 if resolve_columns:
                     if fields is None:
@@ -791,7 +844,8 @@ class SQLCompiler(object):
 
                 yield row
 
-    def execute_sql(self, result_type=MULTI):
+    def execute_sql(self, result_type=MULTI, chunked_fetch=False,
+                    chunk_size=GET_ITERATOR_CHUNK_SIZE):
         """
         Run the query against the database and returns the result(s). The
         return value is a single data item if result_type is SINGLE, or an
@@ -803,6 +857,10 @@ class SQLCompiler(object):
         subclasses such as InsertQuery). It's possible, however, that no query
         is needed, as the filters describe an empty set. In that case, None is
         returned, to avoid any unnecessary database interaction.
+
+        If chunked_fetch is True, a MULTI query is run on a cursor that
+        streams the rows from the database server, chunk_size rows at a time,
+        where the backend supports it.
         """
         try:
             sql, params = self.as_sql()
@@ -814,7 +872,10 @@ class SQLCompiler(object):
             else:
                 return
 
-        cursor = self.connection.cursor()
+        if chunked_fetch and result_type == MULTI:
+            cursor = self.connection.chunked_cursor()
+        else:
+            cursor = self.connection.cursor()
         cursor.execute(sql, params)
 
         if not result_type:
@@ -827,10 +888,12 @@ class SQLCompiler(object):
         # The MULTI case.
         if self.query.ordering_aliases:
             result = order_modified_iter(cursor, len(self.query.ordering_aliases),
-                    self.connection.features.empty_fetchmany_value)
+                    self.connection.features.empty_fetchmany_value, chunk_size)
         else:
-            result = iter((lambda: cursor.fetchmany(GET_ITERATOR_CHUNK_SIZE)),
+            result = iter((lambda: cursor.fetchmany(chunk_size)),
                     self.connection.features.empty_fetchmany_value)
+        if chunked_fetch:
+            result = closing_iter(result, cursor)
         if not self.connection.features.can_use_chunked_reads:
             # If we are using non-chunked reads, we return the same data
             # structure as normally, but ensure it is all read into memory
@@ -875,8 +938,14 @@ class SQLInsertCompiler(SQLCompiler):
             values = [[self.connection.ops.pk_default_value()] for obj in self.query.objs]
             params = [[]]
             fields = [None]
-        can_bulk = (not any(hasattr(field, "get_placeholder") for field in fields) and
-            not self.return_id and self.connection.features.has_bulk_insert)
+        has_placeholders = any(hasattr(field, "get_placeholder") for field in fields)
+        # Returning the IDs of several inserted rows requires a bulk insert.
+        return_ids = (self.return_id and len(values) > 1 and
+            not has_placeholders and
+            self.connection.features.can_return_ids_from_bulk_insert)
+        can_bulk = (not has_placeholders and
+            (not self.return_id or return_ids) and
+            self.connection.features.has_bulk_insert)
 
         if can_bulk:
             placeholders = [["%s"] * len(fields)]
@@ -885,7 +954,8 @@ class SQLInsertCompiler(SQLCompiler):
                 [self.placeholder(field, v) for field, v in izip(fields, val)]
                 for val in values
             ]
-        if self.return_id and self.connection.features.can_return_id_from_insert:
+        if (self.return_id and not return_ids and
+                self.connection.features.can_return_id_from_insert):
             params = params[0]
             col = "%s.%s" % (qn(opts.db_table), qn(opts.pk.column))
             result.append("VALUES (%s)" % ", ".join(placeholders[0]))
@@ -895,7 +965,13 @@ class SQLInsertCompiler(SQLCompiler):
             return [(" ".join(result), tuple(params))]
         if can_bulk:
             result.append(self.connection.ops.bulk_insert_sql(fields, len(values)))
-            return [(" ".join(result), tuple([v for val in values for v in val]))]
+            params = [v for val in values for v in val]
+            if return_ids:
+                col = "%s.%s" % (qn(opts.db_table), qn(opts.pk.column))
+                r_fmt, r_params = self.connection.ops.return_insert_id()
+                result.append(r_fmt % col)
+                params += r_params
+            return [(" ".join(result), tuple(params))]
         else:
             return [
                 (" ".join(result + ["VALUES (%s)" % ", ".join(p)]), vals)
@@ -903,13 +979,21 @@ class SQLInsertCompiler(SQLCompiler):
             ]
 
     def execute_sql(self, return_id=False):
-        assert not (return_id and len(self.query.objs) != 1)
+        """
+        Runs the insert. If 'return_id' is True, returns the primary key of
+        the inserted row or, on backends that can return them, the list of
+        primary keys of the inserted rows if there are several.
+        """
+        assert not (return_id and len(self.query.objs) != 1 and
+            not self.connection.features.can_return_ids_from_bulk_insert)
         self.return_id = return_id
         cursor = self.connection.cursor()
         for sql, params in self.as_sql():
             cursor.execute(sql, params)
         if not (return_id and cursor):
             return
+        if len(self.query.objs) > 1:
+            return self.connection.ops.fetch_returned_insert_ids(cursor)
         if self.connection.features.can_return_id_from_insert:
             return self.connection.ops.fetch_returned_insert_id(cursor)
         return self.connection.ops.last_insert_id(cursor,
@@ -950,8 +1034,9 @@ class SQLUpdateCompiler(SQLCompiler):
             else:
                 val = field.get_db_prep_save(val, connection=self.connection)
 
-            # Getting the placeholder for the field.
-            if hasattr(field, 'get_placeholder'):
+            # Getting the placeholder for the field. SQL expressions provide
+            # their own.
+            if hasattr(field, 'get_placeholder') and not hasattr(val, 'as_sql'):
                 placeholder = field.get_placeholder(val, self.connection)
             else:
                 placeholder = '%s'
@@ -1058,7 +1143,8 @@ class SQLAggregateCompiler(SQLCompiler):
         return (sql, params)
 
 class SQLDateCompiler(SQLCompiler):
-    def results_iter(self):
+    def results_iter(self, chunked_fetch=False,
+                     chunk_size=GET_ITERATOR_CHUNK_SIZE):
         """
         Returns an iterator over the results from executing this query.
         """
@@ -1071,7 +1157,7 @@ class SQLDateCompiler(SQLCompiler):
             needs_string_cast = self.connection.features.needs_datetime_string_cast
 
         offset = len(self.query.extra_select)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunked_fetch, chunk_size):
             for row in rows:
                 date = row[offset]
                 if resolve_columns:
@@ -1081,6 +1167,43 @@ class SQLDateCompiler(SQLCompiler):
                 yield date
 
 
+class CompiledSQLCache(object):
+    """
+    A cache of the parameter-independent parts of compiled SELECT queries
+    (the select list, ordering and FROM clause), keyed on the structure of
+    the query. Enabled per database with the COMPILED_SQL_CACHE option.
+    """
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        # Like the re module's cache: when full, simply start again.
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._cache[key] = value
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+compiled_sql_cache = CompiledSQLCache()
+
+
 def empty_iter():
     """
     Returns an iterator containing no results.
@@ -1088,13 +1211,27 @@ def empty_iter():
     yield iter([]).next()
 
 
-def order_modified_iter(cursor, trim, sentinel):
+def order_modified_iter(cursor, trim, sentinel,
+                        chunk_size=GET_ITERATOR_CHUNK_SIZE):
     """
     Yields blocks of rows from a cursor. We use this iterator in the special
     case when extra output columns have been added to support ordering
     requirements. We must trim those extra columns before anything else can use
     the results, since they're only needed to make the SQL valid.
     """
-    for rows in iter((lambda: cursor.fetchmany(GET_ITERATOR_CHUNK_SIZE)),
+    for rows in iter((lambda: cursor.fetchmany(chunk_size)),
             sentinel):
         yield [r[:-trim] for r in rows]
+
+
+def closing_iter(result, cursor):
+    """
+    Yields the blocks of rows from 'result' and closes the cursor they come
+    from once they are exhausted, or when the iterator is discarded. This
+    releases server-side cursors as early as possible.
+    """
+    try:
+        for rows in result:
+            yield rows
+    finally:
+        cursor.close()
@@ -95,3 +95,42 @@ class SQLEvaluator(object):
             return sql, params
 
         return connection.ops.date_interval_sql(sql, node.connector, timedelta), params
+
+
+class SQLPkCase(object):
+    """
+    A "CASE pk WHEN ... THEN ... END" SQL expression giving a different value
+    for a field on each row, keyed on the primary key. Used as the value of an
+    update query by QuerySet.bulk_update().
+    """
+    def __init__(self, pk_field, field, cases):
+        # 'cases' is a list of (primary key, value) pairs.
+        self.pk_field = pk_field
+        self.field = field
+        self.cases = cases
+
+    def prepare_database_save(self, unused):
+        return self
+
+    def as_sql(self, qn, connection):
+        column = qn(self.field.column)
+        sql = ['CASE %s' % qn(self.pk_field.column)]
+        params = []
+        for pk, value in self.cases:
+            pk = self.pk_field.get_db_prep_value(pk, connection=connection)
+            value = self.field.get_db_prep_save(value, connection=connection)
+            if value is None:
+                sql.append('WHEN %s THEN NULL')
+                params.append(pk)
+                continue
+            if hasattr(self.field, 'get_placeholder'):
+                placeholder = self.field.get_placeholder(value, connection)
+            else:
+                placeholder = '%s'
+            sql.append('WHEN %%s THEN %s' % placeholder)
+            params.extend([pk, value])
+        # The column's own value is never used (the update is restricted to
+        # the given primary keys), but it gives the CASE the column's type
+        # where the values alone don't, e.g. when they're all NULL.
+        sql.append('ELSE %s END' % column)
+        return ' '.join(sql), params
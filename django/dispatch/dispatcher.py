@@ -18,20 +18,32 @@ class Signal(object):
     
         receivers
             { receriverkey (id) : weakref(receiver) }
+
+        sender_receivers_cache
+            { senderkey (id) : [weakref(receiver)] } when use_caching is
+            True, emptied whenever the receivers change.
     """
     
-    def __init__(self, providing_args=None):
+    def __init__(self, providing_args=None, use_caching=False):
         """
         Create a new signal.
         
         providing_args
             A list of the arguments this signal can pass along in a send() call.
+
+        use_caching
+            Whether to cache the receivers connected for each sender. This
+            makes sending faster, but keeps an entry for every sender the
+            signal has been sent from, so it should only be used when the
+            senders are long-lived objects, such as classes.
         """
         self.receivers = []
         if providing_args is None:
             providing_args = []
         self.providing_args = set(providing_args)
         self.lock = threading.Lock()
+        self.use_caching = use_caching
+        self.sender_receivers_cache = {}
 
     def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
         """
@@ -106,6 +118,7 @@ class Signal(object):
                     break
             else:
                 self.receivers.append((lookup_key, receiver))
+            self.sender_receivers_cache.clear()
         finally:
             self.lock.release()
 
@@ -143,9 +156,18 @@ class Signal(object):
                 if r_key == lookup_key:
                     del self.receivers[index]
                     break
+            self.sender_receivers_cache.clear()
         finally:
             self.lock.release()
 
+    def has_listeners(self, sender=None):
+        """
+        Return True if any live receiver would be called by send(sender).
+        """
+        if not self.receivers:
+            return False
+        return bool(self._live_receivers(_make_id(sender)))
+
     def send(self, sender, **named):
         """
         Send signal from sender to all connected receivers.
@@ -219,18 +241,36 @@ class Signal(object):
         live receivers.
         """
         none_senderkey = _make_id(None)
-        receivers = []
-
-        for (receiverkey, r_senderkey), receiver in self.receivers:
-            if r_senderkey == none_senderkey or r_senderkey == senderkey:
-                if isinstance(receiver, WEAKREF_TYPES):
-                    # Dereference the weak reference.
-                    receiver = receiver()
-                    if receiver is not None:
-                        receivers.append(receiver)
-                else:
-                    receivers.append(receiver)
-        return receivers
+        if not self.use_caching:
+            receivers = [receiver for (receiverkey, r_senderkey), receiver
+                         in self.receivers
+                         if r_senderkey == none_senderkey or r_senderkey == senderkey]
+        else:
+            receivers = self.sender_receivers_cache.get(senderkey)
+            if receivers is None:
+                # The lock keeps a concurrent connect() or disconnect() from
+                # emptying the cache before a stale list is stored in it.
+                self.lock.acquire()
+                try:
+                    # The weak references are cached, so that caching
+                    # doesn't keep the receivers alive.
+                    receivers = [receiver for (receiverkey, r_senderkey), receiver
+                                 in self.receivers
+                                 if r_senderkey == none_senderkey or r_senderkey == senderkey]
+                    self.sender_receivers_cache[senderkey] = receivers
+                finally:
+                    self.lock.release()
+
+        live_receivers = []
+        for receiver in receivers:
+            if isinstance(receiver, WEAKREF_TYPES):
+                # Dereference the weak reference.
+                receiver = receiver()
+                if receiver is not None:
+                    live_receivers.append(receiver)
+            else:
+                live_receivers.append(receiver)
+        return live_receivers
 
     def _remove_receiver(self, receiver):
         """
@@ -250,6 +290,7 @@ class Signal(object):
                 for idx, (r_key, _) in enumerate(reversed(self.receivers)):
                     if r_key == key:
                         del self.receivers[last_idx-idx]
+            self.sender_receivers_cache.clear()
         finally:
             self.lock.release()
 
@@ -653,8 +653,15 @@ class HttpResponse(object):
 
     def _get_content(self):
         if self.has_header('Content-Encoding'):
-            return ''.join([str(e) for e in self._container])
-        return ''.join([smart_str(e, self._charset) for e in self._container])
+            content = ''.join([str(e) for e in self._container])
+        else:
+            content = ''.join([smart_str(e, self._charset) for e in self._container])
+        if self._base_content_is_iter and not isinstance(self._container, list):
+            # The iterator is consumed, so keep its content for the server
+            # (e.g. when a middleware reads the content of a streamed
+            # response).
+            self._container = [content]
+        return content
 
     def _set_content(self, value):
         if hasattr(value, '__iter__'):
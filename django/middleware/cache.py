@@ -46,8 +46,20 @@ More details about how the caching works:
 * This middleware also sets ETag, Last-Modified, Expires and Cache-Control
   headers on the response object.
 
+* If CACHE_MIDDLEWARE_STALE_SECONDS is set, pages are kept in the cache for
+  that many seconds after they expire. During that time, one request
+  regenerates the page, while the others get the stale copy from the cache.
+
+* If CACHE_MIDDLEWARE_EARLY_REFRESH is True, pages are regenerated by a
+  single request before they expire, with a probability that increases as
+  the expiry approaches and with the time the page took to generate.
+
 """
 
+import math
+import random
+import time
+
 from django.conf import settings
 from django.core.cache import get_cache, DEFAULT_CACHE_ALIAS
 from django.utils.cache import get_cache_key, learn_cache_key, patch_response_headers, get_max_age
@@ -66,6 +78,8 @@ class UpdateCacheMiddleware(object):
         self.cache_timeout = settings.CACHE_MIDDLEWARE_SECONDS
         self.key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
         self.cache_anonymous_only = getattr(settings, 'CACHE_MIDDLEWARE_ANONYMOUS_ONLY', False)
+        self.cache_stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.cache_early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
         self.cache = get_cache(self.cache_alias)
 
@@ -88,12 +102,36 @@ class UpdateCacheMiddleware(object):
                 return False
         return True
 
+    def _release_lock(self, request):
+        """
+        Lets other requests regenerate the page again, if this request was
+        the one regenerating it.
+        """
+        lock_key = getattr(request, '_cache_lock_key', None)
+        if lock_key is not None:
+            self.cache.delete(lock_key)
+            request._cache_lock_key = None
+
+    def _update_cache(self, request, cache_key, response, timeout):
+        if self.cache_stale_seconds or self.cache_early_refresh:
+            # Store when the page expires and how long it took to generate
+            # along with it, and keep it for the grace period.
+            now = time.time()
+            duration = now - getattr(request, '_cache_start', now)
+            self.cache.set(cache_key, (response, now + timeout, duration),
+                           timeout + self.cache_stale_seconds)
+        else:
+            self.cache.set(cache_key, response, timeout)
+        self._release_lock(request)
+
     def process_response(self, request, response):
         """Sets the cache, if needed."""
         if not self._should_update_cache(request, response):
             # We don't need to update the cache, just return.
+            self._release_lock(request)
             return response
         if not response.status_code == 200:
+            self._release_lock(request)
             return response
         # Try to get the timeout from the "max-age" section of the "Cache-
         # Control" header before reverting to using the default cache_timeout
@@ -103,16 +141,20 @@ class UpdateCacheMiddleware(object):
             timeout = self.cache_timeout
         elif timeout == 0:
             # max-age was set to 0, don't bother caching.
+            self._release_lock(request)
             return response
         patch_response_headers(response, timeout)
         if timeout:
-            cache_key = learn_cache_key(request, response, timeout, self.key_prefix, cache=self.cache)
+            cache_key = learn_cache_key(request, response,
+                timeout + self.cache_stale_seconds, self.key_prefix, cache=self.cache)
             if hasattr(response, 'render') and callable(response.render):
                 response.add_post_render_callback(
-                    lambda r: self.cache.set(cache_key, r, timeout)
+                    lambda r: self._update_cache(request, cache_key, r, timeout)
                 )
             else:
-                self.cache.set(cache_key, response, timeout)
+                self._update_cache(request, cache_key, response, timeout)
+        else:
+            self._release_lock(request)
         return response
 
 class FetchFromCacheMiddleware(object):
@@ -127,9 +169,33 @@ class FetchFromCacheMiddleware(object):
         self.cache_timeout = settings.CACHE_MIDDLEWARE_SECONDS
         self.key_prefix = settings.CACHE_MIDDLEWARE_KEY_PREFIX
         self.cache_anonymous_only = getattr(settings, 'CACHE_MIDDLEWARE_ANONYMOUS_ONLY', False)
+        self.cache_stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.cache_early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
         self.cache = get_cache(self.cache_alias)
 
+    def _should_regenerate(self, request, cache_key, expires, duration):
+        """
+        Returns True if this request must regenerate the cached page, which
+        expires at the given time and took 'duration' seconds to generate.
+        Only one request regenerates a page at a time, the others keep getting
+        the cached one.
+        """
+        now = time.time()
+        if now < expires:
+            if not self.cache_early_refresh:
+                return False
+            # Refresh the page early with a probability that grows as its
+            # expiry gets closer than the time it takes to generate it.
+            if now - duration * math.log(1.0 - random.random()) < expires:
+                return False
+        lock_key = '%s.regenerating' % cache_key
+        # The lock expires in case the request never finishes.
+        if not self.cache.add(lock_key, True, int(duration) + 10):
+            return False
+        request._cache_lock_key = lock_key
+        return True
+
     def process_request(self, request):
         """
         Checks whether the page is already cached and returns the cached
@@ -143,6 +209,7 @@ class FetchFromCacheMiddleware(object):
         cache_key = get_cache_key(request, self.key_prefix, 'GET', cache=self.cache)
         if cache_key is None:
             request._cache_update_cache = True
+            request._cache_start = time.time()
             return None # No cache information available, need to rebuild.
         response = self.cache.get(cache_key, None)
         # if it wasn't found and we are looking for a HEAD, try looking just for that
@@ -152,8 +219,17 @@ class FetchFromCacheMiddleware(object):
 
         if response is None:
             request._cache_update_cache = True
+            request._cache_start = time.time()
             return None # No cache information available, need to rebuild.
 
+        if isinstance(response, tuple):
+            # Stored with its expiry time, see CACHE_MIDDLEWARE_STALE_SECONDS.
+            response, expires, duration = response
+            if self._should_regenerate(request, cache_key, expires, duration):
+                request._cache_update_cache = True
+                request._cache_start = time.time()
+                return None
+
         # hit, return cached response
         request._cache_update_cache = False
         return response
@@ -201,5 +277,8 @@ class CacheMiddleware(UpdateCacheMiddleware, FetchFromCacheMiddleware):
         else:
             self.cache_anonymous_only = cache_anonymous_only
 
+        self.cache_stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.cache_early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
+
         self.cache = get_cache(self.cache_alias, **cache_kwargs)
         self.cache_timeout = self.cache.default_timeout
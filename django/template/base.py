@@ -53,6 +53,9 @@ ALLOWED_VARIABLE_CHARS = ('abcdefghijklmnopqrstuvwxyz'
 # (e.g. strings)
 UNKNOWN_SOURCE = '<unknown source>'
 
+# the minimum number of characters in the chunks yielded by Template.stream()
+STREAM_CHUNK_SIZE = 8192
+
 # match a variable or block tag and capture the entire tag, including start/end
 # delimiters
 tag_re = (re.compile('(%s.*?%s|%s.*?%s|%s.*?%s)' %
@@ -133,6 +136,14 @@ class Template(object):
     def _render(self, context):
         return self.nodelist.render(context)
 
+    def compile(self):
+        """
+        Compiles the node tree of the template so that rendering it doesn't
+        go through the render() method of every node.
+        """
+        from django.template.compiler import compile_nodelist
+        compile_nodelist(self.nodelist)
+
     def render(self, context):
         "Display stage -- can be called many times"
         context.render_context.push()
@@ -141,6 +152,26 @@ class Template(object):
         finally:
             context.render_context.pop()
 
+    def stream(self, context):
+        """
+        Renders the template like render(), but returns a generator of
+        unicode chunks of at least STREAM_CHUNK_SIZE characters (but the last
+        one), produced as the rendering goes.
+        """
+        context.render_context.push()
+        try:
+            chunk, size = [], 0
+            for bit in self.nodelist.stream(context):
+                chunk.append(bit)
+                size += len(bit)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield u''.join(chunk)
+                    chunk, size = [], 0
+            if chunk:
+                yield u''.join(chunk)
+        finally:
+            context.render_context.pop()
+
 def compile_string(template_string, origin):
     "Compiles template_string into NodeList ready for rendering"
     if settings.TEMPLATE_DEBUG:
@@ -676,6 +707,8 @@ class Variable(object):
         self.lookups = None
         self.translate = False
         self.message_context = None
+        # Maps (bit position, object type) pairs to the lookup to try first.
+        self._lookup_strategies = {}
 
         try:
             # First try to treat this variable as a number.
@@ -745,23 +778,40 @@ class Variable(object):
         instead.
         """
         current = context
+        strategies = self._lookup_strategies
         try:  # catch-all for silent variable failures
-            for bit in self.lookups:
-                try:  # dictionary lookup
-                    current = current[bit]
-                except (TypeError, AttributeError, KeyError):
-                    try:  # attribute lookup
+            for i, bit in enumerate(self.lookups):
+                key = (i, type(current))
+                strategy = strategies.get(key)
+                if strategy is None:
+                    variable_lookup_stats['misses'] += 1
+                    current, strategy = _lookup_bit(current, bit)
+                    strategies[key] = _remembered_strategy(strategy, key[1], bit)
+                elif strategy == DICT_LOOKUP:
+                    try:
+                        current = current[bit]
+                        variable_lookup_stats['hits'] += 1
+                    except (TypeError, AttributeError, KeyError):
+                        variable_lookup_stats['fallbacks'] += 1
+                        current, _ = _lookup_bit(current, bit, skip_dict=True)
+                elif strategy == ATTRIBUTE_LOOKUP:
+                    try:
                         current = getattr(current, bit)
+                        variable_lookup_stats['hits'] += 1
                     except (TypeError, AttributeError):
-                        try:  # list-index lookup
-                            current = current[int(bit)]
-                        except (IndexError,  # list index out of range
-                                ValueError,  # invalid literal for int()
-                                KeyError,    # current is a dict without `int(bit)` key
-                                TypeError):  # unsubscriptable object
-                            raise VariableDoesNotExist("Failed lookup for key "
-                                                       "[%s] in %r",
-                                                       (bit, current))  # missing attribute
+                        # The dictionary lookup can't succeed on this type.
+                        variable_lookup_stats['fallbacks'] += 1
+                        current, _ = _lookup_bit(current, bit,
+                                                 skip_dict=True, skip_attr=True)
+                else:
+                    try:
+                        current = current[int(bit)]
+                        variable_lookup_stats['hits'] += 1
+                    except (IndexError, ValueError, KeyError, TypeError):
+                        variable_lookup_stats['fallbacks'] += 1
+                        raise VariableDoesNotExist("Failed lookup for key "
+                                                   "[%s] in %r",
+                                                   (bit, current))
                 if callable(current):
                     if getattr(current, 'do_not_call_in_templates', False):
                         pass
@@ -782,6 +832,67 @@ class Variable(object):
 
         return current
 
+# The ways Variable looks up a bit of a dotted variable, in the order they are
+# tried.
+DICT_LOOKUP = 'dict'
+ATTRIBUTE_LOOKUP = 'attribute'
+INDEX_LOOKUP = 'index'
+
+# How often variables reused the lookup that succeeded for the same type of
+# object before ('hits'), had to try each lookup in turn ('misses'), and
+# reused a lookup that failed this time ('fallbacks').
+variable_lookup_stats = {'hits': 0, 'misses': 0, 'fallbacks': 0}
+
+# The __getitem__ methods that always raise TypeError for a string key.
+_sequence_getitems = (list.__getitem__, tuple.__getitem__,
+                      str.__getitem__, unicode.__getitem__)
+
+def _lookup_bit(current, bit, skip_dict=False, skip_attr=False):
+    """
+    Looks up a bit of a dotted variable in current, trying a dictionary
+    lookup, an attribute lookup and a list-index lookup in turn. Returns the
+    value and the kind of lookup that found it.
+    """
+    if not skip_dict:
+        try:  # dictionary lookup
+            return current[bit], DICT_LOOKUP
+        except (TypeError, AttributeError, KeyError):
+            pass
+    if not skip_attr:
+        try:  # attribute lookup
+            return getattr(current, bit), ATTRIBUTE_LOOKUP
+        except (TypeError, AttributeError):
+            pass
+    try:  # list-index lookup
+        return current[int(bit)], INDEX_LOOKUP
+    except (IndexError,  # list index out of range
+            ValueError,  # invalid literal for int()
+            KeyError,    # current is a dict without `int(bit)` key
+            TypeError):  # unsubscriptable object
+        raise VariableDoesNotExist("Failed lookup for key "
+                                   "[%s] in %r",
+                                   (bit, current))  # missing attribute
+
+def _remembered_strategy(strategy, obj_type, bit):
+    """
+    Returns the lookup a Variable should try first for the given bit the
+    next time it looks it up in an object of the given type, after the given
+    lookup succeeded. A lookup is only remembered if the ones before it can't
+    succeed for any object of that type, so that the result is the same as
+    trying each lookup in turn.
+    """
+    if strategy == DICT_LOOKUP:
+        return DICT_LOOKUP
+    getitem = getattr(obj_type, '__getitem__', None)
+    if getitem is not None and getitem not in _sequence_getitems:
+        # A dictionary lookup could succeed for another object.
+        return None
+    if strategy == ATTRIBUTE_LOOKUP:
+        return ATTRIBUTE_LOOKUP
+    if obj_type in (list, tuple):
+        return INDEX_LOOKUP
+    return None
+
 class Node(object):
     # Set this to True for nodes that must be first in the template (although
     # they can be preceded by text nodes.
@@ -794,6 +905,13 @@ class Node(object):
         """
         pass
 
+    def stream(self, context):
+        """
+        Yield the node rendered as a sequence of strings. By default, the
+        node is rendered in one piece.
+        """
+        yield self.render(context)
+
     def __iter__(self):
         yield self
 
@@ -826,6 +944,14 @@ class NodeList(list):
             bits.append(force_unicode(bit))
         return mark_safe(u''.join(bits))
 
+    def stream(self, context):
+        for node in self:
+            if isinstance(node, Node):
+                for bit in self.stream_node(node, context):
+                    yield force_unicode(bit)
+            else:
+                yield force_unicode(node)
+
     def get_nodes_by_type(self, nodetype):
         "Return a list of all nodes of the given type"
         nodes = []
@@ -836,6 +962,9 @@ class NodeList(list):
     def render_node(self, node, context):
         return node.render(context)
 
+    def stream_node(self, node, context):
+        return node.stream(context)
+
 class TextNode(Node):
     def __init__(self, s):
         self.s = s
@@ -0,0 +1,188 @@
+"""
+Compilation of parsed templates into chains of closures.
+
+Rendering a NodeList normally dispatches to the render() method of each of
+its nodes. compile_nodelist() instead builds, once, a render function for
+each NodeList of a template out of closures specialized for the built-in
+nodes (text, variables, {% if %}, {% for %} and {% with %}). Any other node
+is rendered by its own render() method, but the NodeLists it contains are
+compiled too.
+
+The compiled function is stored as the ``render`` attribute of the NodeList
+instance, so nodes that render their children through ``nodelist.render()``
+use it transparently.
+"""
+
+from django.template.base import (Node, NodeList, TextNode, VariableNode,
+    VariableDoesNotExist, _render_value_in_context)
+from django.template.defaulttags import ForNode, IfNode, WithNode
+from django.utils.encoding import force_unicode
+from django.utils.safestring import mark_safe
+
+
+def compile_nodelist(nodelist):
+    """
+    Compiles the NodeList and the NodeLists nested in it. NodeList
+    subclasses, such as the DebugNodeList used when TEMPLATE_DEBUG is True,
+    are left alone.
+    """
+    if type(nodelist) is not NodeList:
+        return nodelist
+    renderers = compile_renderers(nodelist)
+    if not renderers:
+        render = lambda context: mark_safe(u'')
+    elif len(renderers) == 1:
+        renderer = renderers[0]
+        render = lambda context: mark_safe(renderer(context))
+    else:
+        def render(context):
+            return mark_safe(u''.join([renderer(context) for renderer in renderers]))
+    nodelist.render = render
+    nodelist.renderers = renderers
+    return nodelist
+
+def compile_renderers(nodelist):
+    """
+    Returns a list of functions that each take a context and return a part
+    of the rendered NodeList as unicode.
+    """
+    renderers = []
+    text = []
+    for node in nodelist:
+        if type(node) is TextNode:
+            text.append(force_unicode(node.s))
+            continue
+        if not isinstance(node, Node):
+            text.append(force_unicode(node))
+            continue
+        if text:
+            renderers.append(constant_renderer(u''.join(text)))
+            text = []
+        compiler = NODE_COMPILERS.get(type(node), compile_node)
+        renderers.append(compiler(node))
+    if text:
+        renderers.append(constant_renderer(u''.join(text)))
+    return renderers
+
+def constant_renderer(text):
+    return lambda context: text
+
+def compile_node(node):
+    """
+    Falls back to the node's own render() method.
+    """
+    for attr in node.child_nodelists:
+        nodelist = getattr(node, attr, None)
+        if isinstance(nodelist, NodeList):
+            compile_nodelist(nodelist)
+    node_render = node.render
+    return lambda context: force_unicode(node_render(context))
+
+def compile_variable_node(node):
+    resolve = node.filter_expression.resolve
+    def render(context):
+        try:
+            output = resolve(context)
+        except UnicodeDecodeError:
+            # See VariableNode.render().
+            return u''
+        return _render_value_in_context(output, context)
+    return render
+
+def compile_if_node(node):
+    conditions = []
+    for condition, nodelist in node.conditions_nodelists:
+        conditions.append((condition, compile_nodelist(nodelist).render))
+    def render(context):
+        for condition, nodelist_render in conditions:
+            if condition is not None:
+                try:
+                    match = condition.eval(context)
+                except VariableDoesNotExist:
+                    match = None
+            else:
+                match = True
+            if match:
+                return nodelist_render(context)
+        return u''
+    return render
+
+def compile_with_node(node):
+    extra_context = node.extra_context.items()
+    nodelist_render = compile_nodelist(node.nodelist).render
+    def render(context):
+        values = dict([(key, val.resolve(context)) for key, val in extra_context])
+        context.update(values)
+        output = nodelist_render(context)
+        context.pop()
+        return output
+    return render
+
+def compile_for_node(node):
+    loopvars = node.loopvars
+    loopvar = loopvars[0]
+    unpack = len(loopvars) > 1
+    resolve_sequence = node.sequence.resolve
+    is_reversed = node.is_reversed
+    if type(node.nodelist_loop) is not NodeList:
+        return compile_node(node)
+    renderers = compile_nodelist(node.nodelist_loop).renderers
+    empty_render = compile_nodelist(node.nodelist_empty).render
+    # See ForNode.render(), which this mirrors.
+    def render(context):
+        if 'forloop' in context:
+            parentloop = context['forloop']
+        else:
+            parentloop = {}
+        context.push()
+        try:
+            values = resolve_sequence(context, True)
+        except VariableDoesNotExist:
+            values = []
+        if values is None:
+            values = []
+        if not hasattr(values, '__len__'):
+            values = list(values)
+        len_values = len(values)
+        if len_values < 1:
+            context.pop()
+            return empty_render(context)
+        bits = []
+        append = bits.append
+        if is_reversed:
+            values = reversed(values)
+        loop_dict = context['forloop'] = {'parentloop': parentloop}
+        for i, item in enumerate(values):
+            loop_dict['counter0'] = i
+            loop_dict['counter'] = i + 1
+            loop_dict['revcounter'] = len_values - i
+            loop_dict['revcounter0'] = len_values - i - 1
+            loop_dict['first'] = (i == 0)
+            loop_dict['last'] = (i == len_values - 1)
+            pop_context = False
+            if unpack:
+                try:
+                    unpacked_vars = dict(zip(loopvars, item))
+                except TypeError:
+                    pass
+                else:
+                    pop_context = True
+                    context.update(unpacked_vars)
+            else:
+                context[loopvar] = item
+            for renderer in renderers:
+                append(renderer(context))
+            if pop_context:
+                context.pop()
+        context.pop()
+        return mark_safe(u''.join(bits))
+    return render
+
+# Maps node classes to the functions that compile them. Subclasses of these
+# nodes are rendered by their own render() method since they may override it.
+NODE_COMPILERS = {
+    VariableNode: compile_variable_node,
+    IfNode: compile_if_node,
+    WithNode: compile_with_node,
+    ForNode: compile_for_node,
+}
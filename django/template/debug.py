@@ -77,6 +77,15 @@ class DebugNodeList(NodeList):
                 e.django_template_source = node.source
             raise
 
+    def stream_node(self, node, context):
+        try:
+            for bit in node.stream(context):
+                yield bit
+        except Exception, e:
+            if not hasattr(e, 'django_template_source'):
+                e.django_template_source = node.source
+            raise
+
 
 class DebugVariableNode(VariableNode):
     def render(self, context):
@@ -128,7 +128,11 @@ class ForNode(Node):
         for node in self.nodelist_empty:
             yield node
 
-    def render(self, context):
+    def loop(self, context):
+        """
+        Yields once for each item of the sequence, with the loop variables
+        set in the context. Yields nothing if the sequence is empty.
+        """
         if 'forloop' in context:
             parentloop = context['forloop']
         else:
@@ -145,8 +149,7 @@ class ForNode(Node):
         len_values = len(values)
         if len_values < 1:
             context.pop()
-            return self.nodelist_empty.render(context)
-        nodelist = NodeList()
+            return
         if self.is_reversed:
             values = reversed(values)
         unpack = len(self.loopvars) > 1
@@ -177,6 +180,21 @@ class ForNode(Node):
                     context.update(unpacked_vars)
             else:
                 context[self.loopvars[0]] = item
+            yield
+            if pop_context:
+                # The loop variables were pushed on to the context so pop them
+                # off again. This is necessary because the tag lets the length
+                # of loopvars differ to the length of each set of items and we
+                # don't want to leave any vars from the previous loop on the
+                # context.
+                context.pop()
+        context.pop()
+
+    def render(self, context):
+        nodelist = NodeList()
+        looped = False
+        for _ in self.loop(context):
+            looped = True
             # In TEMPLATE_DEBUG mode provide source of the node which
             # actually raised the exception
             if settings.TEMPLATE_DEBUG:
@@ -190,16 +208,20 @@ class ForNode(Node):
             else:
                 for node in self.nodelist_loop:
                     nodelist.append(node.render(context))
-            if pop_context:
-                # The loop variables were pushed on to the context so pop them
-                # off again. This is necessary because the tag lets the length
-                # of loopvars differ to the length of each set of items and we
-                # don't want to leave any vars from the previous loop on the
-                # context.
-                context.pop()
-        context.pop()
+        if not looped:
+            return self.nodelist_empty.render(context)
         return nodelist.render(context)
 
+    def stream(self, context):
+        looped = False
+        for _ in self.loop(context):
+            looped = True
+            for bit in self.nodelist_loop.stream(context):
+                yield bit
+        if not looped:
+            for bit in self.nodelist_empty.stream(context):
+                yield bit
+
 class IfChangedNode(Node):
     child_nodelists = ('nodelist_true', 'nodelist_false')
 
@@ -266,7 +288,11 @@ class IfNode(Node):
     def nodelist(self):
         return NodeList(node for _, nodelist in self.conditions_nodelists for node in nodelist)
 
-    def render(self, context):
+    def matching_nodelist(self, context):
+        """
+        Returns the nodelist of the first clause whose condition is true, or
+        None.
+        """
         for condition, nodelist in self.conditions_nodelists:
 
             if condition is not None:           # if / elif clause
@@ -278,9 +304,21 @@ class IfNode(Node):
                 match = True
 
             if match:
-                return nodelist.render(context)
+                return nodelist
 
-        return ''
+        return None
+
+    def render(self, context):
+        nodelist = self.matching_nodelist(context)
+        if nodelist is None:
+            return ''
+        return nodelist.render(context)
+
+    def stream(self, context):
+        nodelist = self.matching_nodelist(context)
+        if nodelist is not None:
+            for bit in nodelist.stream(context):
+                yield bit
 
 class RegroupNode(Node):
     def __init__(self, target, expression, var_name):
@@ -25,6 +25,8 @@
 # Python eggs) sets is_usable to False if the "pkg_resources" module isn't
 # installed, because pkg_resources is necessary to read eggs.
 
+import os
+
 from django.core.exceptions import ImproperlyConfigured
 from django.template.base import Origin, Template, Context, TemplateDoesNotExist, add_to_builtins
 from django.utils.importlib import import_module
@@ -62,6 +64,13 @@ class BaseLoader(object):
         """
         raise NotImplementedError
 
+    def get_template_names(self):
+        """
+        Returns the names of all the templates this loader can find, or an
+        empty list if it can't list them.
+        """
+        return []
+
     def reset(self):
         """
         Resets any state maintained by the loader instance (e.g., cached
@@ -78,6 +87,27 @@ class LoaderOrigin(Origin):
     def reload(self):
         return self.loader(self.loadname, self.dirs)[0]
 
+def find_template_names(template_dirs):
+    """
+    Returns the names of the files in the given template directories, in the
+    order they are found. Hidden files and directories are skipped.
+    """
+    names = []
+    seen = set()
+    for template_dir in template_dirs:
+        for dirpath, dirnames, filenames in os.walk(template_dir, followlinks=True):
+            dirnames[:] = sorted([d for d in dirnames if not d.startswith('.')])
+            relpath = os.path.relpath(dirpath, template_dir)
+            for filename in sorted(filenames):
+                if filename.startswith('.'):
+                    continue
+                name = os.path.normpath(os.path.join(relpath, filename))
+                name = name.replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+    return names
+
 def make_origin(display_name, loader, name, dirs):
     if settings.TEMPLATE_DEBUG and display_name:
         return LoaderOrigin(display_name, loader, name, dirs)
@@ -117,7 +147,7 @@ def find_template_loader(loader):
     else:
         raise ImproperlyConfigured('Loader does not define a "load_template" callable template source loader')
 
-def find_template(name, dirs=None):
+def get_template_source_loaders():
     # Calculate template_source_loaders the first time the function is executed
     # because putting this logic in the module-level namespace may cause
     # circular import errors. See Django ticket #1292.
@@ -129,7 +159,10 @@ def find_template(name, dirs=None):
             if loader is not None:
                 loaders.append(loader)
         template_source_loaders = tuple(loaders)
-    for loader in template_source_loaders:
+    return template_source_loaders
+
+def find_template(name, dirs=None):
+    for loader in get_template_source_loaders():
         try:
             source, display_name = loader(name, dirs)
             return (source, make_origin(display_name, loader, name, dirs))
@@ -137,6 +170,15 @@ def find_template(name, dirs=None):
             pass
     raise TemplateDoesNotExist(name)
 
+def preload_templates():
+    """
+    Loads all the templates in advance with the loaders that support it (see
+    django.template.loaders.cached.Loader.preload()).
+    """
+    for loader in get_template_source_loaders():
+        if hasattr(loader, 'preload'):
+            loader.preload()
+
 def get_template(template_name):
     """
     Returns a compiled Template object for the given template name,
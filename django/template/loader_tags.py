@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.template.base import TemplateSyntaxError, Library, Node, TextNode,\
-    token_kwargs, Variable
+    token_kwargs, Variable, TemplateDoesNotExist
 from django.template.loader import get_template
 from django.utils.safestring import mark_safe
 
@@ -45,26 +45,43 @@ class BlockNode(Node):
     def __repr__(self):
         return "<Block Node: %s. Contents: %r>" % (self.name, self.nodelist)
 
-    def render(self, context):
+    def push_block(self, context):
+        """
+        Pushes the block that overrides this one, if any, on the context and
+        returns it along with the block to put back in the block context
+        afterwards.
+        """
         block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
         context.push()
         if block_context is None:
             context['block'] = self
-            result = self.nodelist.render(context)
-        else:
-            push = block = block_context.pop(self.name)
-            if block is None:
-                block = self
-            # Create new block so we can store context without thread-safety issues.
-            block = BlockNode(block.name, block.nodelist)
-            block.context = context
-            context['block'] = block
-            result = block.nodelist.render(context)
-            if push is not None:
-                block_context.push(self.name, push)
+            return self, None
+        push = block = block_context.pop(self.name)
+        if block is None:
+            block = self
+        # Create new block so we can store context without thread-safety issues.
+        block = BlockNode(block.name, block.nodelist)
+        block.context = context
+        context['block'] = block
+        return block, push
+
+    def pop_block(self, context, push):
+        if push is not None:
+            context.render_context[BLOCK_CONTEXT_KEY].push(self.name, push)
         context.pop()
+
+    def render(self, context):
+        block, push = self.push_block(context)
+        result = block.nodelist.render(context)
+        self.pop_block(context, push)
         return result
 
+    def stream(self, context):
+        block, push = self.push_block(context)
+        for bit in block.nodelist.stream(context):
+            yield bit
+        self.pop_block(context, push)
+
     def super(self):
         render_context = self.context.render_context
         if (BLOCK_CONTEXT_KEY in render_context and
@@ -74,6 +91,8 @@ class BlockNode(Node):
 
 class ExtendsNode(Node):
     must_be_first = True
+    # The parent template, when it's loaded in advance by link_parent().
+    parent_template = None
 
     def __init__(self, nodelist, parent_name, template_dirs=None):
         self.nodelist = nodelist
@@ -84,7 +103,21 @@ class ExtendsNode(Node):
     def __repr__(self):
         return '<ExtendsNode: extends %s>' % self.parent_name.token
 
+    def link_parent(self):
+        """
+        Loads the parent template once and for all if its name is a constant.
+        """
+        if self.parent_name.filters or not isinstance(self.parent_name.var, basestring):
+            return
+        try:
+            self.parent_template = get_template(self.parent_name.var)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # The error is raised when the template is rendered.
+            pass
+
     def get_parent(self, context):
+        if self.parent_template is not None:
+            return self.parent_template
         parent = self.parent_name.resolve(context)
         if not parent:
             error_msg = "Invalid template name in 'extends' tag: %r." % parent
@@ -98,6 +131,21 @@ class ExtendsNode(Node):
         return get_template(parent)
 
     def render(self, context):
+        compiled_parent = self.prepare_parent(context)
+        # Call Template._render explicitly so the parser context stays
+        # the same.
+        return compiled_parent._render(context)
+
+    def stream(self, context):
+        compiled_parent = self.prepare_parent(context)
+        for bit in compiled_parent.nodelist.stream(context):
+            yield bit
+
+    def prepare_parent(self, context):
+        """
+        Returns the parent template, after adding the blocks of this
+        template to the block context.
+        """
         compiled_parent = self.get_parent(context)
 
         if BLOCK_CONTEXT_KEY not in context.render_context:
@@ -117,10 +165,7 @@ class ExtendsNode(Node):
                                    compiled_parent.nodelist.get_nodes_by_type(BlockNode)])
                     block_context.add_blocks(blocks)
                 break
-
-        # Call Template._render explicitly so the parser context stays
-        # the same.
-        return compiled_parent._render(context)
+        return compiled_parent
 
 class BaseIncludeNode(Node):
     def __init__(self, *args, **kwargs):
@@ -141,14 +186,29 @@ class BaseIncludeNode(Node):
 class ConstantIncludeNode(BaseIncludeNode):
     def __init__(self, template_path, *args, **kwargs):
         super(ConstantIncludeNode, self).__init__(*args, **kwargs)
+        self.template_path = template_path
+        self.load_template()
+
+    def load_template(self):
         try:
-            t = get_template(template_path)
+            t = get_template(self.template_path)
             self.template = t
         except:
             if settings.TEMPLATE_DEBUG:
                 raise
             self.template = None
 
+    def __getstate__(self):
+        # The included template is loaded again when unpickling, so that
+        # changes to it are picked up.
+        state = self.__dict__.copy()
+        del state['template']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.load_template()
+
     def render(self, context):
         if not self.template:
             return ''
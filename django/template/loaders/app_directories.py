@@ -9,7 +9,7 @@ import sys
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.template.base import TemplateDoesNotExist
-from django.template.loader import BaseLoader
+from django.template.loader import BaseLoader, find_template_names
 from django.utils._os import safe_join
 from django.utils.importlib import import_module
 
@@ -61,4 +61,7 @@ class Loader(BaseLoader):
                 pass
         raise TemplateDoesNotExist(template_name)
 
+    def get_template_names(self):
+        return find_template_names(app_template_dirs)
+
 _loader = Loader()
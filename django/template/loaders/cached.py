@@ -4,8 +4,20 @@ to load templates from them in order, caching the result.
 """
 
 import hashlib
-from django.template.base import TemplateDoesNotExist
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.conf import settings
+from django.template.base import Template, TemplateDoesNotExist, TemplateSyntaxError
 from django.template.loader import BaseLoader, get_template_from_string, find_template_loader, make_origin
+from django.utils.encoding import smart_str
+from django.utils.log import getLogger
+
+logger = getLogger('django.template')
+
+PERSISTENT_KEY_PREFIX = 'django.template.loaders.cached'
 
 class Loader(BaseLoader):
     is_usable = True
@@ -14,6 +26,7 @@ class Loader(BaseLoader):
         self.template_cache = {}
         self._loaders = loaders
         self._cached_loaders = []
+        self._persistent_caches = {}
 
     @property
     def loaders(self):
@@ -27,15 +40,78 @@ class Loader(BaseLoader):
             self._cached_loaders = cached_loaders
         return self._cached_loaders
 
+    @property
+    def persistent_cache(self):
+        """
+        The cache given by TEMPLATE_CACHE_ALIAS, or None.
+        """
+        alias = settings.TEMPLATE_CACHE_ALIAS
+        if alias is None:
+            return None
+        if alias not in self._persistent_caches:
+            from django.core.cache import get_cache
+            self._persistent_caches[alias] = get_cache(alias)
+        return self._persistent_caches[alias]
+
     def find_template(self, name, dirs=None):
+        persistent_cache = self.persistent_cache
         for loader in self.loaders:
             try:
-                template, display_name = loader(name, dirs)
+                if persistent_cache is not None and hasattr(loader, 'load_template_source'):
+                    template, display_name = self.load_persisted_template(
+                        persistent_cache, loader, name, dirs)
+                else:
+                    template, display_name = loader(name, dirs)
                 return (template, make_origin(display_name, loader, name, dirs))
             except TemplateDoesNotExist:
                 pass
         raise TemplateDoesNotExist(name)
 
+    def load_persisted_template(self, cache, loader, name, dirs):
+        """
+        Works like loader.load_template(), but reuses the parsed template
+        stored in the cache by any process that parsed the same source.
+        """
+        source, display_name = loader.load_template_source(name, dirs)
+        # The key depends on the source, so a modified template is parsed
+        # again rather than read from the cache.
+        key = hashlib.sha1('\0'.join([smart_str(name), smart_str(display_name),
+                                      smart_str(source)]))
+        key = '%s.%s' % (PERSISTENT_KEY_PREFIX, key.hexdigest())
+        data = cache.get(key)
+        if data is not None:
+            try:
+                return pickle.loads(data), None
+            except Exception:
+                # The code the template was pickled with changed (e.g. a tag
+                # library was removed); parse it again.
+                pass
+        origin = make_origin(display_name, loader.load_template_source, name, dirs)
+        try:
+            template = get_template_from_string(source, origin, name)
+        except TemplateDoesNotExist:
+            return source, display_name
+        try:
+            data = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Some nodes (e.g. of custom tags holding functions) can't be
+            # pickled, nor can templates loaded with TEMPLATE_DEBUG.
+            pass
+        else:
+            cache.set(key, data)
+        return template, None
+
+    def get_template_names(self):
+        names = []
+        seen = set()
+        for loader in self.loaders:
+            if hasattr(loader, 'get_template_names'):
+                for name in loader.get_template_names():
+                    if name not in seen:
+                        seen.add(name)
+                        names.append(name)
+        return names
+
     def load_template(self, template_name, template_dirs=None):
         key = template_name
         if template_dirs:
@@ -53,9 +129,39 @@ class Loader(BaseLoader):
                     # we were asked to load. This allows for correct identification (later)
                     # of the actual template that does not exist.
                     return template, origin
+            if settings.TEMPLATE_COMPILE and isinstance(template, Template):
+                template.compile()
             self.template_cache[key] = template
         return self.template_cache[key], None
 
+    def preload(self):
+        """
+        Loads all the templates the wrapped loaders can list, and links the
+        templates that extend a template with a constant name to it.
+        """
+        from django.template.loader_tags import ExtendsNode
+        templates = []
+        for name in self.get_template_names():
+            try:
+                template, origin = self.load_template(name)
+            except TemplateDoesNotExist:
+                continue
+            except (TemplateSyntaxError, UnicodeDecodeError), e:
+                # Not every file in a template directory is a template.
+                logger.debug('Skipped preloading template %s: %s' % (name, e))
+                continue
+            except Exception:
+                if settings.DEBUG:
+                    raise
+                logger.error('Error preloading template %s' % name,
+                    exc_info=True)
+                continue
+            if isinstance(template, Template):
+                templates.append(template)
+        for template in templates:
+            for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+                node.link_parent()
+
     def reset(self):
         "Empty the template cache."
         self.template_cache.clear()
@@ -4,7 +4,7 @@ Wrapper for loading templates from the filesystem.
 
 from django.conf import settings
 from django.template.base import TemplateDoesNotExist
-from django.template.loader import BaseLoader
+from django.template.loader import BaseLoader, find_template_names
 from django.utils._os import safe_join
 
 class Loader(BaseLoader):
@@ -48,4 +48,7 @@ class Loader(BaseLoader):
         raise TemplateDoesNotExist(error_msg)
     load_template_source.is_usable = True
 
+    def get_template_names(self):
+        return find_template_names(settings.TEMPLATE_DIRS)
+
 _loader = Loader()
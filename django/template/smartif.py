@@ -62,6 +62,9 @@ def infix(bp, func):
                 # %} where 'bar' does not support 'in', so default to False
                 return False
 
+        def __reduce__(self):
+            return (create_operator, (self.id,), self.__dict__)
+
     return Operator
 
 
@@ -84,9 +87,20 @@ def prefix(bp, func):
             except Exception:
                 return False
 
+        def __reduce__(self):
+            return (create_operator, (self.id,), self.__dict__)
+
     return Operator
 
 
+def create_operator(id):
+    """
+    Creates an instance of the operator with the given id. Operator classes
+    are created dynamically, so their instances are pickled with this.
+    """
+    return OPERATORS[id]()
+
+
 # Operator precedence follows Python.
 # NB - we can get slightly more accurate syntax error messages by not using the
 # same object for '==' and '='.
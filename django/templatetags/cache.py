@@ -2,16 +2,28 @@ import hashlib
 from django.template import Library, Node, TemplateSyntaxError, Variable, VariableDoesNotExist
 from django.template import resolve_variable
 from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Model, get_model
+from django.db.models.query import QuerySet
+from django.db.models.query_cache import (get_query_cache, get_generations,
+    generation_key, bulk_generation_key, model_tables, query_tables)
 from django.utils.http import urlquote
 
 register = Library()
 
 class CacheNode(Node):
-    def __init__(self, nodelist, expire_time_var, fragment_name, vary_on):
+    def __init__(self, nodelist, expire_time_var, fragment_name, vary_on,
+                 dependencies=(), siblings=None):
         self.nodelist = nodelist
         self.expire_time_var = Variable(expire_time_var)
         self.fragment_name = fragment_name
         self.vary_on = vary_on
+        self.dependencies = [Variable(var) for var in dependencies]
+        # The cache nodes of the same template, whose fragments are fetched
+        # from the cache together.
+        if siblings is None:
+            siblings = [self]
+        self.siblings = siblings
 
     def render(self, context):
         try:
@@ -22,15 +34,117 @@ class CacheNode(Node):
             expire_time = int(expire_time)
         except (ValueError, TypeError):
             raise TemplateSyntaxError('"cache" tag got a non-integer timeout value: %r' % expire_time)
-        # Build a unicode key for this fragment and all vary-on's.
-        args = hashlib.md5(u':'.join([urlquote(resolve_variable(var, context)) for var in self.vary_on]))
-        cache_key = 'template.cache.%s.%s' % (self.fragment_name, args.hexdigest())
-        value = cache.get(cache_key)
+        base_key = self.base_key(context)
+        generation_keys = self.generation_keys(context)
+        generations, fragments = self.prefetch(context)
+        missing = [key for key in generation_keys if key not in generations]
+        if missing:
+            generations.update(get_generations(get_query_cache(), missing))
+        cache_key = self.cache_key(base_key, generation_keys, generations)
+        if cache_key in fragments:
+            value = fragments[cache_key]
+        else:
+            value = cache.get(cache_key)
         if value is None:
             value = self.nodelist.render(context)
             cache.set(cache_key, value, expire_time)
+            fragments[cache_key] = value
         return value
 
+    def base_key(self, context):
+        # Build a unicode key for this fragment and all vary-on's.
+        args = hashlib.md5(u':'.join([urlquote(resolve_variable(var, context)) for var in self.vary_on]))
+        return 'template.cache.%s.%s' % (self.fragment_name, args.hexdigest())
+
+    def cache_key(self, base_key, generation_keys, generations):
+        if not generation_keys:
+            return base_key
+        generations = [generations[key] for key in generation_keys]
+        return '%s.%s' % (base_key, hashlib.md5(repr(generations)).hexdigest())
+
+    def generation_keys(self, context):
+        """
+        Returns the keys of the generations the fragment depends on.
+        """
+        if not self.dependencies:
+            return []
+        if get_query_cache() is None:
+            raise ImproperlyConfigured("The 'depends_on' argument of the "
+                "'cache' tag requires the QUERYSET_CACHE_ALIAS setting.")
+        keys = []
+        for var in self.dependencies:
+            try:
+                value = var.resolve(context)
+            except VariableDoesNotExist:
+                raise TemplateSyntaxError('"cache" tag got an unknown variable: %r' % var.var)
+            keys.extend(dependency_generation_keys(value))
+        return keys
+
+    def prefetch(self, context):
+        """
+        Fetches the fragments of all the sibling nodes that can be computed
+        in the current context with two round trips to the cache, the first
+        time one of them is rendered in a template. Returns the dicts of the
+        generations and of the fragments fetched so far.
+        """
+        state_key = ('cache_fragments', id(self.siblings))
+        if state_key in context.render_context:
+            return context.render_context[state_key]
+        generations, fragments = {}, {}
+        context.render_context[state_key] = generations, fragments
+        keys = []
+        for node in self.siblings:
+            # Fragments nested in loops or depending on variables that are
+            # set later on are fetched when they are rendered.
+            try:
+                keys.append((node.base_key(context), node.generation_keys(context)))
+            except (VariableDoesNotExist, TemplateSyntaxError):
+                continue
+        generation_keys = set()
+        for base_key, node_generation_keys in keys:
+            generation_keys.update(node_generation_keys)
+        if generation_keys:
+            generations.update(get_generations(get_query_cache(), list(generation_keys)))
+        cache_keys = [self.cache_key(base_key, node_generation_keys, generations)
+                      for base_key, node_generation_keys in keys]
+        fragments.update(dict.fromkeys(cache_keys))
+        fragments.update(cache.get_many(cache_keys))
+        return generations, fragments
+
+def dependency_generation_keys(value):
+    """
+    Returns the keys of the generations a fragment depending on the given
+    model instance, model class, QuerySet, "app_label.ModelName" string or
+    list of those has to be invalidated with.
+    """
+    if isinstance(value, Model):
+        keys = []
+        for table in model_tables(value.__class__):
+            keys.append(generation_key(table, value.pk))
+            keys.append(bulk_generation_key(table))
+        return keys
+    if isinstance(value, QuerySet):
+        tables = query_tables(value.query) or model_tables(value.model)
+        return [generation_key(table) for table in tables]
+    if isinstance(value, basestring):
+        try:
+            app_label, model_name = value.split('.')
+        except ValueError:
+            model = None
+        else:
+            model = get_model(app_label, model_name)
+        if model is None:
+            raise TemplateSyntaxError('"cache" tag got an unknown model: %r' % value)
+        value = model
+    if isinstance(value, type) and issubclass(value, Model):
+        return [generation_key(table) for table in model_tables(value)]
+    if isinstance(value, (list, tuple)):
+        keys = []
+        for item in value:
+            keys.extend(dependency_generation_keys(item))
+        return keys
+    raise TemplateSyntaxError('"cache" tag got an invalid dependency: %r' % value)
+
 @register.tag('cache')
 def do_cache(parser, token):
     """
@@ -52,10 +166,36 @@ def do_cache(parser, token):
         {% endcache %}
 
     Each unique set of arguments will result in a unique cache entry.
+
+    The fragment can also be invalidated when models it displays change, by
+    listing model instances, model classes, QuerySets or "app_label.Model"
+    strings after ``depends_on``::
+
+        {% load cache %}
+        {% cache [expire_time] [fragment_name] [var1] .. depends_on [dep1] .. %}
+            .. some expensive processing ..
+        {% endcache %}
+
+    The fragments of all the ``cache`` tags of a template are fetched from
+    the cache at once.
     """
     nodelist = parser.parse(('endcache',))
     parser.delete_first_token()
     tokens = token.contents.split()
     if len(tokens) < 3:
         raise TemplateSyntaxError(u"'%r' tag requires at least 2 arguments." % tokens[0])
-    return CacheNode(nodelist, tokens[1], tokens[2], tokens[3:])
+    vary_on, dependencies = tokens[3:], []
+    if 'depends_on' in vary_on:
+        index = vary_on.index('depends_on')
+        vary_on, dependencies = vary_on[:index], vary_on[index + 1:]
+        if not dependencies:
+            raise TemplateSyntaxError(u"'%s' tag requires at least one argument after 'depends_on'." % tokens[0])
+    # Keep track of the cache nodes of this template so that their fragments
+    # can be fetched together.
+    try:
+        siblings = parser.__cache_nodes
+    except AttributeError: # parser.__cache_nodes isn't a list yet
+        siblings = parser.__cache_nodes = []
+    node = CacheNode(nodelist, tokens[1], tokens[2], vary_on, dependencies, siblings)
+    siblings.append(node)
+    return node
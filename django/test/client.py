@@ -23,7 +23,7 @@ from django.utils.encoding import smart_str
 from django.utils.http import urlencode
 from django.utils.importlib import import_module
 from django.utils.itercompat import is_iterable
-from django.db import close_connection
+from django.db import close_connection, close_old_connections
 from django.test.utils import ContextList
 
 __all__ = ('Client', 'RequestFactory', 'encode_file', 'encode_multipart')
@@ -72,7 +72,9 @@ class ClientHandler(BaseHandler):
         if self._request_middleware is None:
             self.load_middleware()
 
+        signals.request_started.disconnect(close_old_connections)
         signals.request_started.send(sender=self.__class__)
+        signals.request_started.connect(close_old_connections)
         try:
             request = WSGIRequest(environ)
             # sneaky little hack so that we can easily get round
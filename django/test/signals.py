@@ -26,3 +26,9 @@ def update_connections_time_zone(**kwargs):
 def clear_context_processors_cache(**kwargs):
     if kwargs['setting'] == 'TEMPLATE_CONTEXT_PROCESSORS':
         context._standard_context_processors = None
+
+@receiver(setting_changed)
+def clear_query_cache_backends(**kwargs):
+    if kwargs['setting'] in ('CACHES', 'QUERYSET_CACHE_ALIAS'):
+        from django.db.models import query_cache
+        query_cache._caches.clear()
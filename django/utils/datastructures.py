@@ -1,4 +1,5 @@
 import copy
+import threading
 from types import GeneratorType
 
 class MergeDict(object):
@@ -506,3 +507,79 @@ class DictWrapper(dict):
         if use_func:
             return self.func(value)
         return value
+
+class LRUCache(object):
+    """
+    A thread-safe mapping that holds at most 'maxsize' items. When it's full,
+    adding an item discards the least recently used one.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = {}
+        # The items are also kept in a circular doubly linked list of
+        # [prev, next, key, value] links, from the least to the most
+        # recently used, so that they can be reordered in constant time.
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<%s: %d items>' % (self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def _append(self, link):
+        root = self._root
+        last = root[0]
+        last[1] = root[0] = link
+        link[0], link[1] = last, root
+
+    def _unlink(self, link):
+        prev, next = link[0], link[1]
+        prev[1], next[0] = next, prev
+
+    def get(self, key, default=None):
+        with self._lock:
+            link = self._data.get(key)
+            if link is None:
+                return default
+            self._unlink(link)
+            self._append(link)
+            return link[3]
+
+    def __getitem__(self, key):
+        with self._lock:
+            link = self._data[key]
+            self._unlink(link)
+            self._append(link)
+            return link[3]
+
+    def __setitem__(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            link = self._data.get(key)
+            if link is not None:
+                self._unlink(link)
+                link[3] = value
+            else:
+                if len(self._data) >= self.maxsize:
+                    oldest = self._root[1]
+                    self._unlink(oldest)
+                    del self._data[oldest[2]]
+                link = [None, None, key, value]
+                self._data[key] = link
+            self._append(link)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._unlink(self._data.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._root[:] = [self._root, self._root, None, None]
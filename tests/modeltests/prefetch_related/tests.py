@@ -1,7 +1,12 @@
 from __future__ import absolute_import
 
+import gc
+import pickle
+import weakref
+
 from django.contrib.contenttypes.models import ContentType
 from django.db import connection
+from django.db.models import Prefetch
 from django.test import TestCase
 from django.test.utils import override_settings
 
@@ -198,6 +203,247 @@ class PrefetchRelatedTests(TestCase):
         self.assertTrue("name" in str(cm.exception))
 
 
+class AutoPrefetchTests(TestCase):
+
+    def setUp(self):
+        self.book1 = Book.objects.create(title="Poems")
+        self.book2 = Book.objects.create(title="Jane Eyre")
+        self.book3 = Book.objects.create(title="Sense and Sensibility")
+
+        self.author1 = Author.objects.create(name="Charlotte", first_book=self.book1)
+        self.author2 = Author.objects.create(name="Anne", first_book=self.book2)
+        self.author3 = Author.objects.create(name="Jane", first_book=self.book3)
+
+        self.book1.authors.add(self.author1, self.author2)
+        self.book2.authors.add(self.author1)
+        self.book3.authors.add(self.author3)
+
+    def test_foreignkey_forward(self):
+        with self.assertNumQueries(2):
+            books = [a.first_book for a in Author.objects.auto_prefetch()]
+        normal_books = [a.first_book for a in Author.objects.all()]
+        self.assertEqual(books, normal_books)
+
+    def test_foreignkey_reverse(self):
+        with self.assertNumQueries(2):
+            lists = [list(b.first_time_authors.all()) for b in Book.objects.auto_prefetch()]
+        normal_lists = [list(b.first_time_authors.all()) for b in Book.objects.all()]
+        self.assertEqual(lists, normal_lists)
+
+    def test_m2m(self):
+        with self.assertNumQueries(2):
+            lists = [list(b.authors.all()) for b in Book.objects.auto_prefetch()]
+        normal_lists = [list(b.authors.all()) for b in Book.objects.all()]
+        self.assertEqual(lists, normal_lists)
+
+        with self.assertNumQueries(2):
+            lists = [list(a.books.all()) for a in Author.objects.auto_prefetch()]
+        normal_lists = [list(a.books.all()) for a in Author.objects.all()]
+        self.assertEqual(lists, normal_lists)
+
+    def test_several_relations(self):
+        with self.assertNumQueries(3):
+            for author in Author.objects.auto_prefetch():
+                author.first_book
+                list(author.books.all())
+                author.first_book
+
+    def test_partial_iteration(self):
+        # The results that haven't been fetched from the database yet are
+        # fetched before the related objects.
+        from django.db.models import query
+        chunk_size = query.ITER_CHUNK_SIZE
+        query.ITER_CHUNK_SIZE = 1
+        try:
+            with self.assertNumQueries(2):
+                books = [a.first_book for a in Author.objects.auto_prefetch()]
+        finally:
+            query.ITER_CHUNK_SIZE = chunk_size
+        self.assertEqual(books, [self.book1, self.book2, self.book3])
+
+    def test_filtered_related_manager(self):
+        # Only all() can use the prefetched objects, other methods of the
+        # related managers don't prefetch them.
+        with self.assertNumQueries(4):
+            titles = [list(a.books.filter(title__startswith='P'))
+                      for a in Author.objects.auto_prefetch()]
+        self.assertEqual(titles, [[self.book1], [self.book1], []])
+        with self.assertNumQueries(4):
+            counts = [b.authors.count() for b in Book.objects.auto_prefetch()]
+        self.assertEqual(counts, [2, 1, 1])
+        with self.assertNumQueries(4):
+            exists = [b.first_time_authors.exists() for b in Book.objects.auto_prefetch()]
+        self.assertEqual(exists, [True, True, True])
+
+    def test_with_prefetch_related(self):
+        # The explicitly prefetched objects are used, and prefetching them
+        # doesn't prefetch them automatically again.
+        with self.assertNumQueries(2):
+            lists = [list(b.authors.all()) for b in
+                     Book.objects.prefetch_related('authors').auto_prefetch()]
+        normal_lists = [list(b.authors.all()) for b in Book.objects.all()]
+        self.assertEqual(lists, normal_lists)
+
+        with self.assertNumQueries(2):
+            lists = [list(b.first_time_authors.all()) for b in
+                     Book.objects.prefetch_related('first_time_authors').auto_prefetch()]
+        normal_lists = [list(b.first_time_authors.all()) for b in Book.objects.all()]
+        self.assertEqual(lists, normal_lists)
+
+        # Other relations are still prefetched automatically.
+        with self.assertNumQueries(3):
+            for book in Book.objects.prefetch_related('authors').auto_prefetch():
+                list(book.authors.all())
+                list(book.first_time_authors.all())
+
+    def test_results_outlive_queryset(self):
+        authors = list(Author.objects.auto_prefetch())
+        with self.assertNumQueries(1):
+            books = [a.first_book for a in authors]
+        self.assertEqual(books, [self.book1, self.book2, self.book3])
+
+    def test_no_reference_cycles(self):
+        # The results don't keep each other alive through the QuerySet.
+        gc.disable()
+        try:
+            authors = list(Author.objects.auto_prefetch())
+            ref = weakref.ref(authors[0])
+            del authors
+            self.assertEqual(ref(), None)
+        finally:
+            gc.enable()
+
+    def test_nullable_foreignkey(self):
+        boss = Employee.objects.create(name="Peter")
+        Employee.objects.create(name="Joe", boss=boss)
+        Employee.objects.create(name="Angela", boss=boss)
+        with self.assertNumQueries(2):
+            bosses = [e.boss for e in Employee.objects.auto_prefetch()]
+        self.assertEqual(bosses, [None, boss, boss])
+
+    def test_clone(self):
+        qs = Author.objects.auto_prefetch().filter(name__startswith='J')
+        with self.assertNumQueries(2):
+            books = [a.first_book for a in qs]
+        self.assertEqual(books, [self.book3])
+
+        with self.assertNumQueries(4):
+            books = [a.first_book for a in Author.objects.auto_prefetch().auto_prefetch(False)]
+
+    def test_values(self):
+        names = Author.objects.auto_prefetch().values_list('name', flat=True)
+        self.assertEqual(list(names), ["Charlotte", "Anne", "Jane"])
+
+    def test_unrelated_instances(self):
+        # Instances that don't come from a QuerySet with auto_prefetch() are
+        # unaffected.
+        with self.assertNumQueries(4):
+            books = [a.first_book for a in Author.objects.all()]
+        author = Author.objects.get(pk=self.author1.pk)
+        self.assertEqual(author._state.auto_prefetch_group, None)
+
+    def test_pickling(self):
+        author = Author.objects.auto_prefetch()[0]
+        self.assertNotEqual(author._state.auto_prefetch_group, None)
+        author = pickle.loads(pickle.dumps(author))
+        self.assertEqual(author._state.auto_prefetch_group, None)
+        with self.assertNumQueries(1):
+            author.first_book
+
+
+class CustomPrefetchTests(TestCase):
+
+    def setUp(self):
+        self.book1 = Book.objects.create(title="Poems")
+        self.book2 = Book.objects.create(title="Jane Eyre")
+
+        self.author1 = Author.objects.create(name="Charlotte", first_book=self.book1)
+        self.author2 = Author.objects.create(name="Anne", first_book=self.book1)
+        self.author3 = Author.objects.create(name="Emily", first_book=self.book2)
+
+        self.book1.authors.add(self.author1, self.author2, self.author3)
+        self.book2.authors.add(self.author1)
+
+        self.house1 = House.objects.create(address="123 Main St")
+        self.house2 = House.objects.create(address="45 Side St")
+        self.room1_1 = Room.objects.create(name="Dining room", house=self.house1)
+        self.room1_2 = Room.objects.create(name="Lounge", house=self.house1)
+        self.room2_1 = Room.objects.create(name="Kitchen", house=self.house2)
+
+        self.person1 = Person.objects.create(name="Joe")
+        self.person2 = Person.objects.create(name="Mary")
+        self.person1.houses.add(self.house1, self.house2)
+        self.person2.houses.add(self.house2)
+
+    def test_custom_queryset(self):
+        authors = Author.objects.filter(name__startswith='E')
+        with self.assertNumQueries(2):
+            lists = [list(b.authors.all()) for b in
+                     Book.objects.prefetch_related(Prefetch('authors', queryset=authors))]
+        self.assertEqual(lists, [[self.author3], []])
+
+        rooms = Room.objects.order_by('-name')
+        with self.assertNumQueries(2):
+            lists = [[r.name for r in h.rooms.all()] for h in
+                     House.objects.prefetch_related(Prefetch('rooms', queryset=rooms))]
+        self.assertEqual(lists, [["Lounge", "Dining room"], ["Kitchen"]])
+
+    def test_foreignkey_custom_queryset(self):
+        books = Book.objects.only('title')
+        with self.assertNumQueries(2):
+            titles = [a.first_book.title for a in
+                      Author.objects.prefetch_related(Prefetch('first_book', queryset=books))]
+        self.assertEqual(titles, ["Poems", "Poems", "Jane Eyre"])
+
+    def test_to_attr(self):
+        with self.assertNumQueries(2):
+            houses = list(House.objects.prefetch_related(
+                Prefetch('rooms', queryset=Room.objects.filter(name__startswith='L'),
+                         to_attr='lounges')))
+            lounges = [h.lounges for h in houses]
+        self.assertEqual(lounges, [[self.room1_2], []])
+        # The related manager isn't affected.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(houses[0].rooms.all()), 2)
+
+        with self.assertNumQueries(2):
+            books = [a.book for a in Author.objects.prefetch_related(
+                Prefetch('first_book', to_attr='book'))]
+        self.assertEqual(books, [self.book1, self.book1, self.book2])
+
+    def test_nested(self):
+        # The lookups of the custom queryset are prefetched too.
+        houses = House.objects.prefetch_related('rooms')
+        with self.assertNumQueries(3):
+            people = list(Person.objects.prefetch_related(
+                Prefetch('houses', queryset=houses, to_attr='house_list')))
+            rooms = [[[r.name for r in h.rooms.all()] for h in p.house_list]
+                     for p in people]
+        self.assertEqual(rooms, [[["Dining room", "Lounge"], ["Kitchen"]], [["Kitchen"]]])
+
+        # Lookups can traverse the to_attr of a previous Prefetch.
+        with self.assertNumQueries(3):
+            people = list(Person.objects.prefetch_related(
+                Prefetch('houses', to_attr='house_list'), 'house_list__rooms'))
+            rooms = [[[r.name for r in h.rooms.all()] for h in p.house_list]
+                     for p in people]
+        self.assertEqual(rooms, [[["Dining room", "Lounge"], ["Kitchen"]], [["Kitchen"]]])
+
+    def test_invalid_lookups(self):
+        self.assertRaises(ValueError, Prefetch, 'rooms',
+                          queryset=Room.objects.values('name'))
+        # to_attr can't hide a field.
+        self.assertRaises(ValueError, list, House.objects.prefetch_related(
+            Prefetch('rooms', to_attr='address')))
+        # The same lookup can't be prefetched with two querysets.
+        self.assertRaises(ValueError, list, House.objects.prefetch_related(
+            'rooms', Prefetch('rooms', queryset=Room.objects.all())))
+        # Generic foreign keys can't be fetched with a custom queryset.
+        TaggedItem.objects.create(tag="awesome", content_object=self.book1)
+        self.assertRaises(ValueError, list, TaggedItem.objects.prefetch_related(
+            Prefetch('content_object', queryset=Book.objects.all())))
+
+
 class DefaultManagerTests(TestCase):
 
     def setUp(self):
@@ -176,3 +176,36 @@ class SignalTests(TestCase):
         self.assertTrue(a._run)
         self.assertTrue(b._run)
         self.assertEqual(signals.post_save.receivers, [])
+
+    def test_not_sent_without_listeners(self):
+        """
+        The model signals aren't sent when they have no receivers for the
+        model.
+        """
+        sent = []
+        model_signals = (signals.pre_init, signals.post_init, signals.pre_save,
+            signals.post_save, signals.pre_delete, signals.post_delete)
+        def make_send(signal, send):
+            def recording_send(sender, **kwargs):
+                sent.append(signal)
+                return send(sender, **kwargs)
+            return recording_send
+        for signal in model_signals:
+            signal.send = make_send(signal, signal.send)
+        def post_save_handler(**kwargs):
+            pass
+        try:
+            p = Person.objects.create(first_name='John', last_name='Smith')
+            Person.objects.get(pk=p.pk).delete()
+            self.assertEqual(sent, [])
+            signals.post_save.connect(post_save_handler, sender=Car)
+            Person.objects.create(first_name='Jane', last_name='Smith')
+            self.assertEqual(sent, [])
+            signals.post_save.connect(post_save_handler, sender=Person)
+            Person.objects.create(first_name='Jim', last_name='Smith')
+            self.assertEqual(sent, [signals.post_save])
+        finally:
+            signals.post_save.disconnect(post_save_handler, sender=Car)
+            signals.post_save.disconnect(post_save_handler, sender=Person)
+            for signal in model_signals:
+                del signal.send
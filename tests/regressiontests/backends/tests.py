@@ -3,14 +3,19 @@
 from __future__ import absolute_import
 
 import datetime
+import os
+import tempfile
 import threading
+import time
 
 from django.conf import settings
+from django.core import signals
 from django.core.management.color import no_style
 from django.core.exceptions import ImproperlyConfigured
-from django.db import (backend, connection, connections, DEFAULT_DB_ALIAS,
-    IntegrityError, transaction)
-from django.db.backends.signals import connection_created
+from django.db import (backend, close_connection, close_old_connections,
+    connection, connections, DEFAULT_DB_ALIAS, IntegrityError, transaction)
+from django.db.backends import profiling
+from django.db.backends.signals import connection_created, queries_profiled
 from django.db.backends.postgresql_psycopg2 import version as pg_version
 from django.db.utils import ConnectionHandler, DatabaseError, load_backend
 from django.test import TestCase, skipUnlessDBFeature, TransactionTestCase
@@ -613,8 +618,176 @@ class ThreadTests(TestCase):
         self.assertEqual(len(exceptions), 0)
 
 
+class PersistentConnectionTests(unittest.TestCase):
+    """
+    Connections may be reused across requests, up to CONN_MAX_AGE seconds,
+    as long as they are usable.
+    """
+    def setUp(self):
+        fd, self.db_name = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.db_name)
+
+    def get_connection(self, max_age):
+        backend = load_backend('django.db.backends.sqlite3')
+        settings_dict = connection.settings_dict.copy()
+        settings_dict.update(NAME=self.db_name, CONN_MAX_AGE=max_age)
+        return backend.DatabaseWrapper(settings_dict, alias='persistent')
+
+    def test_default_closes_connection(self):
+        conn = self.get_connection(0)
+        conn.cursor()
+        self.assertIsNotNone(conn.connection)
+        conn.close_if_unusable_or_obsolete()
+        self.assertIsNone(conn.connection)
+
+    def test_unlimited_max_age(self):
+        conn = self.get_connection(None)
+        conn.cursor()
+        self.assertIsNone(conn.close_at)
+        conn.close_if_unusable_or_obsolete()
+        self.assertIsNotNone(conn.connection)
+        conn.close()
+
+    def test_max_age(self):
+        conn = self.get_connection(60)
+        conn.cursor()
+        underlying = conn.connection
+        self.assertTrue(conn.close_at > time.time())
+        conn.close_if_unusable_or_obsolete()
+        self.assertIs(conn.connection, underlying)
+        conn.cursor()
+        self.assertIs(conn.connection, underlying)
+        conn.close_at = time.time() - 1
+        conn.close_if_unusable_or_obsolete()
+        self.assertIsNone(conn.connection)
+        # A new connection gets a new maximum age.
+        conn.cursor()
+        self.assertTrue(conn.close_at > time.time())
+        conn.close()
+
+    def test_errors_trigger_health_check(self):
+        conn = self.get_connection(60)
+        cursor = conn.cursor()
+        self.assertRaises(DatabaseError, cursor.execute, "SELECT * FROM nonexistent")
+        self.assertTrue(conn.errors_occurred)
+        # The connection is still usable, so it's kept.
+        conn.close_if_unusable_or_obsolete()
+        self.assertIsNotNone(conn.connection)
+        self.assertFalse(conn.errors_occurred)
+
+        conn.errors_occurred = True
+        conn.is_usable = lambda: False
+        conn.close_if_unusable_or_obsolete()
+        self.assertIsNone(conn.connection)
+
+
 class BackendLoadingTests(TestCase):
     def test_old_style_backends_raise_useful_exception(self):
         self.assertRaisesRegexp(ImproperlyConfigured,
             "Try using django.db.backends.sqlite3 instead",
             load_backend, 'sqlite3')
+
+
+class QueryProfilingTests(TestCase):
+    def setUp(self):
+        for i in range(3):
+            reporter = models.Reporter.objects.create(first_name='John %d' % i,
+                last_name='Smith')
+            models.Article.objects.create(headline='Article %d' % i,
+                pub_date=datetime.date.today(), reporter=reporter)
+
+    def start_request(self):
+        # Like the test client, don't let the request signals close the
+        # connection, which would end the test transaction.
+        signals.request_started.disconnect(close_old_connections)
+        try:
+            signals.request_started.send(sender=self.__class__)
+        finally:
+            signals.request_started.connect(close_old_connections)
+
+    def finish_request(self):
+        signals.request_finished.disconnect(close_connection)
+        try:
+            signals.request_finished.send(sender=self.__class__)
+        finally:
+            signals.request_finished.connect(close_connection)
+
+    def fetch_reporters(self):
+        # Fetches the reporter of each article with a query (N+1 queries).
+        return [article.reporter for article in models.Article.objects.all()]
+
+    def test_profile(self):
+        with profiling.QueryProfile() as profile:
+            list(models.Reporter.objects.all())
+        self.assertIsNone(profiling.get_profile())
+        self.assertEqual(profile.count, 1)
+        query = profile.queries[0]
+        self.assertEqual(query['alias'], DEFAULT_DB_ALIAS)
+        self.assertIn('backends_reporter', query['sql'])
+        self.assertTrue(query['time'] >= 0)
+        self.assertEqual(profile.total_time, query['time'])
+        # The caller is the first frame outside of Django.
+        filename, lineno, function = query['caller']
+        self.assertEqual(os.path.splitext(filename)[0], os.path.splitext(__file__)[0])
+        self.assertEqual(function, 'test_profile')
+
+    def test_nested_profiles(self):
+        with profiling.QueryProfile() as outer:
+            with profiling.QueryProfile() as inner:
+                list(models.Reporter.objects.all())
+            self.assertIs(profiling.get_profile(), outer)
+            list(models.Reporter.objects.all())
+        self.assertEqual(inner.count, 1)
+        self.assertEqual(outer.count, 1)
+
+    def test_repeated_queries(self):
+        with profiling.QueryProfile() as profile:
+            self.fetch_reporters()
+            list(models.Reporter.objects.all())
+            list(models.Reporter.objects.all())
+        self.assertEqual(profile.count, 6)
+        duplicates = profile.duplicates()
+        self.assertEqual(sorted(duplicates.values()), [2, 3])
+        # Identical queries don't count as repeated queries.
+        repeated = profile.repeated_queries(threshold=1)
+        self.assertEqual(len(repeated), 1)
+        sql, count, callers = repeated[0]
+        self.assertIn('backends_reporter', sql)
+        self.assertEqual(count, 3)
+        self.assertEqual([caller[2] for caller in callers], ['fetch_reporters'])
+        self.assertEqual(profile.repeated_queries(threshold=3), [])
+
+    def test_request_profiling(self):
+        received = []
+        def receiver(sender, profile, **kwargs):
+            received.append((profile, profile.repeated_queries()))
+        queries_profiled.connect(receiver)
+        try:
+            with self.settings(QUERY_PROFILING_RATE=1, QUERY_PROFILING_REPEAT_THRESHOLD=2):
+                self.start_request()
+                self.fetch_reporters()
+                self.finish_request()
+            with self.settings(QUERY_PROFILING_RATE=0):
+                self.start_request()
+                self.fetch_reporters()
+                self.finish_request()
+        finally:
+            queries_profiled.disconnect(receiver)
+        self.assertEqual(len(received), 1)
+        profile, repeated = received[0]
+        self.assertEqual(profile.count, 4)
+        self.assertEqual(len(repeated), 1)
+        self.assertIsNone(profiling.get_profile())
+
+    def test_unfinished_request_profile(self):
+        with self.settings(QUERY_PROFILING_RATE=1):
+            self.start_request()
+            first = profiling.get_profile()
+            self.start_request()
+            second = profiling.get_profile()
+            self.finish_request()
+        self.assertIsNot(first, second)
+        self.assertIsNone(profiling.get_profile())
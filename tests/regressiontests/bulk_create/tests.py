@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 from operator import attrgetter
 
+from django.db import connection
 from django.test import TestCase, skipUnlessDBFeature
 
 from .models import Country, Restaurant, Pizzeria, State
@@ -56,4 +57,49 @@ class BulkCreateTests(TestCase):
             ])
         self.assertQuerysetEqual(State.objects.order_by("two_letter_code"), [
             "CA", "IL", "ME", "NY",
-        ], attrgetter("two_letter_code"))
\ No newline at end of file
+        ], attrgetter("two_letter_code"))
+
+    def test_large_batch(self):
+        countries = [
+            Country(name="Country %d" % i, iso_two_letter="C%d" % (i % 10))
+            for i in range(1001)
+        ]
+        Country.objects.bulk_create(countries)
+        self.assertEqual(Country.objects.count(), 1001)
+
+    def test_batch_size_limited_by_query_params(self):
+        countries = [
+            Country(name="Country %d" % i, iso_two_letter="C%d" % (i % 10))
+            for i in range(1001)
+        ]
+        fields = [f for f in Country._meta.local_fields if not f.primary_key]
+        max_batch = connection.ops.bulk_batch_size(fields, countries)
+        max_params = connection.features.max_query_params
+        if max_params is not None:
+            self.assertTrue(max_batch * len(fields) <= max_params)
+        self.assertTrue(0 < max_batch <= 1001)
+
+    @skipUnlessDBFeature("has_bulk_insert")
+    def test_explicit_batch_size(self):
+        with self.assertNumQueries(2):
+            Country.objects.bulk_create(self.data, batch_size=2)
+        with self.assertNumQueries(1):
+            Country.objects.bulk_create(self.data[:1], batch_size=2)
+        self.assertEqual(Country.objects.count(), 5)
+
+    def test_non_auto_increment_pk_state(self):
+        states = State.objects.bulk_create([State(two_letter_code="IL")])
+        self.assertFalse(states[0]._state.adding)
+        self.assertEqual(states[0]._state.db, "default")
+
+    @skipUnlessDBFeature("can_return_ids_from_bulk_insert")
+    def test_set_pk_and_state(self):
+        countries = Country.objects.bulk_create(self.data, batch_size=3)
+        self.assertEqual(
+            [c.pk for c in countries],
+            list(Country.objects.order_by("pk").values_list("pk", flat=True))
+        )
+        for country in countries:
+            self.assertFalse(country._state.adding)
+        self.assertEqual(Country.objects.get(pk=countries[1].pk).name,
+                         "The Netherlands")
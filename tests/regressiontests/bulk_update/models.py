@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=100)
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    stock = models.IntegerField(null=True)
+
+    def __unicode__(self):
+        return self.name
+
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+
+class Book(Product):
+    category = models.ForeignKey(Category, null=True)
+    isbn = models.CharField(max_length=13)
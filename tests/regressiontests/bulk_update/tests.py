@@ -0,0 +1,103 @@
+from __future__ import absolute_import
+
+from decimal import Decimal
+from operator import attrgetter
+
+from django.core.exceptions import FieldError
+from django.db import connection
+from django.test import TestCase
+
+from .models import Book, Category, Product
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.products = [
+            Product.objects.create(name="Product %d" % i, price=Decimal("1.00"), stock=i)
+            for i in range(10)
+        ]
+
+    def test_simple(self):
+        for i, product in enumerate(self.products):
+            product.name = "Renamed %d" % i
+            product.price = Decimal(i) + Decimal("0.50")
+        with self.assertNumQueries(1):
+            rows = Product.objects.bulk_update(self.products, ["name", "price"])
+        self.assertEqual(rows, 10)
+        self.assertQuerysetEqual(Product.objects.order_by("pk"), [
+            ("Renamed %d" % i, Decimal(i) + Decimal("0.50")) for i in range(10)
+        ], attrgetter("name", "price"))
+
+    def test_null_values(self):
+        self.products[0].stock = None
+        self.products[1].stock = 42
+        Product.objects.bulk_update(self.products[:2], ["stock"])
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, None)
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).stock, 42)
+
+    def test_all_null_values(self):
+        # The values don't give the CASE expression a type, the column does.
+        for product in self.products:
+            product.stock = None
+        Product.objects.bulk_update(self.products, ["stock"])
+        self.assertEqual(Product.objects.filter(stock__isnull=True).count(), 10)
+
+    def test_batch_size(self):
+        for product in self.products:
+            product.stock += 100
+        with self.assertNumQueries(4):
+            Product.objects.bulk_update(self.products, ["stock"], batch_size=3)
+        self.assertEqual(
+            list(Product.objects.order_by("pk").values_list("stock", flat=True)),
+            range(100, 110)
+        )
+
+    def test_large_batch(self):
+        products = [
+            Product(name="Bulk %d" % i, price=Decimal("2.00"), stock=i)
+            for i in range(600)
+        ]
+        Product.objects.bulk_create(products)
+        products = list(Product.objects.filter(name__startswith="Bulk"))
+        for product in products:
+            product.stock = -product.stock
+        # Only the limit on query parameters applies, not SQLite's limit of
+        # 500 on compound selects, which only bulk inserts use.
+        max_params = connection.features.max_query_params
+        queries = 1 if max_params is None else (600 * 3 + max_params - 1) // max_params
+        with self.assertNumQueries(queries):
+            self.assertEqual(Product.objects.bulk_update(products, ["stock"]), 600)
+        self.assertEqual(Product.objects.filter(stock__lt=0).count(), 599)
+
+    def test_respects_filters(self):
+        for product in self.products:
+            product.stock = 0
+        rows = Product.objects.filter(stock__lt=5).bulk_update(self.products, ["stock"])
+        self.assertEqual(rows, 5)
+        self.assertEqual(Product.objects.filter(stock=0).count(), 5)
+
+    def test_inherited_fields(self):
+        category = Category.objects.create(name="Fiction")
+        books = [
+            Book.objects.create(name="Book %d" % i, price=Decimal("9.99"), isbn="%d" % i)
+            for i in range(3)
+        ]
+        for i, book in enumerate(books):
+            book.name = "Novel %d" % i
+            book.category = category
+            book.isbn = "isbn-%d" % i
+        Book.objects.bulk_update(books, ["name", "category", "isbn"])
+        self.assertQuerysetEqual(Book.objects.order_by("pk"), [
+            ("Novel %d" % i, category.pk, "isbn-%d" % i) for i in range(3)
+        ], attrgetter("name", "category_id", "isbn"))
+
+    def test_empty_objs(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(Product.objects.bulk_update([], ["name"]), 0)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, Product.objects.bulk_update, self.products, [])
+        self.assertRaises(ValueError, Product.objects.bulk_update,
+                          [Product(name="unsaved")], ["name"])
+        self.assertRaises(FieldError, Product.objects.bulk_update,
+                          self.products, ["id"])
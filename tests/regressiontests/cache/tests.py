@@ -17,6 +17,7 @@ from django.core import management
 from django.core.cache import get_cache, DEFAULT_CACHE_ALIAS
 from django.core.cache.backends.base import (CacheKeyWarning,
     InvalidCacheBackendError)
+from django.core.cache.backends.tiered import raw_key
 from django.db import router
 from django.http import HttpResponse, HttpRequest, QueryDict
 from django.middleware.cache import (FetchFromCacheMiddleware,
@@ -895,15 +896,47 @@ class LocMemCacheTests(unittest.TestCase, BaseCacheTests):
         self.cache.clear()
 
     def test_cull(self):
-        self.perform_cull_test(50, 29)
+        self.perform_cull_test(50, 30)
 
     def test_zero_cull(self):
+        "CULL_FREQUENCY is ignored, only the least recently used entries are evicted"
         self.cache = get_cache(self.backend_name, OPTIONS={'MAX_ENTRIES': 30, 'CULL_FREQUENCY': 0})
-        self.perform_cull_test(50, 19)
+        self.perform_cull_test(50, 30)
 
     def test_old_initialization(self):
         self.cache = get_cache('locmem://?max_entries=30&cull_frequency=0')
-        self.perform_cull_test(50, 19)
+        self.perform_cull_test(50, 30)
+
+    def test_lru_eviction(self):
+        "The least recently used entries are evicted first"
+        for i in range(30):
+            self.cache.set('key%d' % i, i)
+        # Reading or writing a key makes it the most recently used.
+        self.assertEqual(self.cache.get('key0'), 0)
+        self.cache.set('key1', 1)
+        self.cache.set('key30', 30)
+        self.cache.set('key31', 31)
+        self.assertEqual(self.cache.get('key0'), 0)
+        self.assertEqual(self.cache.get('key1'), 1)
+        self.assertEqual(self.cache.get('key2'), None)
+        self.assertEqual(self.cache.get('key3'), None)
+        self.assertEqual(self.cache.get('key4'), 4)
+        self.assertEqual(len(self.cache._cache), 30)
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_stats(self):
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.evictions), (0, 0, 0))
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('key')
+        self.cache.get('missing')
+        self.cache.set('expiring', 'value', -1)
+        self.cache.get('expiring')
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.evictions), (2, 2, 0))
+        # The statistics are kept for each instance.
+        self.assertEqual(self.prefix_cache.hits, 0)
+        # Expired entries are removed when they're accessed.
+        self.assertFalse(self.cache.make_key('expiring') in self.cache._cache)
 
     def test_multiple_caches(self):
         "Check that multiple locmem caches are isolated"
@@ -1010,6 +1043,89 @@ class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
         self.perform_cull_test(50, 29)
 
 
+class TieredCacheTests(unittest.TestCase, BaseCacheTests):
+    backend_name = 'django.core.cache.backends.tiered.TieredCache'
+    remote_name = 'django.core.cache.backends.locmem.LocMemCache'
+
+    def setUp(self):
+        self.cache = get_cache(self.backend_name, LOCATION=self.remote_name)
+        self.prefix_cache = get_cache(self.backend_name, LOCATION=self.remote_name, KEY_PREFIX='cacheprefix')
+        self.v2_cache = get_cache(self.backend_name, LOCATION=self.remote_name, VERSION=2)
+        self.custom_key_cache = get_cache(self.backend_name, LOCATION=self.remote_name, KEY_FUNCTION=custom_key_func)
+        self.custom_key_cache2 = get_cache(self.backend_name, LOCATION=self.remote_name, KEY_FUNCTION='regressiontests.cache.tests.custom_key_func')
+        self.remote = self.cache._remote
+        self.local = self.cache._local
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_read_through(self):
+        "Values read from the shared cache are kept in the local cache"
+        self.remote.set(self.cache.make_key('key'), 'value')
+        self.assertEqual(self.local.get(self.cache.make_key('key')), None)
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.local.get(self.cache.make_key('key')), 'value')
+        # The local cache is read first.
+        self.remote.delete(self.cache.make_key('key'))
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_write_through(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(self.remote.get(self.cache.make_key('key')), 'value')
+        self.assertEqual(self.local.get(self.cache.make_key('key')), 'value')
+        self.cache.delete('key')
+        self.assertEqual(self.remote.get(self.cache.make_key('key')), None)
+        self.assertEqual(self.local.get(self.cache.make_key('key')), None)
+
+    def test_local_timeout(self):
+        "Values are only kept in the local cache for LOCAL_TIMEOUT seconds"
+        cache = get_cache(self.backend_name, LOCATION=self.remote_name, OPTIONS={'LOCAL_TIMEOUT': 1})
+        cache.set('key', 'value', 60)
+        self.remote.set(cache.make_key('key'), 'new value')
+        self.assertEqual(cache.get('key'), 'value')
+        time.sleep(2)
+        self.assertEqual(cache.get('key'), 'new value')
+
+    def test_get_many_fan_out(self):
+        "get_many() only asks the shared cache for the local misses"
+        requested = []
+        get_many = self.remote.get_many
+        def recording_get_many(keys, version=None):
+            requested.extend(keys)
+            return get_many(keys, version=version)
+        self.remote.get_many = recording_get_many
+        self.cache.set('a', 'a')
+        self.remote.set(self.cache.make_key('b'), 'b')
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 'a', 'b': 'b'})
+        self.assertEqual(sorted(requested), [self.cache.make_key('b'), self.cache.make_key('c')])
+        del requested[:]
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 'a', 'b': 'b'})
+        self.assertEqual(requested, [])
+
+    def test_invalidation(self):
+        "Writes from other processes empty the local cache when enabled"
+        cache = get_cache(self.backend_name, LOCATION=self.remote_name)
+        other = get_cache(self.backend_name, LOCATION=self.remote_name)
+        # Another process has its own local cache.
+        other._local = get_cache('django.core.cache.backends.locmem.LocMemCache', LOCATION='other process', KEY_FUNCTION=raw_key)
+        other.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        other.set('key', 'new value')
+        self.assertEqual(cache.get('key'), 'value')
+
+        cache = get_cache(self.backend_name, LOCATION=self.remote_name, OPTIONS={'INVALIDATION_INTERVAL': 0})
+        other = get_cache(self.backend_name, LOCATION=self.remote_name, OPTIONS={'INVALIDATION_INTERVAL': 0})
+        other._local = get_cache('django.core.cache.backends.locmem.LocMemCache', LOCATION='other process', KEY_FUNCTION=raw_key)
+        self.assertEqual(cache.get('key'), 'value')
+        other.set('key', 'newer value')
+        self.assertEqual(cache.get('key'), 'newer value')
+        # The process' own writes don't empty its local cache.
+        cache.set('other_key', 'value')
+        self.remote.delete(cache.make_key('other_key'))
+        self.assertEqual(cache.get('other_key'), 'value')
+        other._local.clear()
+
+
 class CustomCacheKeyValidationTests(unittest.TestCase):
     """
     Tests for the ability to mixin a custom ``validate_key`` method to
@@ -1657,6 +1773,61 @@ class CacheMiddlewareTest(TestCase):
         response = other_with_timeout_view(request, '18')
         self.assertEqual(response.content, 'Hello World 18')
 
+    def _expire(self, middleware, request, expires, duration=0):
+        """
+        Changes the expiry time and generation duration of the cached page.
+        """
+        cache_key = get_cache_key(request, middleware.key_prefix, 'GET', cache=middleware.cache)
+        response = middleware.cache.get(cache_key)[0]
+        middleware.cache.set(cache_key, (response, expires, duration))
+
+    @override_settings(CACHE_MIDDLEWARE_STALE_SECONDS=60)
+    def test_stale_while_revalidate(self):
+        middleware = CacheMiddleware()
+        request = self.factory.get('/view/')
+        self.assertEqual(middleware.process_request(request), None)
+        middleware.process_response(request, hello_world_view(request, '1'))
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')).content, 'Hello World 1')
+
+        self._expire(middleware, request, time.time() - 1)
+        # The first request regenerates the page...
+        regenerating_request = self.factory.get('/view/')
+        self.assertEqual(middleware.process_request(regenerating_request), None)
+        # ... while the others get the stale one.
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')).content, 'Hello World 1')
+        middleware.process_response(regenerating_request, hello_world_view(request, '2'))
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')).content, 'Hello World 2')
+
+    @override_settings(CACHE_MIDDLEWARE_STALE_SECONDS=60)
+    def test_stale_while_revalidate_error(self):
+        middleware = CacheMiddleware()
+        request = self.factory.get('/view/')
+        middleware.process_request(request)
+        middleware.process_response(request, hello_world_view(request, '1'))
+
+        self._expire(middleware, request, time.time() - 1)
+        regenerating_request = self.factory.get('/view/')
+        self.assertEqual(middleware.process_request(regenerating_request), None)
+        # The page isn't cached if regenerating it fails, and another request
+        # may try again.
+        middleware.process_response(regenerating_request, HttpResponse(status=500))
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')), None)
+
+    @override_settings(CACHE_MIDDLEWARE_EARLY_REFRESH=True)
+    def test_early_refresh(self):
+        middleware = CacheMiddleware()
+        request = self.factory.get('/view/')
+        middleware.process_request(request)
+        middleware.process_response(request, hello_world_view(request, '1'))
+
+        # A page that's quick to generate isn't refreshed long before it expires.
+        self._expire(middleware, request, time.time() + 1000, 0.001)
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')).content, 'Hello World 1')
+        # A page that's slow to generate is, by a single request.
+        self._expire(middleware, request, time.time() + 1, 10 ** 6)
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')), None)
+        self.assertEqual(middleware.process_request(self.factory.get('/view/')).content, 'Hello World 1')
+
 
 @override_settings(
         CACHE_MIDDLEWARE_KEY_PREFIX='settingsprefix',
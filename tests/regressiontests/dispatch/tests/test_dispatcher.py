@@ -33,6 +33,7 @@ class Callable(object):
         return val
 
 a_signal = Signal(providing_args=["val"])
+c_signal = Signal(providing_args=["val"], use_caching=True)
 
 class DispatcherTests(unittest.TestCase):
     """Test suite for dispatcher (barely started)"""
@@ -123,3 +124,42 @@ class DispatcherTests(unittest.TestCase):
         garbage_collect()
         a_signal.disconnect(receiver_3)
         self._testIsClean(a_signal)
+
+    def testHasListeners(self):
+        self.assertFalse(a_signal.has_listeners())
+        self.assertFalse(a_signal.has_listeners(sender=object()))
+        receiver_1 = Callable()
+        a_signal.connect(receiver_1, sender=self)
+        self.assertTrue(a_signal.has_listeners(sender=self))
+        self.assertFalse(a_signal.has_listeners(sender=object()))
+        a_signal.connect(receiver_1)
+        self.assertTrue(a_signal.has_listeners(sender=object()))
+        del receiver_1
+        garbage_collect()
+        self.assertFalse(a_signal.has_listeners(sender=self))
+        self._testIsClean(a_signal)
+
+    def testCaching(self):
+        self.assertEqual(c_signal.send(sender=self, val="test"), [])
+        # Connecting, disconnecting and garbage collecting receivers empty
+        # the cache.
+        c_signal.connect(receiver_1_arg, sender=self)
+        self.assertEqual(c_signal.sender_receivers_cache, {})
+        result = c_signal.send(sender=self, val="test")
+        self.assertEqual(result, [(receiver_1_arg, "test")])
+        self.assertTrue(c_signal.has_listeners(sender=self))
+        self.assertFalse(c_signal.has_listeners(sender=object))
+        a = Callable()
+        c_signal.connect(a.a)
+        self.assertEqual(c_signal.sender_receivers_cache, {})
+        self.assertEqual(len(c_signal.send(sender=self, val="test")), 2)
+        self.assertTrue(c_signal.has_listeners(sender=object))
+        del a
+        garbage_collect()
+        self.assertEqual(c_signal.sender_receivers_cache, {})
+        self.assertEqual(len(c_signal.send(sender=self, val="test")), 1)
+        self.assertFalse(c_signal.has_listeners(sender=object))
+        c_signal.disconnect(receiver_1_arg, sender=self)
+        self.assertEqual(c_signal.send(sender=self, val="test"), [])
+        self._testIsClean(c_signal)
+        c_signal.sender_receivers_cache.clear()
@@ -1,6 +1,8 @@
 from django.conf import settings
+from django.core.handlers.base import BaseHandler
 from django.core.handlers.wsgi import WSGIHandler
 from django.test import RequestFactory
+from django.test.utils import override_settings
 from django.utils import unittest
 
 
@@ -32,3 +34,30 @@ class HandlerTests(unittest.TestCase):
         handler = WSGIHandler()
         response = handler(environ, lambda *a, **k: None)
         self.assertEqual(response.status_code, 400)
+
+    @override_settings(MIDDLEWARE_TIMING=True, MIDDLEWARE_CLASSES=(
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.http.ConditionalGetMiddleware',
+    ))
+    def test_middleware_timing(self):
+        handler = BaseHandler()
+        handler.load_middleware()
+        request = RequestFactory().get('/')
+        handler.get_response(request)
+        self.assertEqual([timing[:2] for timing in request.middleware_timings], [
+            ('django.middleware.common.CommonMiddleware', 'process_request'),
+            ('django.middleware.http.ConditionalGetMiddleware', 'process_response'),
+            ('django.middleware.common.CommonMiddleware', 'process_response'),
+        ])
+        for timing in request.middleware_timings:
+            self.assertTrue(timing[2] >= 0)
+
+    @override_settings(MIDDLEWARE_CLASSES=(
+        'django.middleware.common.CommonMiddleware',
+    ))
+    def test_no_middleware_timing(self):
+        handler = BaseHandler()
+        handler.load_middleware()
+        request = RequestFactory().get('/')
+        handler.get_response(request)
+        self.assertFalse(hasattr(request, 'middleware_timings'))
@@ -296,6 +296,14 @@ class HttpResponseTests(unittest.TestCase):
         self.assertRaises(UnicodeEncodeError,
                           getattr, r, 'content')
 
+    def test_iterator_content_read_twice(self):
+        # The content of an iterator can be read, e.g. by a middleware,
+        # before the response is iterated over.
+        r = HttpResponse(iter(['abc', u'def']))
+        self.assertEqual(r.content, 'abcdef')
+        self.assertEqual(r.content, 'abcdef')
+        self.assertEqual(list(r), ['abcdef'])
+
 class CookieTests(unittest.TestCase):
     def test_encode(self):
         """
@@ -57,3 +57,10 @@ class BrokenUnicodeMethod(models.Model):
 
 class NonAutoPK(models.Model):
     name = models.CharField(max_length=10, primary_key=True)
+
+class InitTracker(models.Model):
+    name = models.CharField(max_length=10)
+
+    def __init__(self, *args, **kwargs):
+        super(InitTracker, self).__init__(*args, **kwargs)
+        self.initial_name = self.name
@@ -4,11 +4,14 @@ import datetime
 from operator import attrgetter
 
 from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import signals
+from django.db.models.base import get_from_db_info
 from django.test import TestCase, skipUnlessDBFeature
 from django.utils import tzinfo
 
 from .models import (Worker, Article, Party, Event, Department,
-    BrokenUnicodeMethod, NonAutoPK)
+    BrokenUnicodeMethod, NonAutoPK, InitTracker)
 
 
 
@@ -184,3 +187,89 @@ class EvaluateMethodTest(TestCase):
         dept = Department.objects.create(pk=1, name='abc')
         dept.evaluate = 'abc'
         Worker.objects.filter(department=dept)
+
+
+class FromDbTests(TestCase):
+    def setUp(self):
+        self.attnames = [f.attname for f in Worker._meta.fields]
+        self.values = [1, 2, 'Joe']
+
+    def test_from_db(self):
+        worker = Worker.from_db('other', self.attnames, self.values)
+        self.assertEqual((worker.id, worker.department_id, worker.name), (1, 2, 'Joe'))
+        self.assertEqual(worker._state.db, 'other')
+        self.assertFalse(worker._state.adding)
+
+        Worker.objects.create(department=Department.objects.create(pk=1, name='abc'),
+                              name='Ann')
+        worker = Worker.objects.get()
+        self.assertEqual(worker.name, 'Ann')
+        self.assertEqual(worker._state.db, DEFAULT_DB_ALIAS)
+        self.assertFalse(worker._state.adding)
+
+    def test_signals(self):
+        received = []
+        def pre_init(sender, args, kwargs, **extra):
+            received.append(('pre_init', kwargs.copy()))
+        def post_init(sender, instance, **kwargs):
+            received.append(('post_init', instance.name))
+
+        signals.post_init.connect(post_init, sender=Worker)
+        try:
+            Worker.from_db(DEFAULT_DB_ALIAS, self.attnames, self.values)
+            self.assertEqual(received, [('post_init', 'Joe')])
+            # Receivers of pre_init for other models don't matter.
+            signals.pre_init.connect(pre_init, sender=Department)
+            received[:] = []
+            Worker.from_db(DEFAULT_DB_ALIAS, self.attnames, self.values)
+            self.assertEqual(received, [('post_init', 'Joe')])
+            # Receivers of pre_init get the values as keyword arguments.
+            signals.pre_init.connect(pre_init, sender=Worker)
+            received[:] = []
+            worker = Worker.from_db(DEFAULT_DB_ALIAS, self.attnames, self.values)
+            self.assertEqual(received, [
+                ('pre_init', dict(zip(self.attnames, self.values))),
+                ('post_init', 'Joe'),
+            ])
+            self.assertEqual(worker._state.db, DEFAULT_DB_ALIAS)
+        finally:
+            signals.pre_init.disconnect(pre_init, sender=Department)
+            signals.pre_init.disconnect(pre_init, sender=Worker)
+            signals.post_init.disconnect(post_init, sender=Worker)
+
+    def test_overridden_init(self):
+        InitTracker.objects.create(name='one')
+        self.assertEqual(InitTracker.objects.get().initial_name, 'one')
+
+    def test_missing_fields(self):
+        # Fields missing from attnames get their default value.
+        article = Article.from_db(DEFAULT_DB_ALIAS, ['id', 'pub_date'],
+                                  [1, datetime.datetime(2012, 1, 1)])
+        self.assertEqual(article.headline, 'Default headline')
+        self.assertFalse(article._state.adding)
+
+    def test_deferred_fields(self):
+        Article.objects.create(headline='Article', pub_date=datetime.datetime(2012, 1, 1))
+        article = Article.objects.only('headline').get()
+        self.assertEqual(article.headline, 'Article')
+        self.assertNotIn('pub_date', article.__dict__)
+        self.assertEqual(article.pub_date, datetime.datetime(2012, 1, 1))
+
+    def test_deferred_class_from_db(self):
+        """
+        Deferred model classes take the fast path of from_db(), and their
+        deferred fields are still loaded on first access.
+        """
+        Article.objects.create(headline='Article', pub_date=datetime.datetime(2012, 1, 1))
+        saved = Article.objects.get()
+        deferred_class = Article.objects.defer('pub_date').get().__class__
+        attnames = [f.attname for f in Article._meta.fields if f.attname != 'pub_date']
+        values = [getattr(saved, attname) for attname in attnames]
+        self.assertEqual(get_from_db_info(deferred_class)[0], len(attnames))
+        article = deferred_class.from_db(DEFAULT_DB_ALIAS, attnames, values)
+        self.assertEqual(article.headline, 'Article')
+        self.assertNotIn('pub_date', article.__dict__)
+        with self.assertNumQueries(1):
+            self.assertEqual(article.pub_date, datetime.datetime(2012, 1, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(article.pub_date, datetime.datetime(2012, 1, 1))
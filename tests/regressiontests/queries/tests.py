@@ -8,7 +8,8 @@ from django.conf import settings
 from django.core.exceptions import FieldError
 from django.db import DatabaseError, connection, connections, DEFAULT_DB_ALIAS
 from django.db.models import Count
-from django.db.models.query import Q, ITER_CHUNK_SIZE, EmptyQuerySet
+from django.db.models.query import Q, ITER_CHUNK_SIZE, EmptyQuerySet, QuerySet
+from django.db.models.sql.compiler import compiled_sql_cache
 from django.test import TestCase, skipUnlessDBFeature
 from django.utils import unittest
 from django.utils.datastructures import SortedDict
@@ -1894,3 +1895,124 @@ class DefaultValuesInsertTest(TestCase):
             DumbCategory.objects.create()
         except TypeError:
             self.fail("Creation of an instance of a model with only the PK field shouldn't error out after bulk insert refactoring (#17056)")
+
+
+class CompiledSQLCacheTests(TestCase):
+    def setUp(self):
+        self.old_setting = connection.settings_dict['COMPILED_SQL_CACHE']
+        connection.settings_dict['COMPILED_SQL_CACHE'] = True
+        compiled_sql_cache.clear()
+        n1 = Note.objects.create(note='n1', misc='foo')
+        self.e1 = ExtraInfo.objects.create(info='e1', note=n1)
+        self.a1 = Author.objects.create(name='a1', num=1001, extra=self.e1)
+        self.a2 = Author.objects.create(name='a2', num=2002, extra=self.e1)
+
+    def tearDown(self):
+        connection.settings_dict['COMPILED_SQL_CACHE'] = self.old_setting
+        compiled_sql_cache.clear()
+
+    def test_same_shape_reuses_sql(self):
+        sql1, params1 = Author.objects.filter(num=1001).query.sql_with_params()
+        sql2, params2 = Author.objects.filter(num=2002).query.sql_with_params()
+        self.assertEqual(sql1, sql2)
+        self.assertEqual(params1, (1001,))
+        self.assertEqual(params2, (2002,))
+        self.assertEqual(compiled_sql_cache.misses, 1)
+        self.assertEqual(compiled_sql_cache.hits, 1)
+        self.assertEqual(Author.objects.get(num=2002), self.a2)
+
+    def test_different_shapes(self):
+        self.assertQuerysetEqual(
+            Author.objects.filter(num__gt=0).order_by('-name'),
+            ['<Author: a2>', '<Author: a1>']
+        )
+        self.assertQuerysetEqual(
+            Author.objects.filter(num__gt=0).order_by('extra__info', 'name'),
+            ['<Author: a1>', '<Author: a2>']
+        )
+        self.assertQuerysetEqual(
+            Author.objects.filter(num__gt=0).select_related('extra'),
+            ['<Author: a1>', '<Author: a2>']
+        )
+        self.assertEqual(compiled_sql_cache.hits, 0)
+        self.assertEqual(
+            list(Author.objects.filter(num__gt=1500).select_related('extra')),
+            [self.a2]
+        )
+        self.assertEqual(compiled_sql_cache.hits, 1)
+
+    def test_uncacheable_queries(self):
+        self.assertEqual(Author.objects.extra(select={'a': '1'}).count(), 2)
+        self.assertEqual(list(Author.objects.annotate(n=Count('item'))
+                              .values_list('n', flat=True)), [0, 0])
+        self.assertEqual(compiled_sql_cache.hits, 0)
+
+    def test_disabled(self):
+        connection.settings_dict['COMPILED_SQL_CACHE'] = False
+        list(Author.objects.filter(num=1001))
+        list(Author.objects.filter(num=1001))
+        self.assertEqual(compiled_sql_cache.hits, 0)
+        self.assertEqual(len(compiled_sql_cache), 0)
+
+
+class IteratorTests(TestCase):
+    def setUp(self):
+        for num in range(10):
+            Number.objects.create(num=num)
+        self.chunked_cursors = 0
+        self.old_chunked_cursor = connection.chunked_cursor
+        def chunked_cursor():
+            self.chunked_cursors += 1
+            return self.old_chunked_cursor()
+        connection.chunked_cursor = chunked_cursor
+
+    def tearDown(self):
+        connection.chunked_cursor = self.old_chunked_cursor
+
+    def test_iterator_uses_chunked_cursor(self):
+        qs = Number.objects.order_by('num')
+        self.assertEqual([n.num for n in qs.iterator(chunk_size=3)], range(10))
+        self.assertEqual(self.chunked_cursors, 1)
+        self.assertEqual(qs._result_cache, None)
+        # Evaluating the QuerySet itself doesn't stream the results.
+        self.assertEqual(len(qs), 10)
+        self.assertEqual(self.chunked_cursors, 1)
+
+    def test_iterator_override(self):
+        """
+        QuerySet subclasses that override iterator() still fill the result
+        cache through it, without streaming the results.
+        """
+        class WrappingQuerySet(QuerySet):
+            def iterator(self, *args, **kwargs):
+                for obj in super(WrappingQuerySet, self).iterator(*args, **kwargs):
+                    yield ('wrapped', obj.num)
+        qs = WrappingQuerySet(Number).filter(num__lt=3).order_by('num')
+        expected = [('wrapped', 0), ('wrapped', 1), ('wrapped', 2)]
+        self.assertEqual(list(qs), expected)
+        self.assertEqual(len(qs.all()), 3)
+        self.assertEqual(qs.all()[0], ('wrapped', 0))
+        self.assertEqual(self.chunked_cursors, 0)
+        self.assertEqual(list(qs.all().iterator()), expected)
+        self.assertEqual(self.chunked_cursors, 1)
+
+    def test_values_iterators(self):
+        qs = Number.objects.filter(num__lt=3).order_by('num')
+        self.assertEqual(list(qs.values('num').iterator(chunk_size=2)),
+                         [{'num': 0}, {'num': 1}, {'num': 2}])
+        self.assertEqual(list(qs.values_list('num', flat=True).iterator()),
+                         [0, 1, 2])
+        self.assertEqual(self.chunked_cursors, 2)
+
+    def test_ordering_aliases_trimmed(self):
+        # distinct() with ordering on a column that isn't selected adds extra
+        # output columns which must be trimmed from the streamed rows.
+        qs = Number.objects.order_by('-num').distinct().values_list('id')
+        self.assertEqual(len(list(qs.iterator(chunk_size=4))), 10)
+
+    @skipUnlessDBFeature('has_server_side_cursors')
+    def test_server_side_cursor(self):
+        self.assertEqual(
+            [n.num for n in Number.objects.order_by('num').iterator(chunk_size=1)],
+            range(10)
+        )
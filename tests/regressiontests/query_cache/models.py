@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+
+    def __unicode__(self):
+        return self.name
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __unicode__(self):
+        return self.name
+
+class Article(models.Model):
+    headline = models.CharField(max_length=100)
+    author = models.ForeignKey(Author, null=True, on_delete=models.SET_NULL)
+    tags = models.ManyToManyField(Tag)
+
+    def __unicode__(self):
+        return self.headline
+
+class Review(Article):
+    rating = models.IntegerField()
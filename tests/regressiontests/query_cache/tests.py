@@ -0,0 +1,319 @@
+from __future__ import absolute_import
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import F
+from django.template import Context, Template, TemplateSyntaxError
+from django.templatetags import cache as cache_tags
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+
+from .models import Article, Author, Review, Tag
+
+
+@override_settings(
+    QUERYSET_CACHE_ALIAS='default',
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'query_cache_tests',
+        },
+    },
+)
+class QueryCacheTests(TestCase):
+    def setUp(self):
+        self.alice = Author.objects.create(name="Alice")
+        self.bob = Author.objects.create(name="Bob")
+        self.first = Article.objects.create(headline="First", author=self.alice)
+        self.second = Article.objects.create(headline="Second", author=self.bob)
+
+    def tearDown(self):
+        from django.core.cache import get_cache
+        get_cache('default').clear()
+
+    def assertCached(self, qs, expected):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs._clone()), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(qs._clone()), expected)
+
+    def test_results_are_cached(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs, [self.first, self.second])
+        # Different queries are cached separately.
+        qs = Article.objects.cache().filter(headline="Second")
+        self.assertCached(qs, [self.second])
+
+    def test_values(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs.values_list("headline", flat=True), ["First", "Second"])
+        self.assertCached(qs.values_list("headline"), [("First",), ("Second",)])
+        self.assertCached(qs.values("headline"),
+            [{"headline": "First"}, {"headline": "Second"}])
+
+    def test_not_cached_by_default(self):
+        qs = Article.objects.order_by("headline")
+        with self.assertNumQueries(1):
+            list(qs)
+        with self.assertNumQueries(1):
+            list(qs._clone())
+
+    @override_settings(QUERYSET_CACHE_ALIAS=None)
+    def test_disabled(self):
+        qs = Article.objects.cache()
+        with self.assertNumQueries(1):
+            list(qs)
+        with self.assertNumQueries(1):
+            list(qs._clone())
+
+    def test_save_invalidates(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs, [self.first, self.second])
+        third = Article.objects.create(headline="Third")
+        self.assertCached(qs, [self.first, self.second, third])
+        third.headline = "A third"
+        third.save()
+        self.assertCached(qs, [third, self.first, self.second])
+
+    def test_update_invalidates(self):
+        qs = Article.objects.cache().filter(headline="First")
+        self.assertCached(qs, [self.first])
+        Article.objects.filter(pk=self.first.pk).update(headline="Updated")
+        self.assertCached(qs, [])
+
+    def test_delete_invalidates(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs, [self.first, self.second])
+        Article.objects.filter(pk=self.first.pk).delete()
+        self.assertCached(qs, [self.second])
+        self.second.delete()
+        self.assertCached(qs, [])
+
+    def test_related_writes_invalidate_joins(self):
+        qs = Article.objects.cache().filter(author__name="Alice")
+        self.assertCached(qs, [self.first])
+        Author.objects.filter(pk=self.alice.pk).update(name="Carol")
+        self.assertCached(qs, [])
+
+    def test_select_related_tables(self):
+        qs = Article.objects.cache().select_related("author").filter(pk=self.first.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs._clone())[0].author.name, "Alice")
+        Author.objects.filter(pk=self.alice.pk).update(name="Carol")
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs._clone())[0].author.name, "Carol")
+
+    def test_cascaded_updates_invalidate(self):
+        # Deleting an author sets the author of its articles to NULL.
+        qs = Article.objects.cache().filter(author__isnull=True)
+        self.assertCached(qs, [])
+        self.alice.delete()
+        self.assertCached(qs, [self.first])
+
+    def test_subquery_tables(self):
+        authors = Author.objects.filter(name="Alice")
+        qs = Article.objects.cache().filter(author__in=authors)
+        self.assertCached(qs, [self.first])
+        self.alice.name = "Carol"
+        self.alice.save()
+        self.assertCached(qs, [])
+
+    def test_m2m_invalidates(self):
+        tag = Tag.objects.create(name="news")
+        qs = Article.objects.cache().filter(tags=tag)
+        self.assertCached(qs, [])
+        self.first.tags.add(tag)
+        self.assertCached(qs, [self.first])
+        tag.article_set.clear()
+        self.assertCached(qs, [])
+
+    def test_inherited_model(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs, [self.first, self.second])
+        review = Review.objects.create(headline="Review", rating=5)
+        self.assertCached(qs, [self.first, review.article_ptr, self.second])
+        reviews = Review.objects.cache().filter(headline="Review")
+        self.assertCached(reviews, [review])
+        Article.objects.filter(pk=review.pk).update(headline="Changed")
+        self.assertCached(reviews, [])
+
+    def test_bulk_writes_invalidate(self):
+        qs = Article.objects.cache().order_by("headline")
+        self.assertCached(qs, [self.first, self.second])
+        Article.objects.bulk_create([Article(headline="Bulk")])
+        with self.assertNumQueries(1):
+            self.assertEqual([a.headline for a in qs._clone()],
+                ["Bulk", "First", "Second"])
+        self.first.headline = "A first"
+        Article.objects.bulk_update([self.first], ["headline"])
+        with self.assertNumQueries(1):
+            self.assertEqual([a.headline for a in qs._clone()],
+                ["A first", "Bulk", "Second"])
+
+    def test_expressions(self):
+        qs = Article.objects.cache().filter(headline=F("author__name"))
+        self.assertCached(qs, [])
+        self.first.headline = "Alice"
+        self.first.save()
+        self.assertCached(qs, [self.first])
+
+    def test_extra_is_not_cached(self):
+        qs = Article.objects.cache().extra(where=["1 = 1"])
+        with self.assertNumQueries(1):
+            list(qs)
+        with self.assertNumQueries(1):
+            list(qs._clone())
+
+    def test_empty_queryset(self):
+        qs = Article.objects.none().cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(list(qs), [])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Article.objects.cache().filter(pk__in=[])), [])
+
+
+@override_settings(
+    QUERYSET_CACHE_ALIAS='default',
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'query_cache_tests',
+        },
+    },
+)
+class TransactionInvalidationTests(TransactionTestCase):
+    """
+    Results read during a transaction that wrote to a table aren't used once
+    the transaction has ended.
+    """
+    def tearDown(self):
+        from django.core.cache import get_cache
+        get_cache('default').clear()
+
+    def assertNotCached(self, expected):
+        with self.assertNumQueries(1):
+            self.assertEqual([a.name for a in Author.objects.cache()], expected)
+        with self.assertNumQueries(0):
+            self.assertEqual([a.name for a in Author.objects.cache()], expected)
+
+    def test_commit(self):
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            Author.objects.create(name="Alice")
+            # Other connections can still read and cache the old results
+            # under the new generation.
+            self.assertNotCached(["Alice"])
+            transaction.commit()
+        finally:
+            transaction.leave_transaction_management()
+        self.assertNotCached(["Alice"])
+        self.assertEqual(connection.query_cache_keys, set())
+
+    def test_rollback(self):
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            Author.objects.create(name="Alice")
+            self.assertNotCached(["Alice"])
+            transaction.rollback()
+        finally:
+            transaction.leave_transaction_management()
+        self.assertNotCached([])
+
+
+class RecordingCache(object):
+    """
+    Records the calls made to the fragment cache.
+    """
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.cache, name)
+        def method(*args, **kwargs):
+            self.calls.append(name)
+            return attr(*args, **kwargs)
+        return method
+
+
+@override_settings(
+    QUERYSET_CACHE_ALIAS='default',
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'query_cache_tests',
+        },
+    },
+)
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        self.alice = Author.objects.create(name="Alice")
+        self.first = Article.objects.create(headline="First", author=self.alice)
+        self.second = Article.objects.create(headline="Second", author=self.alice)
+
+    def tearDown(self):
+        from django.core.cache import get_cache
+        get_cache('default').clear()
+        cache_tags.cache.clear()
+
+    def render(self, template, **context):
+        return Template("{% load cache %}" + template).render(Context(context))
+
+    def test_instance_dependency(self):
+        template = ("{% cache 500 article article.pk depends_on article %}"
+                    "{{ article.headline }}{% endcache %}")
+        self.assertEqual(self.render(template, article=self.first), "First")
+        self.first.headline = "Changed"
+        self.assertEqual(self.render(template, article=self.first), "First")
+        self.second.save()
+        self.assertEqual(self.render(template, article=self.first), "First")
+        self.first.save()
+        self.assertEqual(self.render(template, article=self.first), "Changed")
+        Article.objects.filter(headline="Changed").update(headline="Updated")
+        self.assertEqual(self.render(template, article=Article.objects.get(pk=self.first.pk)), "Updated")
+
+    def test_model_dependency(self):
+        for dependency in ('"query_cache.Author"', 'authors', 'model'):
+            template = ("{% cache 500 authors depends_on " + dependency + " %}"
+                        "{{ authors.count }}{% endcache %}")
+            authors = Author.objects.all()
+            self.assertEqual(self.render(template, authors=authors, model=Author), "1")
+            bob = Author.objects.create(name="Bob")
+            self.assertEqual(self.render(template, authors=authors, model=Author), "2")
+            bob.delete()
+
+    def test_m2m_dependency(self):
+        tag = Tag.objects.create(name="news")
+        template = ("{% cache 500 tags article.pk depends_on article %}"
+                    "{{ article.tags.count }}{% endcache %}")
+        self.assertEqual(self.render(template, article=self.first), "0")
+        tag.article_set.add(self.first)
+        self.assertEqual(self.render(template, article=self.first), "1")
+
+    def test_prefetch(self):
+        template = ("{% cache 500 first depends_on first %}{{ first }}{% endcache %}"
+                    "{% cache 500 second depends_on second %}{{ second }}{% endcache %}"
+                    "{% cache 500 plain %}plain{% endcache %}")
+        self.assertEqual(self.render(template, first=self.first, second=self.second),
+            "FirstSecondplain")
+        recording_cache = RecordingCache(cache_tags.cache)
+        cache_tags.cache = recording_cache
+        try:
+            self.assertEqual(self.render(template, first=self.first, second=self.second),
+                "FirstSecondplain")
+        finally:
+            cache_tags.cache = recording_cache.cache
+        self.assertEqual(recording_cache.calls, ['get_many'])
+
+    def test_syntax(self):
+        self.assertRaises(TemplateSyntaxError, Template,
+            "{% load cache %}{% cache 500 name depends_on %}{% endcache %}")
+        self.assertRaises(TemplateSyntaxError, self.render,
+            "{% cache 500 name depends_on 'query_cache.Unknown' %}{% endcache %}")
+
+    @override_settings(QUERYSET_CACHE_ALIAS=None)
+    def test_requires_query_cache(self):
+        self.assertRaises(ImproperlyConfigured, self.render,
+            "{% cache 500 name depends_on article %}{% endcache %}", article=self.first)
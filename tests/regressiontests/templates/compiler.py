@@ -0,0 +1,65 @@
+from django.template import Context, Template
+from django.test.utils import (override_settings, setup_test_template_loader,
+    restore_template_loaders)
+from django.utils.unittest import TestCase
+
+
+class CompilerTests(TestCase):
+
+    def assertCompiledRendering(self, source, context):
+        template = Template(source)
+        expected = template.render(Context(context))
+        template.compile()
+        self.assertTrue('render' in template.nodelist.__dict__)
+        context = Context(context)
+        depth = len(context.dicts)
+        self.assertEqual(template.render(context), expected)
+        # The context stack is left as it was.
+        self.assertEqual(len(context.dicts), depth)
+        return expected
+
+    @override_settings(TEMPLATE_DEBUG=False)
+    def test_builtin_nodes(self):
+        output = self.assertCompiledRendering(
+            '{% for a, b in items %}{% if a %}{{ a }}{% else %}-{% endif %}'
+            '{% with c=b|upper %}{{ c }}{% endwith %}'
+            '{% if forloop.last %}.{% endif %}{% empty %}empty{% endfor %}',
+            {'items': [(1, 'x'), (0, '<y>')]})
+        self.assertEqual(output, '1X-&lt;Y&gt;.')
+        self.assertCompiledRendering('{% for a in items reversed %}{{ a }}'
+            '{% for b in a %}{{ forloop.parentloop.counter }}{{ b }}{% endfor %}'
+            '{% endfor %}', {'items': ['ab', 'cd']})
+        self.assertCompiledRendering('{% for a in items %}x{% empty %}empty'
+            '{% endfor %}', {'items': []})
+
+    @override_settings(TEMPLATE_DEBUG=False)
+    def test_fallback_nodes(self):
+        """
+        Other nodes are rendered by their render() method, but the NodeLists
+        they contain are compiled.
+        """
+        template = Template('{% spaceless %}<p> {{ a }} </p> <p>'
+                            '{% for b in c %}{{ b }}{% endfor %}</p>{% endspaceless %}')
+        template.compile()
+        spaceless = template.nodelist[0]
+        self.assertTrue('render' in spaceless.nodelist.__dict__)
+        self.assertEqual(template.render(Context({'a': 1, 'c': [2, 3]})),
+            '<p> 1 </p><p>23</p>')
+
+    @override_settings(TEMPLATE_DEBUG=True)
+    def test_debug_nodelists_are_not_compiled(self):
+        template = Template('{{ a }}')
+        template.compile()
+        self.assertFalse('render' in template.nodelist.__dict__)
+        self.assertEqual(template.render(Context({'a': 1})), '1')
+
+    @override_settings(TEMPLATE_DEBUG=False, TEMPLATE_COMPILE=True)
+    def test_cached_loader(self):
+        loader = setup_test_template_loader({'test.html': '{{ a }}'},
+            use_cached_loader=True)
+        try:
+            template, origin = loader.load_template('test.html')
+            self.assertTrue('render' in template.nodelist.__dict__)
+            self.assertEqual(template.render(Context({'a': 1})), '1')
+        finally:
+            restore_template_loaders()
@@ -12,12 +12,20 @@ if __name__ == '__main__':
 import sys
 import pkg_resources
 import imp
+import logging
 import StringIO
 import os.path
+import shutil
+import tempfile
 
+from django.core.cache import get_cache
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
 from django.template import TemplateDoesNotExist, Context
 from django.template.loaders.eggs import Loader as EggLoader
+from django.template.loaders import cached
 from django.template import loader
+from django.test.utils import override_settings
 from django.utils import unittest
 
 
@@ -118,6 +126,191 @@ class CachedLoader(unittest.TestCase):
         # The two templates should not have the same content
         self.assertNotEqual(t1.render(Context({})), t2.render(Context({})))
 
+class PersistentCachedLoaderTests(unittest.TestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.template_dir, 'sub'))
+        self.write('index.html', '{% if a and not b %}{% include "sub/part.html" %}{% endif %}')
+        self.write('sub/part.html', '{{ a|upper }}')
+        self.parsed = []
+        self.old_get_template_from_string = loader.get_template_from_string
+        def get_template_from_string(source, origin=None, name=None):
+            self.parsed.append(name)
+            return self.old_get_template_from_string(source, origin, name)
+        loader.get_template_from_string = get_template_from_string
+        cached.get_template_from_string = get_template_from_string
+        self.override = override_settings(
+            TEMPLATE_CACHE_ALIAS='default',
+            TEMPLATE_DEBUG=False,
+            CACHES={
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'template_cache_tests',
+                },
+            },
+            TEMPLATE_DIRS=(self.template_dir,),
+            TEMPLATE_LOADERS=(
+                ('django.template.loaders.cached.Loader', (
+                    'django.template.loaders.filesystem.Loader',
+                )),
+            ),
+        )
+        self.override.enable()
+        self.old_template_source_loaders = loader.template_source_loaders
+        loader.template_source_loaders = None
+
+    def tearDown(self):
+        loader.template_source_loaders = self.old_template_source_loaders
+        self.override.disable()
+        loader.get_template_from_string = self.old_get_template_from_string
+        cached.get_template_from_string = self.old_get_template_from_string
+        get_cache('default').clear()
+        shutil.rmtree(self.template_dir)
+
+    def write(self, name, source):
+        f = open(os.path.join(self.template_dir, name), 'w')
+        try:
+            f.write(source)
+        finally:
+            f.close()
+
+    def render(self, name, **context):
+        # New loaders stand for a new process.
+        loader.template_source_loaders = None
+        template_loader = cached.Loader(['django.template.loaders.filesystem.Loader'])
+        template, origin = template_loader.load_template(name)
+        return template.render(Context(context))
+
+    def test_parsed_once(self):
+        self.assertEqual(self.render('index.html', a='a'), 'A')
+        self.assertEqual(self.parsed, ['index.html', 'sub/part.html'])
+        self.assertEqual(self.render('index.html', a='b'), 'B')
+        self.assertEqual(self.parsed, ['index.html', 'sub/part.html'])
+
+    def test_modified_template(self):
+        self.assertEqual(self.render('index.html', a='a'), 'A')
+        self.write('index.html', 'new')
+        self.assertEqual(self.render('index.html', a='a'), 'new')
+        self.assertEqual(self.parsed, ['index.html', 'sub/part.html', 'index.html'])
+        # Included templates are loaded again too.
+        self.write('index.html', '{% include "sub/part.html" %}')
+        self.assertEqual(self.render('index.html', a='a'), 'A')
+        self.write('sub/part.html', 'new part')
+        self.assertEqual(self.render('index.html', a='a'), 'new part')
+
+    @override_settings(TEMPLATE_CACHE_ALIAS=None)
+    def test_disabled(self):
+        self.render('index.html')
+        self.render('index.html')
+        self.assertEqual(self.parsed, ['index.html', 'sub/part.html'] * 2)
+
+    def test_template_names(self):
+        self.write('.hidden', '')
+        template_loader = cached.Loader(['django.template.loaders.filesystem.Loader'])
+        self.assertEqual(template_loader.get_template_names(),
+            ['index.html', 'sub/part.html'])
+
+    def test_warm_command(self):
+        call_command('warmtemplatecache', verbosity=0)
+        self.assertEqual(sorted(self.parsed), ['index.html', 'sub/part.html'])
+        self.parsed = []
+        self.assertEqual(self.render('index.html', a='a'), 'A')
+        self.assertEqual(self.parsed, [])
+
+class PreloadingCachedLoaderTests(unittest.TestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        for name, source in [
+                ('base.html', 'base {% block content %}{% endblock %}'),
+                ('child.html', '{% extends "base.html" %}{% block content %}child{% endblock %}'),
+                ('dynamic.html', '{% extends parent %}'),
+                ('broken.html', '{% if %}'),
+                ('image.png', '\x89PNG\r\n\x1a\n\xff\xfe')]:
+            f = open(os.path.join(self.template_dir, name), 'wb')
+            try:
+                f.write(source)
+            finally:
+                f.close()
+        self.override = override_settings(
+            TEMPLATE_DIRS=(self.template_dir,),
+            TEMPLATE_LOADERS=(
+                ('django.template.loaders.cached.Loader', (
+                    'django.template.loaders.filesystem.Loader',
+                )),
+            ),
+        )
+        self.override.enable()
+        self.old_template_source_loaders = loader.template_source_loaders
+        loader.template_source_loaders = None
+
+    def tearDown(self):
+        loader.template_source_loaders = self.old_template_source_loaders
+        self.override.disable()
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+
+    def test_preload(self):
+        loader.preload_templates()
+        template_loader = loader.template_source_loaders[0]
+        self.assertEqual(sorted(template_loader.template_cache),
+            ['base.html', 'child.html', 'dynamic.html'])
+        # The templates are found and extended without touching the disk.
+        shutil.rmtree(self.template_dir)
+        child = loader.get_template('child.html')
+        self.assertEqual(child.nodelist[0].parent_template,
+            loader.get_template('base.html'))
+        self.assertEqual(child.render(Context()), 'base child')
+        dynamic = loader.get_template('dynamic.html')
+        self.assertEqual(dynamic.nodelist[0].parent_template, None)
+        self.assertEqual(dynamic.render(Context({'parent': 'child.html'})), 'base child')
+
+    def record_logs(self, func):
+        records = []
+        class RecordingHandler(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+        handler = RecordingHandler()
+        logger = logging.getLogger('django.template')
+        logger.addHandler(handler)
+        old_level = logger.level
+        logger.setLevel(logging.DEBUG)
+        try:
+            func()
+        finally:
+            logger.setLevel(old_level)
+            logger.removeHandler(handler)
+        return records
+
+    def test_preload_skipped_files(self):
+        # Files that aren't valid templates are skipped, even in debug mode.
+        for debug in (False, True):
+            loader.template_source_loaders = None
+            with override_settings(DEBUG=debug):
+                records = self.record_logs(loader.preload_templates)
+            self.assertEqual(sorted((r.levelname, r.getMessage().split(':')[0]) for r in records), [
+                ('DEBUG', 'Skipped preloading template broken.html'),
+                ('DEBUG', 'Skipped preloading template image.png'),
+            ])
+
+    def test_preload_errors(self):
+        template_loader = cached.Loader(['django.template.loaders.filesystem.Loader'])
+        def load_template(name, dirs=None):
+            raise ValueError(name)
+        template_loader.load_template = load_template
+        records = self.record_logs(template_loader.preload)
+        self.assertEqual(sorted((r.levelname, r.getMessage()) for r in records), [
+            ('ERROR', 'Error preloading template %s' % name) for name in
+            ['base.html', 'broken.html', 'child.html', 'dynamic.html', 'image.png']
+        ])
+        with override_settings(DEBUG=True):
+            self.assertRaises(ValueError, template_loader.preload)
+
+    def test_wsgi_application(self):
+        get_wsgi_application()
+        self.assertEqual(loader.template_source_loaders, None)
+        with override_settings(TEMPLATE_PRELOAD=True):
+            get_wsgi_application()
+        self.assertEqual(len(loader.template_source_loaders[0].template_cache), 3)
+
 class RenderToStringTest(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,56 @@
+from django.template import Context, Variable, VariableDoesNotExist
+from django.template import base as template_base
+from django.utils.unittest import TestCase
+
+
+class Item(object):
+    def __init__(self, name):
+        self.name = name
+
+class ItemDict(dict):
+    name = 'attribute'
+
+
+class VariableLookupTests(TestCase):
+
+    def setUp(self):
+        self.old_stats = template_base.variable_lookup_stats.copy()
+
+    def tearDown(self):
+        template_base.variable_lookup_stats.update(self.old_stats)
+
+    def resolve(self, var, **context):
+        return var.resolve(Context(context))
+
+    def test_attribute_lookups_are_remembered(self):
+        var = Variable('item.name')
+        stats = template_base.variable_lookup_stats
+        self.assertEqual(self.resolve(var, item=Item('a')), 'a')
+        hits = stats['hits']
+        self.assertEqual(self.resolve(var, item=Item('b')), 'b')
+        self.assertEqual(stats['hits'], hits + 2)
+        # A missing attribute still fails as before.
+        self.assertRaises(VariableDoesNotExist, self.resolve, var, item=object())
+        item = Item('c')
+        del item.name
+        fallbacks = stats['fallbacks']
+        self.assertRaises(VariableDoesNotExist, self.resolve, var, item=item)
+        self.assertEqual(stats['fallbacks'], fallbacks + 1)
+
+    def test_dictionary_lookup_still_comes_first(self):
+        """
+        An attribute lookup isn't remembered for objects a dictionary lookup
+        could succeed on.
+        """
+        var = Variable('item.name')
+        self.assertEqual(self.resolve(var, item=ItemDict()), 'attribute')
+        self.assertEqual(self.resolve(var, item=ItemDict(name='key')), 'key')
+        self.assertEqual(self.resolve(var, item=ItemDict()), 'attribute')
+
+    def test_index_lookups(self):
+        var = Variable('items.1')
+        self.assertEqual(self.resolve(var, items=['a', 'b']), 'b')
+        self.assertEqual(self.resolve(var, items=['c', 'd']), 'd')
+        self.assertRaises(VariableDoesNotExist, self.resolve, var, items=['e'])
+        self.assertEqual(self.resolve(var, items={'1': 'f'}), 'f')
+        self.assertEqual(self.resolve(var, items={1: 'g'}), 'g')
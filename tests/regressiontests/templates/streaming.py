@@ -0,0 +1,44 @@
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.template.base import STREAM_CHUNK_SIZE
+from django.utils import unittest
+
+
+class Row(object):
+    def __init__(self, log, value):
+        self.log, self._value = log, value
+
+    @property
+    def value(self):
+        self.log.append(self._value)
+        return self._value
+
+
+class StreamingTests(unittest.TestCase):
+    def test_chunks(self):
+        t = Template('{% for i in items %}{{ i }}{% if forloop.last %}.{% endif %}'
+                     '{% empty %}empty{% endfor %}')
+        context = {'items': ['x' * 1000] * 20}
+        chunks = list(t.stream(Context(context)))
+        self.assertEqual(u''.join(chunks), t.render(Context(context)))
+        self.assertEqual(len(chunks), 3)
+        for chunk in chunks[:-1]:
+            self.assertTrue(len(chunk) >= STREAM_CHUNK_SIZE)
+        self.assertEqual(list(t.stream(Context({'items': []}))), [u'empty'])
+
+    def test_lazy(self):
+        log = []
+        rows = [Row(log, 'x' * 1000) for i in range(100)]
+        t = Template('{% for row in rows %}{{ row.value }}{% endfor %}')
+        chunks = t.stream(Context({'rows': rows}))
+        # The first chunk is made of the first 9 rows.
+        self.assertEqual(len(chunks.next()), 9 * 1000)
+        self.assertEqual(len(log), 9)
+        self.assertEqual(len(u''.join(chunks)), 91 * 1000)
+
+    def test_response(self):
+        t = Template('{% for i in items %}{{ i }}{% endfor %}')
+        response = HttpResponse(t.stream(Context({'items': [u'\xe9'] * 10000})))
+        chunks = list(response)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks), '\xc3\xa9' * 10000)
@@ -31,17 +31,21 @@ from django.utils.safestring import mark_safe
 from django.utils.tzinfo import LocalTimezone
 
 from .callables import CallableVariablesTests
+from .compiler import CompilerTests
 from .context import ContextTests
 from .custom import CustomTagTests, CustomFilterTests
+from .lookups import VariableLookupTests
 from .parser import ParserTests
 from .unicode import UnicodeTests
 from .nodelist import NodelistTest, ErrorIndexTest
 from .smartif import SmartIfTests
+from .streaming import StreamingTests
 from .response import (TemplateResponseTest, CacheMiddlewareTest,
     SimpleTemplateResponseTest, CustomURLConfTest)
 
 try:
-    from .loaders import RenderToStringTest, EggLoaderTest
+    from .loaders import (RenderToStringTest, EggLoaderTest,
+        PersistentCachedLoaderTests, PreloadingCachedLoaderTests)
 except ImportError, e:
     if "pkg_resources" in e.message:
         pass # If setuptools isn't installed, that's fine. Just move on.
@@ -393,6 +397,14 @@ class Templates(unittest.TestCase):
         except TemplateSyntaxError, e:
             self.assertEqual(e.args[0], "Invalid block tag: 'endblock', expected 'elif', 'else' or 'endif'")
 
+    @override_settings(TEMPLATE_COMPILE=True)
+    def test_compiled_templates(self):
+        self.test_templates()
+
+    def test_streamed_templates(self):
+        self.render = self.render_stream
+        self.test_templates()
+
     def test_templates(self):
         template_tests = self.get_template_tests()
         filter_tests = filters.get_filter_tests()
@@ -511,6 +523,14 @@ class Templates(unittest.TestCase):
             raise ContextStackException
         return output
 
+    def render_stream(self, test_template, vals):
+        context = template.Context(vals[1])
+        before_stack_size = len(context.dicts)
+        output = u''.join(test_template.stream(context))
+        if len(context.dicts) != before_stack_size:
+            raise ContextStackException
+        return output
+
     def get_template_tests(self):
         # SYNTAX --
         # 'template_name': ('template contents', 'context dict', 'expected string output' or Exception class)
@@ -6,7 +6,8 @@ from __future__ import absolute_import
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
 from django.core.urlresolvers import (reverse, resolve, NoReverseMatch,
-    Resolver404, ResolverMatch, RegexURLResolver, RegexURLPattern)
+    Resolver404, ResolverMatch, RegexURLResolver, RegexURLPattern,
+    literal_prefix, clear_url_caches, _reverse_cache)
 from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
 from django.shortcuts import redirect
 from django.test import TestCase
@@ -170,6 +171,26 @@ class URLPatternReverse(TestCase):
         # Reversing None should raise an error, not return the last un-named view.
         self.assertRaises(NoReverseMatch, reverse, None)
 
+    def test_reverse_cache(self):
+        class Place(object):
+            def __init__(self, id):
+                self.id = id
+            def __unicode__(self):
+                return unicode(self.id)
+
+        place = Place(1)
+        self.assertEqual(reverse('places', args=[place]), '/places/1/')
+        self.assertTrue(len(_reverse_cache) > 0)
+        # The arguments are keyed by the string they are substituted with.
+        place.id = 2
+        self.assertEqual(reverse('places', args=[place]), '/places/2/')
+        self.assertEqual(reverse('places4', kwargs={'id': 3}), '/places/3/')
+        self.assertEqual(reverse('places4', kwargs={'id': '3'}), '/places/3/')
+        self.assertEqual(reverse('places', args=[1], prefix='/prefix/'),
+            '/prefix/places/1/')
+        clear_url_caches()
+        self.assertEqual(len(_reverse_cache), 0)
+
 class ResolverTests(unittest.TestCase):
     def test_non_regex(self):
         """
@@ -221,6 +242,50 @@ class ResolverTests(unittest.TestCase):
                         else:
                             self.assertEqual(t.name, e['name'], 'Wrong URL name.  Expected "%s", got "%s".' % (e['name'], t.name))
 
+    def test_first_match_is_kept(self):
+        """
+        Patterns are tried in order, even if a later pattern has a longer
+        literal prefix.
+        """
+        resolver = RegexURLResolver(r'^/', [
+            RegexURLPattern(r'^fi', views.empty_view, name='prefix'),
+            RegexURLPattern(r'^(?P<slug>\w+)/$', views.empty_view, name='slug'),
+            RegexURLPattern(r'^fixed/$', views.empty_view, name='fixed'),
+            RegexURLPattern(r'^fixed/(\d+)/$', views.empty_view, name='number'),
+        ])
+        self.assertEqual(resolver.resolve('/fixed/').url_name, 'prefix')
+        self.assertEqual(resolver.resolve('/other/').url_name, 'slug')
+        self.assertEqual(resolver.resolve('/other/').kwargs, {'slug': 'other'})
+        self.assertEqual(resolver.resolve('/other/').kwargs, {'slug': 'other'})
+        resolver = RegexURLResolver(r'^/', resolver.url_patterns[1:])
+        self.assertEqual(resolver.resolve('/fixed/').url_name, 'slug')
+        self.assertEqual(resolver.resolve('/fixed/3/').url_name, 'number')
+        self.assertRaises(Resolver404, resolver.resolve, '/fixed/x/')
+
+    def test_resolve_cache(self):
+        """
+        Resolved paths are cached, but altering a match doesn't alter the
+        cached one.
+        """
+        urls = 'regressiontests.urlpatterns_reverse.named_urls'
+        match = resolve('/normal/42/37/', urlconf=urls)
+        kwargs = match.kwargs.copy()
+        match.kwargs['extra'] = True
+        self.assertEqual(resolve('/normal/42/37/', urlconf=urls).kwargs, kwargs)
+
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix(r'^admin/'), 'admin/')
+        self.assertEqual(literal_prefix(r'^blog/(\d+)/$'), 'blog/')
+        self.assertEqual(literal_prefix(r'^a\.b/'), 'a.b/')
+        # Optional or repeated characters aren't part of the prefix.
+        self.assertEqual(literal_prefix(r'^ab?c/'), 'a')
+        self.assertEqual(literal_prefix(r'^a/b{2}'), 'a/')
+        # Patterns that may match differently have no prefix.
+        self.assertEqual(literal_prefix(r'admin/'), '')
+        self.assertEqual(literal_prefix(r'^a/|^b/'), '')
+        self.assertEqual(literal_prefix(r'^(?i)admin/'), '')
+        self.assertEqual(literal_prefix(r'^a/(b|c)/'), 'a/')
+
 class ReverseLazyTest(TestCase):
     urls = 'regressiontests.urlpatterns_reverse.reverse_lazy_urls'
 
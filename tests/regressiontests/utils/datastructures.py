@@ -7,7 +7,8 @@ import pickle
 
 from django.test import SimpleTestCase
 from django.utils.datastructures import (DictWrapper, DotExpandedDict,
-    ImmutableList, MultiValueDict, MultiValueDictKeyError, MergeDict, SortedDict)
+    ImmutableList, LRUCache, MultiValueDict, MultiValueDictKeyError, MergeDict,
+    SortedDict)
 
 
 class SortedDictTests(SimpleTestCase):
@@ -287,3 +288,39 @@ class DictWrapperTests(SimpleTestCase):
         d = DictWrapper({'a': 'a'}, f, 'xx_')
         self.assertEqual("Normal: %(a)s. Modified: %(xx_a)s" % d,
                           'Normal: a. Modified: *a')
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_basic_methods(self):
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        self.assertEqual(cache['a'], 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('b', 2), 2)
+        self.assertRaises(KeyError, cache.__getitem__, 'b')
+        self.assertTrue('a' in cache)
+        self.assertEqual(len(cache), 1)
+        del cache['a']
+        self.assertFalse('a' in cache)
+        cache['a'] = 1
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        # Reading 'a' makes 'b' the least recently used item.
+        cache.get('a')
+        cache['c'] = 3
+        self.assertEqual(len(cache), 2)
+        self.assertFalse('b' in cache)
+        # Setting an existing item doesn't evict anything.
+        cache['a'] = 4
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache['a'], 4)
+        cache['d'] = 5
+        self.assertFalse('c' in cache)
+        self.assertEqual(cache['a'], 4)
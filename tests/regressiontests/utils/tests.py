@@ -16,7 +16,8 @@ from .decorators import DecoratorFromMiddlewareTests
 from .functional import FunctionalTestCase
 from .timesince import TimesinceTests
 from .datastructures import (MultiValueDictTests, SortedDictTests,
-    DictWrapperTests, ImmutableListTests, DotExpandedDictTests, MergeDictTests)
+    DictWrapperTests, ImmutableListTests, DotExpandedDictTests, MergeDictTests,
+    LRUCacheTests)
 from .tzinfo import TzinfoTests
 from .datetime_safe import DatetimeTests
 from .baseconv import TestBaseConv